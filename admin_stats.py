@@ -0,0 +1,121 @@
+"""
+Dashboard statistics for the /admin page of app_with_database.py.
+
+Counts are maintained incrementally in Supabase by a trigger on
+inserts, updates and deletes of contact_submissions (see "Dashboard Statistics" in SUPABASE_SETUP.md):
+
+- contact_submission_stats holds one row per counter (total, per priority,
+  per topic, satisfaction sum)
+- contact_submission_daily holds one row per day for the "this week" window
+
+Loading the dashboard therefore reads a handful of rows no matter how many
+submissions exist. reconcile_stats() rebuilds both tables from scratch.
+
+Usage:
+    python admin_stats.py reconcile
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+
+STATS_TABLE = 'contact_submission_stats'
+DAILY_TABLE = 'contact_submission_daily'
+RECONCILE_FUNCTION = 'reconcile_contact_submission_stats'
+
+PRIORITIES = ('high', 'medium', 'low')
+
+
+def empty_stats():
+    """Return the stats dict shape expected by admin.html"""
+    return {
+        'total_submissions': 0,
+        'priority_counts': {priority: 0 for priority in PRIORITIES},
+        'priority_percentages': {priority: 0 for priority in PRIORITIES},
+        'topic_counts': {},
+        'avg_satisfaction': 0,
+        'recent_submissions': 0,
+    }
+
+
+def finish_stats(stats, satisfaction_sum):
+    """Fill in the derived percentages and average"""
+    total = stats['total_submissions']
+    if total > 0:
+        for priority in PRIORITIES:
+            stats['priority_percentages'][priority] = round(
+                (stats['priority_counts'][priority] / total) * 100, 1
+            )
+        stats['avg_satisfaction'] = round(satisfaction_sum / total, 1)
+    return stats
+
+
+def get_dashboard_stats(supabase, recent_days=7):
+    """Read the precomputed counters - O(number of counters), not O(rows)"""
+    counters = supabase.table(STATS_TABLE).select('metric,key,value').execute().data or []
+
+    # Today and the recent_days - 1 days before it
+    since = (datetime.now(timezone.utc) - timedelta(days=recent_days)).date()
+    daily = supabase.table(DAILY_TABLE)\
+                    .select('day,submissions')\
+                    .gt('day', since.isoformat())\
+                    .execute().data or []
+
+    stats = empty_stats()
+    satisfaction_sum = 0
+    for counter in counters:
+        metric, key, value = counter['metric'], counter['key'], counter['value']
+        if metric == 'total':
+            stats['total_submissions'] = value
+        elif metric == 'priority' and key in stats['priority_counts']:
+            stats['priority_counts'][key] = value
+        elif metric == 'topic' and value > 0:
+            stats['topic_counts'][key] = value
+        elif metric == 'satisfaction_sum':
+            satisfaction_sum = value
+
+    stats['recent_submissions'] = sum(day['submissions'] for day in daily)
+    return finish_stats(stats, satisfaction_sum)
+
+
+def compute_stats_from_rows(submissions, recent_days=7):
+    """Compute the same stats by scanning rows (used before the counters exist)"""
+    stats = empty_stats()
+    stats['total_submissions'] = len(submissions)
+    now = datetime.now(timezone.utc)
+    satisfaction_sum = 0
+
+    for submission in submissions:
+        priority = submission.get('priority', 'low')
+        if priority in stats['priority_counts']:
+            stats['priority_counts'][priority] += 1
+
+        for topic in submission.get('topics') or []:
+            stats['topic_counts'][topic] = stats['topic_counts'].get(topic, 0) + 1
+
+        satisfaction_sum += submission.get('satisfaction') or 0
+
+        created_at = submission.get('created_at')
+        if created_at:
+            created = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+            if (now - created).days <= recent_days:
+                stats['recent_submissions'] += 1
+
+    return finish_stats(stats, satisfaction_sum)
+
+
+def reconcile_stats(supabase):
+    """Rebuild the counter tables from contact_submissions"""
+    supabase.rpc(RECONCILE_FUNCTION).execute()
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] != ['reconcile']:
+        print(__doc__.strip().split('Usage:')[1])
+        sys.exit(1)
+
+    from supabase import create_client
+    import config
+
+    client = create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
+    reconcile_stats(client)
+    print("✅ Dashboard statistics rebuilt from contact_submissions")
@@ -0,0 +1,337 @@
+"""
+Columnar in-memory snapshot of contact submissions for ad-hoc dashboard queries.
+
+Each submission is kept as one entry in a set of NumPy arrays:
+
+- created:      int64 seconds since the epoch (rows are kept sorted by it)
+- priority:     int8 index into VALID_PRIORITIES, -1 if missing
+- topics:       uint8 bitmask (the bits of topics.py)
+- satisfaction: int8 rating 1-10, 0 if missing
+
+Filtered counts, averages and time-bucket histograms are then a handful of
+vectorized operations over at most a few MB, instead of a loop over dicts
+that parses every created_at. Time ranges are binary searches on the sorted
+created column, so only the rows inside the range are scanned.
+
+The snapshot is filled by refresh(), which asks `load_since(watermark,
+limit)` for rows with created_at >= watermark, oldest first, and appends
+only the ones it has not seen. The first page of every refresh reaches
+`overlap` seconds behind the watermark, so a row committed late with an
+earlier created_at (a slow transaction) is still picked up.
+
+    snapshot = SubmissionSnapshot(load_since)
+    snapshot.refresh()
+    snapshot.count(priority='high', topic='ai-ml', since=week_ago)
+    snapshot.histogram(86400, since=month_ago)
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from admin_stats import empty_stats, finish_stats
+from topics import TOPIC_BITS
+from validation import VALID_PRIORITIES
+
+PRIORITY_CODES = {priority: code for code, priority in enumerate(VALID_PRIORITIES)}
+
+COLUMN_TYPES = {'id': np.int64, 'created': np.int64, 'priority': np.int8,
+                'topics': np.uint8, 'satisfaction': np.int8}
+
+# Named buckets accepted by /api/analytics
+BUCKETS = {'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+
+# Histogram window when no 'since' is given
+DEFAULT_WINDOW_DAYS = 30
+
+
+class AnalyticsError(Exception):
+    """Raised for invalid analytics query parameters"""
+    pass
+
+
+def parse_analytics_args(args):
+    """Read filters and the histogram bucket from the query string
+
+    since/until are YYYY-MM-DD dates (until inclusive), returned as epoch
+    seconds; priority and topic must be valid values.
+    """
+    filters = {}
+    for name in ('since', 'until'):
+        value = args.get(name)
+        if value:
+            try:
+                day = datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            except ValueError:
+                raise AnalyticsError(f"'{name}' must be a date in YYYY-MM-DD format")
+            if name == 'until':
+                day += timedelta(days=1)
+            filters[name] = int(day.timestamp())
+
+    priority = args.get('priority')
+    if priority:
+        if priority not in PRIORITY_CODES:
+            raise AnalyticsError(f"'priority' must be one of {', '.join(VALID_PRIORITIES)}")
+        filters['priority'] = priority
+
+    topic = args.get('topic')
+    if topic:
+        if topic not in TOPIC_BITS:
+            raise AnalyticsError(f"'topic' must be one of {', '.join(TOPIC_BITS)}")
+        filters['topic'] = topic
+
+    bucket = args.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        raise AnalyticsError(f"'bucket' must be one of {', '.join(BUCKETS)}")
+    return filters, bucket
+
+
+def parse_timestamp(value):
+    """Supabase timestamptz string -> seconds since the epoch"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def encode_row(record):
+    """One Supabase record as a tuple of column values (see COLUMN_TYPES)"""
+    mask = 0
+    for topic in record.get('topics') or ():
+        mask |= TOPIC_BITS.get(topic, 0)
+    satisfaction = record.get('satisfaction')
+    return (
+        record['id'],
+        parse_timestamp(record['created_at']),
+        PRIORITY_CODES.get(record.get('priority'), -1),
+        mask,
+        satisfaction or 0,
+    )
+
+
+class _Columns:
+    """Arrays with spare capacity; only the first `size` entries are valid
+
+    Published by swapping SubmissionSnapshot._columns, so a query keeps
+    using the object (and size) it started with while a refresh appends.
+    """
+
+    __slots__ = ('arrays', 'size')
+
+    def __init__(self, arrays, size):
+        self.arrays = arrays
+        self.size = size
+
+    def __getitem__(self, name):
+        return self.arrays[name][:self.size]
+
+
+class SubmissionSnapshot:
+    """NumPy columns of every submission, refreshed incrementally by created_at"""
+
+    def __init__(self, load_since, page_size=1000, overlap=60):
+        self.load_since = load_since
+        self.page_size = page_size
+        self.overlap = overlap
+
+        self._columns = _Columns({name: np.empty(0, dtype) for name, dtype in COLUMN_TYPES.items()}, 0)
+        self._watermark = None  # created_at string of the newest row loaded
+        self._recent_ids = set()  # IDs of rows inside the overlap window
+        self._refresh_lock = threading.Lock()
+        self._stats = {'refreshes': 0, 'rows_loaded': 0, 'resorts': 0, 'refresh_ms': None,
+                       'refreshed_at': None}
+
+    # Loading
+
+    def refresh(self):
+        """Load rows added since the last refresh; returns how many were new"""
+        with self._refresh_lock:
+            started = time.perf_counter()
+            rows = []
+            since = self._overlap_start()
+            while True:
+                page = self.load_since(since, self.page_size)
+                rows.extend(record for record in page if record['id'] not in self._recent_ids)
+                self._recent_ids.update(record['id'] for record in page)
+                if page:
+                    self._advance_watermark(page[-1]['created_at'])
+                if len(page) < self.page_size:
+                    break
+                if page[-1]['created_at'] == since:
+                    # A full page sharing one timestamp: widen the page to get past it
+                    self.page_size *= 2
+                since = page[-1]['created_at']
+
+            if rows:
+                self._append([encode_row(record) for record in rows])
+            self._forget_old_ids()
+
+            self._stats['refreshes'] += 1
+            self._stats['rows_loaded'] += len(rows)
+            self._stats['refresh_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            self._stats['refreshed_at'] = time.time()
+            return len(rows)
+
+    def _advance_watermark(self, created_at):
+        if self._watermark is None or parse_timestamp(created_at) > parse_timestamp(self._watermark):
+            self._watermark = created_at
+
+    def _overlap_start(self):
+        if self._watermark is None:
+            return None
+        start = datetime.fromtimestamp(parse_timestamp(self._watermark) - self.overlap, timezone.utc)
+        return start.isoformat()
+
+    def _forget_old_ids(self):
+        """Keep only the IDs that the next overlapping read can return again"""
+        if self._watermark is None:
+            return
+        horizon = parse_timestamp(self._watermark) - self.overlap
+        columns = self._columns
+        # created is sorted, so the rows inside the window are a suffix
+        start = int(np.searchsorted(columns['created'], horizon))
+        self._recent_ids = set(columns['id'][start:].tolist())
+
+    def _append(self, encoded):
+        new = {name: np.fromiter((row[i] for row in encoded), dtype, len(encoded))
+               for i, (name, dtype) in enumerate(COLUMN_TYPES.items())}
+        old = self._columns
+        size = old.size + len(encoded)
+        capacity = len(old.arrays['id'])
+        late = old.size and new['created'].min() < old['created'][-1]
+
+        if late or size > capacity:
+            # Grow (doubling keeps appends amortized O(1)) and/or re-sort into
+            # new arrays, leaving the published ones untouched
+            if size > capacity:
+                capacity = max(size, capacity * 2, 1024)
+            arrays = {}
+            for name, dtype in COLUMN_TYPES.items():
+                arrays[name] = np.empty(capacity, dtype)
+                arrays[name][:old.size] = old[name]
+                arrays[name][old.size:size] = new[name]
+            if late:
+                order = np.lexsort((arrays['id'][:size], arrays['created'][:size]))
+                for name in arrays:
+                    arrays[name][:size] = arrays[name][:size][order]
+                self._stats['resorts'] += 1
+        else:
+            # Write past the published size, which readers never look at
+            arrays = old.arrays
+            for name in COLUMN_TYPES:
+                arrays[name][old.size:size] = new[name]
+        self._columns = _Columns(arrays, size)
+
+    # Queries
+
+    def _select(self, priority=None, topic=None, since=None, until=None):
+        """(columns, start, stop, mask) for rows matching the filters
+
+        since/until are epoch seconds (until exclusive); mask is None when
+        every row in [start, stop) matches.
+        """
+        columns = self._columns
+        created = columns['created']
+        start = int(np.searchsorted(created, since)) if since is not None else 0
+        stop = int(np.searchsorted(created, until)) if until is not None else columns.size
+
+        mask = None
+        if priority is not None:
+            mask = columns['priority'][start:stop] == PRIORITY_CODES[priority]
+        if topic is not None:
+            has_topic = (columns['topics'][start:stop] & TOPIC_BITS[topic]).astype(bool)
+            mask = has_topic if mask is None else mask & has_topic
+        return columns, start, stop, mask
+
+    def count(self, **filters):
+        """Number of submissions matching priority/topic/since/until"""
+        _, start, stop, mask = self._select(**filters)
+        return (stop - start) if mask is None else int(np.count_nonzero(mask))
+
+    def average_satisfaction(self, **filters):
+        """Mean satisfaction of matching submissions that have one, or None"""
+        columns, start, stop, mask = self._select(**filters)
+        values = columns['satisfaction'][start:stop]
+        if mask is not None:
+            # Zeroing the rows that do not match is cheaper than selecting the rest
+            values = values * mask
+        rated_count = int(np.count_nonzero(values))
+        if not rated_count:
+            return None
+        return int(values.sum(dtype=np.int64)) / rated_count
+
+    def priority_counts(self, **filters):
+        """{priority: count} over matching submissions"""
+        columns, start, stop, mask = self._select(**filters)
+        codes = columns['priority'][start:stop]
+        if mask is not None:
+            codes = codes[mask]
+        return {priority: int(np.count_nonzero(codes == code)) for priority, code in PRIORITY_CODES.items()}
+
+    def topic_counts(self, **filters):
+        """{topic: count} over matching submissions"""
+        columns, start, stop, mask = self._select(**filters)
+        masks = columns['topics'][start:stop]
+        if mask is not None:
+            masks = masks[mask]
+        return {topic: int(np.count_nonzero(masks & bit)) for topic, bit in TOPIC_BITS.items()}
+
+    def histogram(self, bucket, since, until=None, **filters):
+        """Submissions per `bucket` seconds from `since`
+
+        Returns (bucket start times, counts) as arrays. Rows are sorted by
+        created, so the bucket edges are found by binary search rather than
+        by scanning rows.
+        """
+        until = until if until is not None else int(time.time()) + 1
+        if until <= since:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        columns, start, stop, mask = self._select(since=since, until=until, **filters)
+        created = columns['created'][start:stop]
+        if mask is not None:
+            created = created[mask]
+        edges = np.arange(since, until + bucket, bucket, dtype=np.int64)
+        edges[-1] = min(edges[-1], until)
+        return edges[:-1], np.diff(np.searchsorted(created, edges))
+
+    def report(self, bucket='day', **filters):
+        """Counts, average satisfaction and a histogram for /api/analytics"""
+        since = filters.pop('since', None)
+        until = filters.pop('until', None)
+        window = {'since': since, 'until': until}
+        average = self.average_satisfaction(**window, **filters)
+        width = BUCKETS[bucket]
+        if since is None:
+            # Last DEFAULT_WINDOW_DAYS, starting on a bucket boundary
+            since = (int(time.time()) - DEFAULT_WINDOW_DAYS * 86400) // width * width
+        starts, counts = self.histogram(width, since, until, **filters)
+        return {
+            'count': self.count(**window, **filters),
+            'avg_satisfaction': round(average, 2) if average is not None else None,
+            'priority_counts': self.priority_counts(**window, **filters),
+            'topic_counts': self.topic_counts(**window, **filters),
+            'histogram': [{'start': datetime.fromtimestamp(start, timezone.utc).isoformat(), 'count': count}
+                          for start, count in zip(starts.tolist(), counts.tolist())],
+        }
+
+    def dashboard_stats(self, recent_days=7):
+        """The admin dashboard's stats dict (see admin_stats.empty_stats)"""
+        stats = empty_stats()
+        stats['total_submissions'] = self.count()
+        for priority, count in self.priority_counts().items():
+            if priority in stats['priority_counts']:
+                stats['priority_counts'][priority] = count
+        stats['topic_counts'] = {topic: count for topic, count in self.topic_counts().items() if count}
+        stats['recent_submissions'] = self.count(since=int(time.time()) - recent_days * 86400)
+
+        satisfaction_sum = int(self._columns['satisfaction'].sum(dtype=np.int64))
+        return finish_stats(stats, satisfaction_sum)
+
+    def stats(self):
+        columns = self._columns
+        snapshot = dict(self._stats)
+        snapshot.update(rows=columns.size, watermark=self._watermark,
+                        memory_bytes=sum(array.nbytes for array in columns.arrays.values()))
+        return snapshot
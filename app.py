@@ -1,56 +1,207 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort, send_file
 import os
-import re
-from datetime import datetime
+import atexit
+import logging
+import base64
+from concurrent import futures
 from werkzeug.utils import secure_filename
-import sqlite3
+from werkzeug.middleware.proxy_fix import ProxyFix
+from db_pool import ConnectionPool
+from write_behind import WriteBehindWriter, QueueFull, StillSaving
+from export import parse_export_args, export_response, ExportError
+from validation import validate_form, VALID_PRIORITIES, VALID_TOPICS
+from email_validation import EmailValidator, load_domain_list
+from batch_api import validate_batch
+from page_cache import PageCache
+from static_assets import StaticAssets
+from streaming import stream_page
+from rate_limit import RateLimiter, RouteLimits, make_store, parse_limit
+from metrics import RequestMetrics, db_call, count_validation_failures
+from app_logging import get_logger, log_event
+from attachments import AttachmentStore
+from search_index import SEARCH_INDEX_MIGRATION, SEARCH_SQL, fts_query, highlight
+from idempotency import RecentSubmissions, FORM_FIELD, new_key, client_key, content_key
+from topics import (TOPIC_COUNTS_SQL, TOPIC_COUNTS_BY_PRIORITY_SQL, topics_mask, topic_condition,
+                    topics_migration)
+from records import submission_factory
 
 # Create Flask application instance
 app = Flask(__name__)
 
+# Structured JSON logs written by a background thread
+log = get_logger()
+
 # Configuration
 app.config['SECRET_KEY'] = 'your-secret-key-change-this-in-production'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = 'uploads'
 
+# Content-addressed attachment store. Uploads are streamed to disk and
+# hashed while the request is parsed, so they are never held in memory.
+attachment_store = AttachmentStore(app.config['UPLOAD_FOLDER'])
+app.request_class = attachment_store.request_class()
+
+# Write-behind mode (opt-in): batch submissions into group commits
+app.config['WRITE_BEHIND'] = os.environ.get('WRITE_BEHIND', '0') == '1'
+app.config['WRITE_BEHIND_MAX_BATCH'] = int(os.environ.get('WRITE_BEHIND_MAX_BATCH', 100))
+app.config['WRITE_BEHIND_MAX_DELAY'] = float(os.environ.get('WRITE_BEHIND_MAX_DELAY', 0.01))  # seconds
+app.config['WRITE_BEHIND_QUEUE_SIZE'] = int(os.environ.get('WRITE_BEHIND_QUEUE_SIZE', 1000))
+app.config['WRITE_BEHIND_TIMEOUT'] = 5.0  # seconds a request waits for its batch
+
+# Rendered static pages are cached in memory (PAGE_CACHE_ENABLED=0 disables
+# it, e.g. while editing templates)
+app.config['PAGE_CACHE_ENABLED'] = os.environ.get('PAGE_CACHE_ENABLED', '1') == '1'
+
+# Domains rejected by /api/validate-email, one per line (e.g. disposable providers)
+app.config['BLOCKED_EMAIL_DOMAINS_FILE'] = os.environ.get('BLOCKED_EMAIL_DOMAINS_FILE', 'blocked_email_domains.txt')
+
+# Token-bucket rate limits (RATE_LIMITS=0 disables them). Limits read as
+# "<requests>/<second|minute|hour|day>". RATE_LIMIT_STORE=sqlite shares the
+# buckets between worker processes through RATE_LIMIT_DATABASE.
+app.config['RATE_LIMITS'] = os.environ.get('RATE_LIMITS', '1') == '1'
+app.config['RATE_LIMIT_STORE'] = os.environ.get('RATE_LIMIT_STORE', 'memory')
+app.config['RATE_LIMIT_DATABASE'] = 'rate_limits.db'
+app.config['RATE_LIMIT_CONTACT_IP'] = os.environ.get('RATE_LIMIT_CONTACT_IP', '10/minute')
+app.config['RATE_LIMIT_CONTACT_EMAIL'] = os.environ.get('RATE_LIMIT_CONTACT_EMAIL', '5/minute')
+app.config['RATE_LIMIT_VALIDATE_EMAIL_IP'] = os.environ.get('RATE_LIMIT_VALIDATE_EMAIL_IP', '120/minute')
+
+# Reverse proxies in front of the app (nginx, a load balancer) whose
+# X-Forwarded-For is trusted. Per-IP rate limits key on the client address,
+# so behind a proxy this must be set or every visitor shares one bucket.
+app.config['TRUSTED_PROXIES'] = int(os.environ.get('TRUSTED_PROXIES', 0))
+if app.config['TRUSTED_PROXIES']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'])
+
 # Database setup
 DATABASE = 'contact_submissions.db'
 
+# Connection pool shared by the storage functions below
+db_pool = ConnectionPool(DATABASE)
+
+# SQL is kept in constants so every call reuses the same prepared statement
+SUBMISSION_COLUMNS = ('name', 'email', 'phone', 'age', 'date', 'message',
+                      'priority', 'topics_mask', 'satisfaction', 'filename', 'attachment_sha256',
+                      'idempotency_key')
+
+# A repeated idempotency key inserts nothing (see save_contact_submission)
+INSERT_SUBMISSION_SQL = '''
+    INSERT INTO contact_submissions 
+    (name, email, phone, age, date, message, priority, topics_mask, satisfaction, filename,
+     attachment_sha256, idempotency_key)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (idempotency_key) WHERE idempotency_key IS NOT NULL DO NOTHING
+'''
+
+SELECT_ID_BY_IDEMPOTENCY_KEY_SQL = 'SELECT id FROM contact_submissions WHERE idempotency_key = ?'
+
+SUBMISSION_SELECT = '''
+    SELECT id, name, email, phone, age, date, message, priority, topics_mask, 
+           satisfaction, filename, submitted_at, attachment_sha256
+    FROM contact_submissions 
+'''
+
+SELECT_ALL_SUBMISSIONS_SQL = SUBMISSION_SELECT + 'ORDER BY submitted_at DESC, id DESC'
+
+# Keyset pagination: seek past the (submitted_at, id) of the page edge.
+# Filters (priority, topic) are ANDed in front of the seek by page_sql().
+PAGE_SEEK = {
+    'first': ('', 'ORDER BY submitted_at DESC, id DESC'),
+    'oldest': ('', 'ORDER BY submitted_at ASC, id ASC'),
+    'older': ('(submitted_at, id) < (?, ?)', 'ORDER BY submitted_at DESC, id DESC'),
+    'newer': ('(submitted_at, id) > (?, ?)', 'ORDER BY submitted_at ASC, id ASC'),
+}
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+# Schema migrations applied in order by init_db().
+# PRAGMA user_version records the last version applied to the database file.
+MIGRATIONS = [
+    (1, [
+        # Serves ORDER BY submitted_at DESC, id DESC and the keyset seek
+        'CREATE INDEX IF NOT EXISTS idx_submissions_submitted_at_id '
+        'ON contact_submissions (submitted_at, id)',
+    ]),
+    (2, [
+        # Serves exports filtered by priority and date range
+        'CREATE INDEX IF NOT EXISTS idx_submissions_priority_submitted_at '
+        'ON contact_submissions (priority, submitted_at, id)',
+    ]),
+    (3, [
+        # SHA-256 of the stored attachment (see attachments.py)
+        'ALTER TABLE contact_submissions ADD COLUMN attachment_sha256 TEXT',
+    ]),
+    # FTS5 index of messages kept in sync by triggers (see search_index.py)
+    (4, SEARCH_INDEX_MIGRATION),
+    (5, [
+        # Client-supplied key of the form that created the row (see idempotency.py)
+        'ALTER TABLE contact_submissions ADD COLUMN idempotency_key TEXT',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_submissions_idempotency_key '
+        'ON contact_submissions (idempotency_key) WHERE idempotency_key IS NOT NULL',
+    ]),
+    # Topics as a bitmask with a partial index per topic (see topics.py);
+    # the old comma-joined topics column is no longer written
+    (6, topics_migration()),
+]
+
+# Columns written by /export/submissions, in output order
+EXPORT_FIELDS = ('id', 'name', 'email', 'phone', 'age', 'date', 'message', 'priority',
+                 'topics', 'satisfaction', 'filename', 'submitted_at', 'attachment_sha256')
+
+EXPORT_BATCH_SIZE = 500
+
 def init_db():
     """Initialize the database with contact submissions table"""
-    conn = sqlite3.connect(DATABASE)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS contact_submissions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT NOT NULL,
-            phone TEXT,
-            age INTEGER,
-            date TEXT,
-            message TEXT NOT NULL,
-            priority TEXT,
-            topics TEXT,
-            satisfaction INTEGER,
-            filename TEXT,
-            submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    with db_pool.connection() as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS contact_submissions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                email TEXT NOT NULL,
+                phone TEXT,
+                age INTEGER,
+                date TEXT,
+                message TEXT NOT NULL,
+                priority TEXT,
+                topics TEXT,
+                satisfaction INTEGER,
+                filename TEXT,
+                submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    
+    apply_migrations()
 
-def save_contact_submission(data):
-    """Save contact form submission to database"""
-    conn = sqlite3.connect(DATABASE)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO contact_submissions 
-        (name, email, phone, age, date, message, priority, topics, satisfaction, filename)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
+def apply_migrations():
+    """Run any schema migrations newer than the database's user_version
+
+    Each version runs in one BEGIN IMMEDIATE transaction together with its
+    user_version bump, so a crash leaves both or neither. The version is
+    read again once the write lock is held, so a second worker starting at
+    the same time skips whatever the first one has already applied.
+    """
+    with db_pool.connection() as conn:
+        for version, statements in MIGRATIONS:
+            if version <= conn.execute('PRAGMA user_version').fetchone()[0]:
+                continue
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if version <= conn.execute('PRAGMA user_version').fetchone()[0]:
+                    conn.rollback()
+                    continue
+                for statement in statements:
+                    conn.execute(statement)
+                # PRAGMA does not accept bound parameters
+                conn.execute(f'PRAGMA user_version = {int(version)}')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            log_event(log, logging.INFO, 'migration_applied', version=version)
+
+def submission_params(data):
+    """Build the INSERT parameters for a validated submission"""
+    return (
         data.get('name'),
         data.get('email'),
         data.get('phone'),
@@ -58,160 +209,253 @@ def save_contact_submission(data):
         str(data.get('date')) if data.get('date') else None,
         data.get('message'),
         data.get('priority'),
-        ','.join(data.get('topics', [])),
+        topics_mask(data.get('topics')),
         data.get('satisfaction'),
-        data.get('filename')
-    ))
-    
-    submission_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+        data.get('filename'),
+        data.get('attachment_sha256'),
+        data.get('idempotency_key')
+    )
+
+# Background group-commit writer used when WRITE_BEHIND is enabled
+write_behind = WriteBehindWriter(
+    db_pool,
+    'contact_submissions',
+    SUBMISSION_COLUMNS,
+    max_batch_size=app.config['WRITE_BEHIND_MAX_BATCH'],
+    max_delay=app.config['WRITE_BEHIND_MAX_DELAY'],
+    max_queue_size=app.config['WRITE_BEHIND_QUEUE_SIZE'],
+    unique_column='idempotency_key',
+)
+
+# Flush anything still queued when the process exits
+atexit.register(write_behind.close)
+
+@db_call('sqlite', 'insert_submission')
+def save_contact_submission(data):
+    """Save contact form submission to database"""
+    params = submission_params(data)
     
-    return submission_id
+    if app.config['WRITE_BEHIND']:
+        # Raises QueueFull when the writer cannot keep up
+        future = write_behind.submit(params)
+        try:
+            return future.result(timeout=app.config['WRITE_BEHIND_TIMEOUT'])
+        except futures.TimeoutError:
+            raise StillSaving(future) from None
+    
+    def insert(conn):
+        cursor = conn.execute(INSERT_SUBMISSION_SQL, params)
+        if cursor.rowcount == 0:
+            # Key already saved, e.g. by another worker: return that row's ID
+            return conn.execute(SELECT_ID_BY_IDEMPOTENCY_KEY_SQL, (data['idempotency_key'],)).fetchone()[0]
+        return cursor.lastrowid
+    
+    return db_pool.run(insert)
+
+def fetch_submissions(conn, sql, params=()):
+    """Run a SUBMISSION_SELECT query and return its rows as Submission records"""
+    cursor = conn.execute(sql, params)
+    cursor.row_factory = submission_factory
+    return cursor.fetchall()
 
+@db_call('sqlite', 'select_all')
 def get_all_submissions():
     """Get all contact submissions from database"""
-    conn = sqlite3.connect(DATABASE)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT id, name, email, phone, age, date, message, priority, topics, 
-               satisfaction, filename, submitted_at
-        FROM contact_submissions 
-        ORDER BY submitted_at DESC
-    ''')
-    
-    submissions = cursor.fetchall()
-    conn.close()
-    
-    return submissions
+    return db_pool.run(lambda conn: fetch_submissions(conn, SELECT_ALL_SUBMISSIONS_SQL))
+
+def submission_conditions(filters):
+    """WHERE conditions and parameters for since/before/priority/topic filters"""
+    conditions, params = [], []
+    if 'since' in filters:
+        conditions.append('submitted_at >= ?')
+        params.append(filters['since'].isoformat())
+    if 'before' in filters:
+        conditions.append('submitted_at < ?')
+        params.append(filters['before'].isoformat())
+    if 'priority' in filters:
+        conditions.append('priority = ?')
+        params.append(filters['priority'])
+    if 'topic' in filters:
+        # Inlined so the topic's partial index is used
+        conditions.append(topic_condition(filters['topic']))
+    return conditions, params
+
+def iter_submission_rows(filters, newest_first=False):
+    """Yield Submission records EXPORT_BATCH_SIZE at a time, using keyset pagination
+    
+    Every batch is its own short query, and the pooled connection goes back
+    to the pool in between, so a slow client reading a long listing never
+    holds one. Rows saved during the listing are included if they sort
+    after the batch being read.
+    """
+    first, seek = ('first', 'older') if newest_first else ('oldest', 'newer')
+    
+    def fetch(seek, key_params=()):
+        sql, params = page_sql(seek, filters)
+        params = (*params, *key_params, EXPORT_BATCH_SIZE)
+        return db_pool.run(lambda conn: fetch_submissions(conn, sql, params))
+    
+    rows = fetch(first)
+    while rows:
+        yield from rows
+        if len(rows) < EXPORT_BATCH_SIZE:
+            break
+        rows = fetch(seek, (rows[-1].submitted_at, rows[-1].id))
+
+def iter_submissions(filters):
+    """Yield submissions as dicts, oldest first (see iter_submission_rows)"""
+    for submission in iter_submission_rows(filters):
+        record = {field: getattr(submission, field) for field in EXPORT_FIELDS}
+        record['topics'] = ','.join(submission.topics)
+        yield record
+
+def encode_cursor(row):
+    """Turn a submission row's (submitted_at, id) into an opaque page cursor"""
+    key = f"{row.submitted_at}|{row.id}"
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Parse a page cursor back into (submitted_at, id), or None if invalid"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        submitted_at, submission_id = base64.urlsafe_b64decode(padded).decode().rsplit('|', 1)
+        return submitted_at, int(submission_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def page_sql(seek, filters):
+    """Build the keyset page query for a seek direction and (priority, topic) filters
+    
+    Returns (sql, params) where params are the filter values; the caller
+    appends the seek key and the limit.
+    """
+    conditions, params = submission_conditions(filters)
+    seek_condition, order = PAGE_SEEK[seek]
+    if seek_condition:
+        conditions.append(seek_condition)
+    
+    sql = SUBMISSION_SELECT
+    if conditions:
+        sql += 'WHERE ' + ' AND '.join(conditions) + ' '
+    return sql + order + ' LIMIT ?', params
+
+@db_call('sqlite', 'select_page')
+def get_submissions_page(cursor=None, direction='next', page_size=DEFAULT_PAGE_SIZE, filters=None):
+    """Get one page of submissions (newest first) using keyset pagination
+    
+    filters may hold 'priority' and/or 'topic'. Returns (rows, next_cursor,
+    prev_cursor). next_cursor points at older submissions and prev_cursor at
+    newer ones; either is None at the ends.
+    """
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    filters = filters or {}
+    key = decode_cursor(cursor) if cursor else None
+    
+    def fetch(seek, key_params=()):
+        sql, params = page_sql(seek, filters)
+        params = (*params, *key_params, page_size + 1)
+        return db_pool.run(lambda conn: fetch_submissions(conn, sql, params))
+    
+    # Fetch one extra row to learn whether another page exists
+    if key is None:
+        rows = fetch('first')
+        has_older, has_newer = len(rows) > page_size, False
+        rows = rows[:page_size]
+    elif direction == 'prev':
+        rows = fetch('newer', key)
+        if len(rows) <= page_size:
+            # Stepped back to the newest rows - show a full first page
+            return get_submissions_page(page_size=page_size, filters=filters)
+        has_older, has_newer = True, True
+        rows = rows[:page_size][::-1]
+    else:
+        rows = fetch('older', key)
+        has_older, has_newer = len(rows) > page_size, True
+        rows = rows[:page_size]
+    
+    if not rows:
+        return rows, None, None
+    
+    next_cursor = encode_cursor(rows[-1]) if has_older else None
+    prev_cursor = encode_cursor(rows[0]) if has_newer else None
+    return rows, next_cursor, prev_cursor
+
+@db_call('sqlite', 'search')
+def search_submissions(query, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """Full-text search of submission messages, best match first
+    
+    Returns (submissions, has_more). Each Submission has an excerpt of its
+    message around the matched words.
+    """
+    match = fts_query(query)
+    if match is None:
+        return [], False
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    page = max(1, page)
+    
+    # Fetch one extra row to learn whether another page exists
+    params = (match, page_size + 1, (page - 1) * page_size)
+    rows = db_pool.run(lambda conn: fetch_submissions(conn, SEARCH_SQL, params))
+    return rows[:page_size], len(rows) > page_size
+
+@db_call('sqlite', 'topic_counts')
+def get_topic_counts(priority=None):
+    """Number of submissions per topic, from the topic indexes (one pass over the rows of a priority)"""
+    if priority is None:
+        counts = db_pool.run(lambda conn: conn.execute(TOPIC_COUNTS_SQL).fetchone())
+    else:
+        counts = db_pool.run(lambda conn: conn.execute(TOPIC_COUNTS_BY_PRIORITY_SQL, (priority,)).fetchone())
+    return dict(zip(VALID_TOPICS, counts))
 
 # Initialize database on startup
 init_db()
 
-# Validation utilities
-class ValidationError(Exception):
-    """Custom exception for validation errors"""
-    pass
+# Request counts, latency histograms and DB timings, exposed on /metrics
+request_metrics = RequestMetrics(app)
 
-def validate_email(email):
-    """Validate email format using regex"""
-    if not email:
-        raise ValidationError("Email is required")
-    
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, email):
-        raise ValidationError("Please enter a valid email address")
-    
-    return email.lower().strip()
+# Throttled requests get a 429 before their body is read
+rate_limiter = RateLimiter(
+    app,
+    make_store(app.config['RATE_LIMIT_STORE'], app.config['RATE_LIMIT_DATABASE']),
+    {
+        'contact': RouteLimits(ip=parse_limit(app.config['RATE_LIMIT_CONTACT_IP']),
+                               email=parse_limit(app.config['RATE_LIMIT_CONTACT_EMAIL'])),
+        'validate_email_api': RouteLimits(ip=parse_limit(app.config['RATE_LIMIT_VALIDATE_EMAIL_IP'])),
+    },
+    enabled=app.config['RATE_LIMITS'],
+)
 
-def validate_name(name):
-    """Validate name field"""
-    if not name:
-        raise ValidationError("Name is required")
-    
-    name = name.strip()
-    if len(name) < 2:
-        raise ValidationError("Name must be at least 2 characters long")
-    
-    if len(name) > 50:
-        raise ValidationError("Name must be less than 50 characters")
-    
-    # Check for valid characters (letters, spaces, hyphens, apostrophes)
-    if not re.match(r"^[a-zA-Z\s\-']+$", name):
-        raise ValidationError("Name can only contain letters, spaces, hyphens, and apostrophes")
-    
-    return name
+# Memoized /api/validate-email results, per address and per domain
+email_validator = EmailValidator(load_domain_list(app.config['BLOCKED_EMAIL_DOMAINS_FILE']))
 
-def validate_phone(phone):
-    """Validate phone number"""
-    if not phone:
-        return None  # Phone is optional
-    
-    # Remove all non-digit characters
-    phone_digits = re.sub(r'\D', '', phone)
-    
-    if len(phone_digits) < 10:
-        raise ValidationError("Phone number must have at least 10 digits")
-    
-    if len(phone_digits) > 15:
-        raise ValidationError("Phone number must have less than 15 digits")
-    
-    return phone_digits
+# Fingerprinted, precompressed CSS/JS from build_assets.py, served from /assets
+static_assets = StaticAssets(app)
 
-def validate_age(age_str):
-    """Validate age field"""
-    if not age_str:
-        raise ValidationError("Age is required")
-    
-    try:
-        age = int(age_str)
-    except ValueError:
-        raise ValidationError("Age must be a valid number")
-    
-    if age < 13:
-        raise ValidationError("You must be at least 13 years old")
-    
-    if age > 120:
-        raise ValidationError("Please enter a valid age")
-    
-    return age
+# Search excerpts: escaped message text with the matched words in <mark>
+app.jinja_env.filters['highlight'] = highlight
 
-def validate_date(date_str):
-    """Validate date field"""
-    if not date_str:
-        return None  # Date is optional
-    
-    try:
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-        
-        # Check if date is not in the future
-        if date_obj.date() > datetime.now().date():
-            raise ValidationError("Date cannot be in the future")
-        
-        return date_obj.date()
-    except ValueError:
-        raise ValidationError("Please enter a valid date")
+# Idempotency keys of recent submissions, so repeats skip the database
+recent_submissions = RecentSubmissions()
 
-def validate_message(message):
-    """Validate message field"""
-    if not message:
-        raise ValidationError("Message is required")
-    
-    message = message.strip()
-    if len(message) < 10:
-        raise ValidationError("Message must be at least 10 characters long")
-    
-    if len(message) > 1000:
-        raise ValidationError("Message must be less than 1000 characters")
-    
-    return message
+def settle_claim(dedupe_key, future):
+    """Complete or release a key once its delayed write-behind save finishes"""
+    if future.exception() is None:
+        recent_submissions.complete(dedupe_key, future.result())
+    else:
+        recent_submissions.release(dedupe_key)
 
-def validate_file(file):
-    """Validate uploaded file"""
-    if not file or file.filename == '':
-        return None  # File is optional
-    
-    # Check file size (already handled by Flask config, but good to double-check)
-    if request.content_length > app.config['MAX_CONTENT_LENGTH']:
-        raise ValidationError("File size too large. Maximum size is 16MB")
-    
-    # Check file extension
-    allowed_extensions = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx'}
-    filename = file.filename.lower()
-    
-    if '.' not in filename or filename.rsplit('.', 1)[1] not in allowed_extensions:
-        raise ValidationError(f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}")
-    
-    return file
+# Rendered output of the static template pages, reused across requests
+page_cache = PageCache(enabled=app.config['PAGE_CACHE_ENABLED'])
 
 # Routes
 @app.route('/')
+@page_cache.cached
 def home():
     """Home page route"""
     return render_template('index.html', title='Python Web App')
 
 @app.route('/about')
+@page_cache.cached
 def about():
     """About page route"""
     return render_template('about.html', title='About')
@@ -220,115 +464,163 @@ def about():
 def contact():
     """Enhanced contact page with comprehensive server-side validation"""
     if request.method == 'POST':
-        errors = []
-        validated_data = {}
+        # Per-address limit, checked before any validation or database work
+        throttled = rate_limiter.check('email', request.form.get('email'))
+        if throttled:
+            return throttled
         
-        try:
-            # Validate each field individually
-            validated_data['name'] = validate_name(request.form.get('name'))
-        except ValidationError as e:
-            errors.append(f"Name: {str(e)}")
-        
-        try:
-            validated_data['email'] = validate_email(request.form.get('email'))
-        except ValidationError as e:
-            errors.append(f"Email: {str(e)}")
-        
-        try:
-            validated_data['phone'] = validate_phone(request.form.get('phone'))
-        except ValidationError as e:
-            errors.append(f"Phone: {str(e)}")
-        
-        try:
-            validated_data['age'] = validate_age(request.form.get('age'))
-        except ValidationError as e:
-            errors.append(f"Age: {str(e)}")
-        
-        try:
-            validated_data['date'] = validate_date(request.form.get('date'))
-        except ValidationError as e:
-            errors.append(f"Date: {str(e)}")
-        
-        try:
-            validated_data['message'] = validate_message(request.form.get('message'))
-        except ValidationError as e:
-            errors.append(f"Message: {str(e)}")
-        
-        # Validate select field
-        priority = request.form.get('priority')
-        if priority not in ['low', 'medium', 'high']:
-            errors.append("Priority: Please select a valid priority level")
-        else:
-            validated_data['priority'] = priority
-        
-        # Validate checkboxes (topics)
-        topics = request.form.getlist('topics')
-        valid_topics = ['web-development', 'mobile-apps', 'data-science', 'ai-ml', 'cybersecurity']
-        invalid_topics = [topic for topic in topics if topic not in valid_topics]
-        if invalid_topics:
-            errors.append(f"Topics: Invalid topics selected: {', '.join(invalid_topics)}")
-        else:
-            validated_data['topics'] = topics
-        
-        # Validate range input
-        try:
-            satisfaction = int(request.form.get('satisfaction', 0))
-            if satisfaction < 1 or satisfaction > 10:
-                errors.append("Satisfaction: Please select a value between 1 and 10")
-            else:
-                validated_data['satisfaction'] = satisfaction
-        except ValueError:
-            errors.append("Satisfaction: Invalid satisfaction rating")
-        
-        # Validate file upload
-        try:
-            file = request.files.get('attachment')
-            validated_file = validate_file(file)
-            if validated_file:
-                filename = secure_filename(validated_file.filename)
-                # In a real app, you'd save the file here
-                validated_data['filename'] = filename
-        except ValidationError as e:
-            errors.append(f"File: {str(e)}")
+        # Validate every field in one pass
+        result = validate_form(request.form, request.files, request.content_length,
+                               app.config['MAX_CONTENT_LENGTH'])
+        errors = result.messages()
+        validated_data = result.data
+        count_validation_failures(result.errors)
+        form_key = client_key(request.form.get(FORM_FIELD))
         
         # If there are validation errors, show them
         if errors:
             for error in errors:
                 flash(error, 'error')
-            return render_template('contact.html', title='Contact', form_data=request.form)
+            return render_template('contact.html', title='Contact', form_data=request.form,
+                                   idempotency_key=form_key or new_key())
         
         # If validation passes, process the form
-        # Save the submission to the database
-        submission_id = save_contact_submission(validated_data)
+        validated_file = validated_data.pop('attachment', None)
+        if validated_file:
+            validated_data['filename'] = secure_filename(validated_file.filename)
+            # Store the attachment (deduplicated by content) and keep its hash,
+            # which is part of the content key below
+            validated_data['attachment_sha256'], _ = attachment_store.save(validated_file)
+        
+        # A repeat of a form already submitted (double click, browser retry)
+        # gets the original submission ID without writing anything
+        validated_data['idempotency_key'] = form_key
+        dedupe_key = form_key or content_key(validated_data)
+        claimed, submission_id = recent_submissions.claim(dedupe_key)
+        if not claimed:
+            if submission_id is None:
+                flash(f'Thank you {validated_data["name"]}! Your message is already being saved.', 'success')
+            else:
+                flash(f'Thank you {validated_data["name"]}! Your message has already been received. (Submission ID: {submission_id})', 'success')
+            return redirect(url_for('contact'))
+        
+        try:
+            # Save the submission to the database
+            submission_id = save_contact_submission(validated_data)
+        except QueueFull:
+            recent_submissions.release(dedupe_key)
+            flash('We are receiving a lot of messages right now. Please try again in a moment.', 'error')
+            return render_template('contact.html', title='Contact', form_data=request.form,
+                                   idempotency_key=form_key or new_key()), 503
+        except StillSaving as e:
+            # The row is queued and usually committed a moment later; the key
+            # stays claimed until then, so a retry is not saved twice
+            e.future.add_done_callback(lambda future: settle_claim(dedupe_key, future))
+            flash(f'Thank you {validated_data["name"]}! Your message has been received and is still being saved.', 'success')
+            return redirect(url_for('contact'))
+        except Exception:
+            recent_submissions.release(dedupe_key)
+            raise
+        recent_submissions.complete(dedupe_key, submission_id)
         
         flash(f'Thank you {validated_data["name"]}! Your message has been received and saved successfully. (Submission ID: {submission_id})', 'success')
         
-        # Log the validated data for debugging
-        print("=== VALIDATED FORM DATA SAVED ===")
-        for key, value in validated_data.items():
-            print(f"{key}: {value}")
-        print(f"Saved with ID: {submission_id}")
-        print("=================================")
+        # Log the validated data (PII is masked by the log writer)
+        log_event(log, logging.INFO, 'submission_saved', submission_id=submission_id,
+                  submission=dict(validated_data))
         
         return redirect(url_for('contact'))
     
-    return render_template('contact.html', title='Contact')
+    return render_template('contact.html', title='Contact', idempotency_key=new_key())
 
 @app.route('/validation-demo')
+@page_cache.cached
 def validation_demo():
     """Page explaining server-side validation concepts"""
     return render_template('validation_demo.html', title='Server-Side Validation Demo')
 
 @app.route('/form-demo')
+@page_cache.cached
 def form_demo():
     """Educational page about form concepts"""
     return render_template('form_demo.html', title='Form Demo')
 
 @app.route('/submissions')
 def submissions():
-    """View all contact form submissions"""
-    all_submissions = get_all_submissions()
-    return render_template('submissions.html', title='Contact Submissions', submissions=all_submissions)
+    """View contact form submissions one page at a time, or search their messages
+    
+    ?all=1 lists every matching submission on one page, streamed from the
+    database in batches as it is rendered.
+    """
+    query = request.args.get('q', '').strip()
+    page_size = request.args.get('per_page', DEFAULT_PAGE_SIZE, type=int)
+    per_page = max(1, min(page_size, MAX_PAGE_SIZE))
+    
+    if query:
+        page_number = max(1, request.args.get('page', 1, type=int))
+        results, has_more = search_submissions(query, page_number, page_size)
+        return render_template('submissions.html', title='Contact Submissions', submissions=results,
+                               query=query, page=page_number, has_more=has_more, per_page=per_page)
+    
+    # Unknown filter values are ignored rather than matching nothing
+    filters = {name: request.args[name] for name, valid in (('priority', VALID_PRIORITIES), ('topic', VALID_TOPICS))
+               if request.args.get(name) in valid}
+    if request.args.get('all') == '1':
+        return stream_page('submissions.html', title='Contact Submissions', query='', filters=filters,
+                           submissions=iter_submission_rows(filters, newest_first=True),
+                           priorities=VALID_PRIORITIES, topics=VALID_TOPICS)
+    
+    cursor = request.args.get('cursor')
+    direction = request.args.get('direction', 'next')
+    page, next_cursor, prev_cursor = get_submissions_page(cursor, direction, page_size, filters)
+    return render_template('submissions.html', title='Contact Submissions', submissions=page,
+                           next_cursor=next_cursor, prev_cursor=prev_cursor, per_page=per_page, query='',
+                           filters=filters, priorities=VALID_PRIORITIES, topics=VALID_TOPICS)
+
+@app.route('/attachments/<digest>')
+def attachment(digest):
+    """Download a stored attachment by its SHA-256"""
+    try:
+        path = attachment_store.path_for(digest)
+    except ValueError:
+        abort(404)
+    if not os.path.exists(path):
+        abort(404)
+    return send_file(os.path.abspath(path), as_attachment=True,
+                     download_name=request.args.get('name') or digest, max_age=31536000)
+
+@app.route('/export/submissions')
+def export_submissions():
+    """Stream all matching submissions as CSV or NDJSON"""
+    try:
+        export_format, filters, use_gzip = parse_export_args(request.args)
+    except ExportError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return export_response(iter_submissions(filters), EXPORT_FIELDS, export_format, use_gzip)
+
+@app.route('/api/topics')
+def topic_counts_api():
+    """API endpoint with the number of submissions per topic, optionally for one priority"""
+    priority = request.args.get('priority')
+    if priority is not None and priority not in VALID_PRIORITIES:
+        return jsonify({'error': f"priority must be one of {', '.join(VALID_PRIORITIES)}"}), 400
+    return jsonify({'priority': priority, 'topic_counts': get_topic_counts(priority)})
+
+@app.route('/api/database-status')
+def database_status():
+    """API endpoint reporting SQLite connection pool metrics"""
+    status = {'connected': True, 'database': DATABASE, 'pool': db_pool.stats(),
+              'attachments': attachment_store.stats(), 'idempotency': recent_submissions.stats(),
+              'rate_limits': rate_limiter.stats()}
+    if app.config['WRITE_BEHIND']:
+        status['write_behind'] = write_behind.stats()
+    return jsonify(status)
+
+@app.route('/api/validate-batch', methods=['POST'])
+def validate_batch_api():
+    """API endpoint validating many contact records (JSON array or NDJSON)"""
+    return validate_batch(request)
 
 @app.route('/api/validate-email', methods=['POST'])
 def validate_email_api():
@@ -336,11 +628,10 @@ def validate_email_api():
     data = request.get_json()
     email = data.get('email', '')
     
-    try:
-        validated_email = validate_email(email)
-        return jsonify({'valid': True, 'email': validated_email})
-    except ValidationError as e:
-        return jsonify({'valid': False, 'error': str(e)})
+    validated_email, error = email_validator.validate(email)
+    if error:
+        return jsonify({'valid': False, 'error': error})
+    return jsonify({'valid': True, 'email': validated_email})
 
 # Error handlers
 @app.errorhandler(404)
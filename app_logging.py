@@ -0,0 +1,179 @@
+"""
+Structured, non-blocking logging for the contact apps.
+
+log_event() puts a record on an in-memory queue and returns; a
+QueueListener thread formats it as one JSON object per line and writes it
+to stdout, so requests never wait on the terminal or log pipe. If the
+queue fills up, records are dropped (and counted) instead of blocking.
+
+- Disabled levels cost one isEnabledFor() check; build expensive debug
+  payloads inside `if log.isEnabledFor(logging.DEBUG):`.
+- Per-level sampling keeps only a fraction of, e.g., DEBUG events
+  (LOG_DEBUG_SAMPLE_RATE).
+- PII fields (email, phone, name) are masked before anything is written,
+  including inside nested dicts such as a form dump.
+
+Usage:
+    log = get_logger()
+    log_event(log, logging.INFO, 'submission_saved', submission_id=42, email='jane@example.com')
+    -> {"ts": "...", "level": "INFO", "logger": "contact_app", "event": "submission_saved",
+        "submission_id": 42, "email": "j***@example.com"}
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = 'contact_app'
+QUEUE_SIZE = 10000
+
+PII_FIELDS = frozenset({'email', 'phone', 'name'})
+
+_setup_lock = threading.Lock()
+_listener = None
+_handler = None
+
+
+def mask(field, value):
+    """Mask one PII value, keeping just enough to correlate log lines"""
+    if value is None or value == '':
+        return value
+    text = str(value)
+    if field == 'email' and '@' in text:
+        local, domain = text.rsplit('@', 1)
+        return f'{local[:1]}***@{domain}'
+    if field == 'phone':
+        return f'***{text[-2:]}' if len(text) > 2 else '***'
+    return f'{text[:1]}***'
+
+
+def redact(fields):
+    """Copy of fields with PII masked (one level of nested dicts included)"""
+    clean = {}
+    for key, value in fields.items():
+        if key in PII_FIELDS:
+            if isinstance(value, (list, tuple)):
+                value = [mask(key, item) for item in value]
+            else:
+                value = mask(key, value)
+        elif isinstance(value, dict):
+            value = redact(value)
+        clean[key] = value
+    return clean
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, event, then the event's fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(redact(fields))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep each record with the probability configured for its level"""
+
+    def __init__(self, sample_rates):
+        super().__init__()
+        self.sample_rates = {
+            level if isinstance(level, int) else logging.getLevelName(level): rate
+            for level, rate in sample_rates.items()
+        }
+
+    def filter(self, record):
+        rate = self.sample_rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of raising when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Unlike the base class, leave formatting to the listener thread
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(level=None, sample_rates=None, stream=None, queue_size=QUEUE_SIZE):
+    """Attach the queue handler and start the writer thread (once per process)
+
+    level defaults to $LOG_LEVEL (INFO); DEBUG sampling to $LOG_DEBUG_SAMPLE_RATE (1.0).
+    """
+    global _listener, _handler
+    with _setup_lock:
+        logger = logging.getLogger(LOGGER_NAME)
+        if _listener is not None:
+            return logger
+
+        level = level or os.environ.get('LOG_LEVEL', 'INFO').upper()
+        if sample_rates is None:
+            sample_rates = {'DEBUG': float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', 1.0))}
+
+        log_queue = queue.Queue(maxsize=queue_size)
+        writer = logging.StreamHandler(stream or sys.stdout)
+        writer.setFormatter(JSONFormatter())
+
+        _handler = DroppingQueueHandler(log_queue)
+        _handler.addFilter(SamplingFilter(sample_rates))
+
+        logger.setLevel(level)
+        logger.addHandler(_handler)
+        logger.propagate = False
+
+        _listener = QueueListener(log_queue, writer, respect_handler_level=False)
+        _listener.start()
+        atexit.register(_listener.stop)  # flush what is still queued
+        return logger
+
+
+def _restart_in_child():
+    """A forked worker inherits the queue but not the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener = QueueListener(_listener.queue, *_listener.handlers, respect_handler_level=False)
+        _listener.start()
+
+
+os.register_at_fork(after_in_child=_restart_in_child)
+
+
+def get_logger():
+    """The configured application logger"""
+    return configure_logging()
+
+
+def log_event(logger, level, event, **fields):
+    """Log a structured event; a no-op beyond one level check when disabled"""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={'fields': fields})
+
+
+def dropped_records():
+    """Records dropped because the log queue was full"""
+    return _handler.dropped if _handler is not None else 0
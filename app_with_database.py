@@ -1,19 +1,116 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 import os
-import re
-from datetime import datetime
+import atexit
+import logging
 from werkzeug.utils import secure_filename
+from werkzeug.middleware.proxy_fix import ProxyFix
 from supabase import create_client, Client
 import config
+from admin_stats import get_dashboard_stats, compute_stats_from_rows
+from export import parse_export_args, export_response, ExportError
+from validation import validate_form
+from email_validation import EmailValidator, load_domain_list
+from batch_api import validate_batch
+from page_cache import PageCache
+from static_assets import StaticAssets
+from streaming import stream_page
+from rate_limit import RateLimiter, RouteLimits, make_store, parse_limit
+from metrics import RequestMetrics, db_call, db_timer, count_validation_failures
+from app_logging import get_logger, log_event
+from idempotency import RecentSubmissions, FORM_FIELD, new_key, client_key, content_key
+from supabase_outbox import SupabaseOutbox
+from supabase_mirror import SupabaseMirror, MIRROR_COLUMNS
+from query_cache import QueryCache
+from health import HealthProbe
+from periodic import PeriodicTask
+from search_index import highlight
+from records import Submission
+
+try:
+    from analytics import SubmissionSnapshot, AnalyticsError, parse_analytics_args
+except ImportError:  # numpy not installed
+    SubmissionSnapshot = None
 
 # Create Flask application instance
 app = Flask(__name__)
 
+# Structured JSON logs written by a background thread
+log = get_logger()
+
 # Configuration
 app.config['SECRET_KEY'] = config.FLASK_SECRET_KEY
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = 'uploads'
 
+# Rendered static pages are cached in memory (PAGE_CACHE_ENABLED=0 disables
+# it, e.g. while editing templates)
+app.config['PAGE_CACHE_ENABLED'] = os.environ.get('PAGE_CACHE_ENABLED', '1') == '1'
+
+# Number of submissions listed on the admin dashboard
+ADMIN_LIST_LIMIT = 100
+
+# Columns written by /export/submissions, in output order
+EXPORT_FIELDS = ('id', 'name', 'email', 'phone', 'age', 'contact_date', 'priority', 'topics',
+                 'satisfaction', 'message', 'filename', 'form_version', 'timestamp', 'created_at')
+
+# Rows fetched per PostgREST request while exporting
+EXPORT_BATCH_SIZE = 1000
+
+# Local SQLite file holding submissions not yet delivered to Supabase
+OUTBOX_DATABASE = 'supabase_outbox.db'
+
+# Local SQLite mirror of contact_submissions serving reads (SUPABASE_MIRROR=0
+# disables it). Reads use the mirror while its last sync is at most
+# MAX_STALENESS seconds old, and while Supabase is down for up to
+# OUTAGE_MAX_STALENESS seconds; otherwise they go to Supabase.
+app.config['SUPABASE_MIRROR'] = os.environ.get('SUPABASE_MIRROR', '1') == '1'
+app.config['SUPABASE_MIRROR_DATABASE'] = os.environ.get('SUPABASE_MIRROR_DATABASE', 'supabase_mirror.db')
+app.config['SUPABASE_MIRROR_INTERVAL'] = float(os.environ.get('SUPABASE_MIRROR_INTERVAL', 10.0))  # seconds
+app.config['SUPABASE_MIRROR_MAX_STALENESS'] = float(os.environ.get('SUPABASE_MIRROR_MAX_STALENESS', 30.0))
+app.config['SUPABASE_MIRROR_OUTAGE_MAX_STALENESS'] = float(
+    os.environ.get('SUPABASE_MIRROR_OUTAGE_MAX_STALENESS', 86400.0))
+
+# Read-through cache for submission listings (set SUBMISSIONS_CACHE=0 to disable)
+app.config['SUBMISSIONS_CACHE'] = os.environ.get('SUBMISSIONS_CACHE', '1') == '1'
+app.config['SUBMISSIONS_CACHE_TTL'] = float(os.environ.get('SUBMISSIONS_CACHE_TTL', 5.0))  # seconds
+
+submissions_cache = QueryCache(ttl=app.config['SUBMISSIONS_CACHE_TTL'],
+                               enabled=app.config['SUBMISSIONS_CACHE'], name='submissions')
+
+# Idempotency keys of recent submissions, so repeats skip the outbox
+recent_submissions = RecentSubmissions()
+
+# Columnar snapshot of all submissions for /api/analytics and the admin
+# dashboard fallback (needs numpy; ANALYTICS_SNAPSHOT=0 disables it). It
+# follows the mirror when there is one; the refresh interval only applies
+# when it has to poll Supabase itself (SUPABASE_MIRROR=0).
+app.config['ANALYTICS_SNAPSHOT'] = os.environ.get('ANALYTICS_SNAPSHOT', '1') == '1' and SubmissionSnapshot is not None
+app.config['ANALYTICS_REFRESH_INTERVAL'] = float(os.environ.get('ANALYTICS_REFRESH_INTERVAL', 30.0))  # seconds
+
+# Database health is checked in the background; health endpoints read the cached result
+app.config['HEALTH_PROBE_INTERVAL'] = float(os.environ.get('HEALTH_PROBE_INTERVAL', 5.0))  # seconds
+app.config['HEALTH_PROBE_DEADLINE'] = float(os.environ.get('HEALTH_PROBE_DEADLINE', 15.0))  # stale after
+
+# Domains rejected by /api/validate-email, one per line (e.g. disposable providers)
+app.config['BLOCKED_EMAIL_DOMAINS_FILE'] = os.environ.get('BLOCKED_EMAIL_DOMAINS_FILE', 'blocked_email_domains.txt')
+
+# Token-bucket rate limits (RATE_LIMITS=0 disables them). Limits read as
+# "<requests>/<second|minute|hour|day>". RATE_LIMIT_STORE=sqlite shares the
+# buckets between worker processes through RATE_LIMIT_DATABASE.
+app.config['RATE_LIMITS'] = os.environ.get('RATE_LIMITS', '1') == '1'
+app.config['RATE_LIMIT_STORE'] = os.environ.get('RATE_LIMIT_STORE', 'memory')
+app.config['RATE_LIMIT_DATABASE'] = 'rate_limits.db'
+app.config['RATE_LIMIT_CONTACT_IP'] = os.environ.get('RATE_LIMIT_CONTACT_IP', '10/minute')
+app.config['RATE_LIMIT_CONTACT_EMAIL'] = os.environ.get('RATE_LIMIT_CONTACT_EMAIL', '5/minute')
+app.config['RATE_LIMIT_VALIDATE_EMAIL_IP'] = os.environ.get('RATE_LIMIT_VALIDATE_EMAIL_IP', '120/minute')
+
+# Reverse proxies in front of the app (nginx, a load balancer) whose
+# X-Forwarded-For is trusted. Per-IP rate limits key on the client address,
+# so behind a proxy this must be set or every visitor shares one bucket.
+app.config['TRUSTED_PROXIES'] = int(os.environ.get('TRUSTED_PROXIES', 0))
+if app.config['TRUSTED_PROXIES']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'])
+
 # Create upload directory if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
@@ -25,127 +122,95 @@ except Exception as e:
     print(f"❌ Error initializing Supabase client: {e}")
     supabase = None
 
-# Validation utilities (same as before)
-class ValidationError(Exception):
-    """Custom exception for validation errors"""
-    pass
+# Submissions are appended to a local outbox and sent to Supabase in the background
+outbox = None
+if supabase:
+    # New rows become visible once delivered, so delivery also invalidates the cache
+    outbox = SupabaseOutbox(OUTBOX_DATABASE, supabase, on_sent=submissions_cache.invalidate)
+    outbox.start()  # Deliver anything left over from a previous run
+    atexit.register(outbox.close)
 
-def validate_email(email):
-    """Validate email format using regex"""
-    if not email:
-        raise ValidationError("Email is required")
-    
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, email):
-        raise ValidationError("Please enter a valid email address")
-    
-    return email.lower().strip()
+@db_call('supabase', 'health_check')
+def check_database():
+    """Cheapest query that proves Supabase is reachable and the table exists"""
+    supabase.table('contact_submissions').select('id').limit(1).execute()
 
-def validate_name(name):
-    """Validate name field"""
-    if not name:
-        raise ValidationError("Name is required")
-    
-    name = name.strip()
-    if len(name) < 2:
-        raise ValidationError("Name must be at least 2 characters long")
-    
-    if len(name) > 50:
-        raise ValidationError("Name must be less than 50 characters")
-    
-    # Check for valid characters (letters, spaces, hyphens, apostrophes)
-    if not re.match(r"^[a-zA-Z\s\-']+$", name):
-        raise ValidationError("Name can only contain letters, spaces, hyphens, and apostrophes")
-    
-    return name
+health_probe = None
+if supabase:
+    health_probe = HealthProbe(check_database,
+                               interval=app.config['HEALTH_PROBE_INTERVAL'],
+                               deadline=app.config['HEALTH_PROBE_DEADLINE'])
+    health_probe.start()
 
-def validate_phone(phone):
-    """Validate phone number"""
-    if not phone:
-        return None  # Phone is optional
-    
-    # Remove all non-digit characters
-    phone_digits = re.sub(r'\D', '', phone)
-    
-    if len(phone_digits) < 10:
-        raise ValidationError("Phone number must have at least 10 digits")
-    
-    if len(phone_digits) > 15:
-        raise ValidationError("Phone number must have less than 15 digits")
-    
-    return phone_digits
+@db_call('supabase', 'mirror_page')
+def load_mirror_rows(since, limit):
+    """The mirrored columns of rows created at or after `since`, oldest first"""
+    query = supabase.table('contact_submissions').select(','.join(MIRROR_COLUMNS))
+    if since is not None:
+        query = query.gte('created_at', since)
+    return query.order('created_at').order('id').limit(limit).execute().data or []
 
-def validate_age(age_str):
-    """Validate age field"""
-    if not age_str:
-        raise ValidationError("Age is required")
-    
-    try:
-        age = int(age_str)
-    except ValueError:
-        raise ValidationError("Age must be a valid number")
-    
-    if age < 13:
-        raise ValidationError("You must be at least 13 years old")
-    
-    if age > 120:
-        raise ValidationError("Please enter a valid age")
-    
-    return age
+mirror = None
+if supabase and app.config['SUPABASE_MIRROR']:
+    mirror = SupabaseMirror(app.config['SUPABASE_MIRROR_DATABASE'], load_mirror_rows,
+                            max_staleness=app.config['SUPABASE_MIRROR_MAX_STALENESS'],
+                            outage_max_staleness=app.config['SUPABASE_MIRROR_OUTAGE_MAX_STALENESS'])
+
+@db_call('supabase', 'analytics_page')
+def load_submissions_since(since, limit):
+    """The snapshot's columns of rows created at or after `since`, oldest first"""
+    query = supabase.table('contact_submissions')\
+                    .select('id,created_at,priority,topics,satisfaction')
+    if since is not None:
+        query = query.gte('created_at', since)
+    return query.order('created_at').order('id').limit(limit).execute().data or []
 
-def validate_date(date_str):
-    """Validate date field"""
-    if not date_str:
-        return None  # Date is optional
+analytics_snapshot = None
+if supabase and app.config['ANALYTICS_SNAPSHOT']:
+    # Read from the mirror's local copy when there is one, so Supabase is polled once
+    analytics_snapshot = SubmissionSnapshot(mirror.rows_since if mirror else load_submissions_since)
+
+def sync_submissions():
+    """Pull new rows into the mirror, then from there into the analytics snapshot
     
+    The snapshot is refreshed even when the mirror sync fails, so it still
+    loads what the mirror already holds during an outage.
+    """
     try:
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-        
-        # Check if date is not in the future
-        if date_obj.date() > datetime.now().date():
-            raise ValidationError("Date cannot be in the future")
-        
-        return date_obj.date()
-    except ValueError:
-        raise ValidationError("Please enter a valid date")
-
-def validate_message(message):
-    """Validate message field"""
-    if not message:
-        raise ValidationError("Message is required")
-    
-    message = message.strip()
-    if len(message) < 10:
-        raise ValidationError("Message must be at least 10 characters long")
-    
-    if len(message) > 1000:
-        raise ValidationError("Message must be less than 1000 characters")
-    
-    return message
+        if mirror:
+            mirror.sync()
+    finally:
+        if analytics_snapshot:
+            analytics_snapshot.refresh()
 
-def validate_file(file):
-    """Validate uploaded file"""
-    if not file or file.filename == '':
-        return None  # File is optional
-    
-    # Check file size (already handled by Flask config, but good to double-check)
-    if request.content_length > app.config['MAX_CONTENT_LENGTH']:
-        raise ValidationError("File size too large. Maximum size is 16MB")
-    
-    # Check file extension
-    allowed_extensions = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx'}
-    filename = file.filename.lower()
-    
-    if '.' not in filename or filename.rsplit('.', 1)[1] not in allowed_extensions:
-        raise ValidationError(f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}")
+# One background job keeps both local copies current; reads never wait for it
+submissions_sync = None
+if mirror or analytics_snapshot:
+    interval = app.config['SUPABASE_MIRROR_INTERVAL'] if mirror else app.config['ANALYTICS_REFRESH_INTERVAL']
+    submissions_sync = PeriodicTask(sync_submissions, interval, name='submissions-sync')
+    submissions_sync.start()
+
+def read_submissions(load_remote, load_local):
+    """load_local() from the mirror when it can serve the read, else load_remote()
     
-    return file
+    A failing or stale health probe counts as Supabase being down, so
+    reads during an outage go to the mirror without waiting on Supabase.
+    """
+    if not mirror:
+        return load_remote()
+    remote_up = health_probe.state()['status'] not in ('error', 'stale')
+    return mirror.read_through(load_remote, load_local, remote_up=remote_up)
 
 # Database functions
+@db_call('sqlite', 'outbox_append')
 def save_contact_submission(validated_data):
-    """Save validated contact form data to Supabase database"""
-    if not supabase:
-        print("❌ Supabase client not available")
+    """Queue validated contact form data for the Supabase database
+    
+    The row is committed to the local outbox and delivered by its sender
+    thread, so the request never waits on Supabase. Returns the outbox ID.
+    """
+    if not outbox:
+        log_event(log, logging.WARNING, 'supabase_unavailable')
         return False
     
     try:
@@ -165,44 +230,101 @@ def save_contact_submission(validated_data):
             'timestamp': validated_data.get('timestamp')
         }
         
-        # Insert data into Supabase
-        result = supabase.table('contact_submissions').insert(db_data).execute()
-        
-        if result.data:
-            print(f"✅ Contact submission saved to database with ID: {result.data[0]['id']}")
-            return result.data[0]['id']
-        else:
-            print("❌ Failed to save contact submission")
-            return False
+        # The form's idempotency key doubles as the Supabase dedupe key
+        outbox_id, _ = outbox.append(db_data, dedupe_key=validated_data.get('idempotency_key'))
+        submissions_cache.invalidate()
+        return outbox_id
             
     except Exception as e:
-        print(f"❌ Database error: {e}")
+        log_event(log, logging.ERROR, 'outbox_append_failed', error=str(e))
         return False
 
 def get_contact_submissions(limit=10):
-    """Retrieve recent contact submissions from database"""
+    """Retrieve recent contact submissions from the mirror or Supabase (cached for a few seconds)"""
     if not supabase:
         return []
     
-    try:
+    @db_call('supabase', 'select_recent')
+    def load_remote():
         result = supabase.table('contact_submissions')\
                         .select('*')\
                         .order('created_at', desc=True)\
                         .limit(limit)\
                         .execute()
-        
         return result.data if result.data else []
+    
+    def load():
+        return read_submissions(load_remote, lambda: mirror.recent(limit))
+    
+    try:
+        # Keyed by the query shape: table, order and limit
+        return submissions_cache.get_or_load(('contact_submissions', 'created_at.desc', limit), load)
     except Exception as e:
-        print(f"❌ Error retrieving submissions: {e}")
+        log_event(log, logging.ERROR, 'submissions_query_failed', error=str(e))
         return []
 
+def iter_contact_submissions(filters, batch_size=EXPORT_BATCH_SIZE, newest_first=False):
+    """Yield matching submissions, oldest (or newest) first, one PostgREST page at a time
+    
+    Pages are fetched by keyset on id, so every request is an index range
+    scan and only one page is held in memory.
+    """
+    last_id = None
+    while True:
+        query = supabase.table('contact_submissions').select('*')
+        if last_id is not None:
+            query = query.lt('id', last_id) if newest_first else query.gt('id', last_id)
+        if 'since' in filters:
+            query = query.gte('created_at', filters['since'].isoformat())
+        if 'before' in filters:
+            query = query.lt('created_at', filters['before'].isoformat())
+        if 'priority' in filters:
+            query = query.eq('priority', filters['priority'])
+        
+        with db_timer('supabase', 'export_page'):
+            rows = query.order('id', desc=newest_first).limit(batch_size).execute().data or []
+        yield from rows
+        
+        if len(rows) < batch_size:
+            break
+        last_id = rows[-1]['id']
+
+# Request counts, latency histograms and DB timings, exposed on /metrics
+request_metrics = RequestMetrics(app)
+
+# Throttled requests get a 429 before their body is read
+rate_limiter = RateLimiter(
+    app,
+    make_store(app.config['RATE_LIMIT_STORE'], app.config['RATE_LIMIT_DATABASE']),
+    {
+        'contact': RouteLimits(ip=parse_limit(app.config['RATE_LIMIT_CONTACT_IP']),
+                               email=parse_limit(app.config['RATE_LIMIT_CONTACT_EMAIL'])),
+        'validate_email_api': RouteLimits(ip=parse_limit(app.config['RATE_LIMIT_VALIDATE_EMAIL_IP'])),
+    },
+    enabled=app.config['RATE_LIMITS'],
+)
+
+# Memoized /api/validate-email results, per address and per domain
+email_validator = EmailValidator(load_domain_list(app.config['BLOCKED_EMAIL_DOMAINS_FILE']))
+
+# Fingerprinted, precompressed CSS/JS from build_assets.py, served from /assets
+static_assets = StaticAssets(app)
+
+# Filter used by submissions.html, shared with app.py
+app.jinja_env.filters['highlight'] = highlight
+
+# Rendered output of the static template pages, reused across requests
+page_cache = PageCache(enabled=app.config['PAGE_CACHE_ENABLED'])
+
 # Routes
 @app.route('/')
+@page_cache.cached
 def home():
     """Home page route"""
     return render_template('index.html', title='Python Web App')
 
 @app.route('/about')
+@page_cache.cached
 def about():
     """About page route"""
     return render_template('about.html', title='About')
@@ -211,100 +333,34 @@ def about():
 def contact():
     """Enhanced contact page with comprehensive server-side validation and database storage"""
     if request.method == 'POST':
-        # DEBUG: Print all form data received
-        print("🔍 DEBUG Form data received:")
-        for key, value in request.form.items():
-            print(f"  {key}: {value}")
-        print(f"  topics (getlist): {request.form.getlist('topics')}")
-        print("=" * 50)
-        
-        errors = []
-        validated_data = {}
-        
-        try:
-            # Validate each field individually
-            validated_data['name'] = validate_name(request.form.get('name'))
-        except ValidationError as e:
-            errors.append(f"Name: {str(e)}")
-        
-        try:
-            validated_data['email'] = validate_email(request.form.get('email'))
-        except ValidationError as e:
-            errors.append(f"Email: {str(e)}")
-        
-        try:
-            validated_data['phone'] = validate_phone(request.form.get('phone'))
-        except ValidationError as e:
-            errors.append(f"Phone: {str(e)}")
-        
-        try:
-            validated_data['age'] = validate_age(request.form.get('age'))
-        except ValidationError as e:
-            errors.append(f"Age: {str(e)}")
-        
-        try:
-            validated_data['date'] = validate_date(request.form.get('date'))
-        except ValidationError as e:
-            errors.append(f"Date: {str(e)}")
-        
-        try:
-            validated_data['message'] = validate_message(request.form.get('message'))
-        except ValidationError as e:
-            errors.append(f"Message: {str(e)}")
-        
-        # Validate select field
-        priority = request.form.get('priority')
-        if priority not in ['low', 'medium', 'high']:
-            errors.append("Priority: Please select a valid priority level")
-        else:
-            validated_data['priority'] = priority
-        
-        # Validate checkboxes (topics) - topics are optional
-        topics = request.form.getlist('topics')
-        valid_topics = ['web-development', 'mobile-apps', 'data-science', 'ai-ml', 'cybersecurity']
-        
-        # DEBUG: Print what we received
-        print(f"🔍 DEBUG Topics received: {topics}")
-        print(f"🔍 DEBUG Valid topics: {valid_topics}")
-        
-        # Only validate if topics were selected
-        if topics:
-            invalid_topics = [topic for topic in topics if topic not in valid_topics]
-            if invalid_topics:
-                print(f"❌ DEBUG Invalid topics found: {invalid_topics}")
-                errors.append(f"Topics: Invalid topics selected: {', '.join(invalid_topics)}")
-            else:
-                print(f"✅ DEBUG All topics valid: {topics}")
-                validated_data['topics'] = topics
-        else:
-            # No topics selected is valid
-            print("ℹ️ DEBUG No topics selected")
-            validated_data['topics'] = []
-        
-        # Validate range input
-        try:
-            satisfaction = int(request.form.get('satisfaction', 0))
-            if satisfaction < 1 or satisfaction > 10:
-                errors.append("Satisfaction: Please select a value between 1 and 10")
-            else:
-                validated_data['satisfaction'] = satisfaction
-        except ValueError:
-            errors.append("Satisfaction: Invalid satisfaction rating")
-        
-        # Validate file upload
-        try:
-            file = request.files.get('attachment')
-            validated_file = validate_file(file)
-            if validated_file:
-                filename = secure_filename(validated_file.filename)
-                # In a real app, you'd save the file here
-                validated_data['filename'] = filename
-        except ValidationError as e:
-            errors.append(f"File: {str(e)}")
+        # Per-address limit, checked before any validation or database work
+        throttled = rate_limiter.check('email', request.form.get('email'))
+        if throttled:
+            return throttled
+        
+        # DEBUG: log all form data received (built only when DEBUG is enabled)
+        if log.isEnabledFor(logging.DEBUG):
+            log_event(log, logging.DEBUG, 'contact_form_received',
+                      form=request.form.to_dict(), topics=request.form.getlist('topics'))
+        
+        # Validate every field in one pass
+        result = validate_form(request.form, request.files, request.content_length,
+                               app.config['MAX_CONTENT_LENGTH'])
+        errors = result.messages()
+        validated_data = result.data
+        count_validation_failures(result.errors)
+        
+        # Validate file upload - keep only the safe file name
+        validated_file = validated_data.pop('attachment', None)
+        if validated_file:
+            filename = secure_filename(validated_file.filename)
+            # In a real app, you'd save the file here
+            validated_data['filename'] = filename
         
         # Add hidden fields
         validated_data['form_version'] = request.form.get('form_version', '2.0')
         validated_data['timestamp'] = request.form.get('timestamp')
+        form_key = client_key(request.form.get(FORM_FIELD))
         
         # If there are validation errors, show them
         if errors:
@@ -335,25 +391,40 @@ def contact():
                 smart_form_data['topics'] = request.form.getlist('topics')
             
             
-            return render_template('contact.html', title='Contact', form_data=smart_form_data, validation_errors=errors)
+            return render_template('contact.html', title='Contact', form_data=smart_form_data,
+                                   validation_errors=errors, idempotency_key=form_key or new_key())
+        
+        # A repeat of a form already submitted (double click, browser retry)
+        # gets the original reference without writing anything
+        validated_data['idempotency_key'] = form_key
+        dedupe_key = form_key or content_key(validated_data)
+        claimed, submission_id = recent_submissions.claim(dedupe_key)
+        if not claimed:
+            if submission_id is None:
+                flash(f'Thank you {validated_data["name"]}! Your message is already being saved.', 'success')
+            else:
+                flash(f'Thank you {validated_data["name"]}! Your message has already been received (Reference: {submission_id}).', 'success')
+            return redirect(url_for('contact'))
         
         # If validation passes, save to database
         submission_id = save_contact_submission(validated_data)
+        if submission_id:
+            recent_submissions.complete(dedupe_key, submission_id)
+        else:
+            recent_submissions.release(dedupe_key)
         
         if submission_id:
-            flash(f'Thank you {validated_data["name"]}! Your message has been received and saved to the database (ID: {submission_id}).', 'success')
+            flash(f'Thank you {validated_data["name"]}! Your message has been received and saved (Reference: {submission_id}).', 'success')
         else:
             flash(f'Thank you {validated_data["name"]}! Your message has been received (but there was an issue saving to database).', 'warning')
         
-        # Log the validated data
-        print("=== VALIDATED FORM DATA ===")
-        for key, value in validated_data.items():
-            print(f"{key}: {value}")
-        print("===========================")
+        # Log the validated data (PII is masked by the log writer)
+        log_event(log, logging.INFO, 'submission_queued', submission_id=submission_id,
+                  submission=dict(validated_data))
         
         return redirect(url_for('contact'))
     
-    return render_template('contact.html', title='Contact')
+    return render_template('contact.html', title='Contact', idempotency_key=new_key())
 
 @app.route('/submissions')
 def submissions():
@@ -362,7 +433,7 @@ def submissions():
         flash('Database connection not available', 'error')
         return redirect(url_for('home'))
     
-    submissions = get_contact_submissions(limit=20)
+    submissions = [Submission.from_record(record) for record in get_contact_submissions(limit=20)]
     return render_template('submissions.html', title='Contact Submissions', submissions=submissions)
 
 @app.route('/database-demo')
@@ -371,97 +442,160 @@ def database_demo():
     return render_template('database_demo.html', title='Database Integration Demo')
 
 @app.route('/validation-demo')
+@page_cache.cached
 def validation_demo():
     """Page explaining server-side validation concepts"""
     return render_template('validation_demo.html', title='Server-Side Validation Demo')
 
 @app.route('/form-demo')
+@page_cache.cached
 def form_demo():
     """Educational page about form concepts"""
     return render_template('form_demo.html', title='Form Demo')
 
+@app.route('/api/validate-batch', methods=['POST'])
+def validate_batch_api():
+    """API endpoint validating many contact records (JSON array or NDJSON)"""
+    return validate_batch(request)
+
 @app.route('/api/validate-email', methods=['POST'])
 def validate_email_api():
     """API endpoint for real-time email validation"""
     data = request.get_json()
     email = data.get('email', '')
     
+    validated_email, error = email_validator.validate(email)
+    if error:
+        return jsonify({'valid': False, 'error': error})
+    return jsonify({'valid': True, 'email': validated_email})
+
+@app.route('/export/submissions')
+def export_submissions():
+    """Stream all matching submissions as CSV or NDJSON"""
+    if not supabase:
+        return jsonify({'error': 'Supabase client not initialized'}), 503
+    
     try:
-        validated_email = validate_email(email)
-        return jsonify({'valid': True, 'email': validated_email})
-    except ValidationError as e:
-        return jsonify({'valid': False, 'error': str(e)})
+        export_format, filters, use_gzip = parse_export_args(request.args)
+    except ExportError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    records = read_submissions(lambda: iter_contact_submissions(filters),
+                               lambda: mirror.iter_records(filters))
+    return export_response(records, EXPORT_FIELDS, export_format, use_gzip)
+
+@app.route('/api/analytics')
+def analytics_api():
+    """API endpoint with counts, average satisfaction and a histogram of submissions
+    
+    Filters: since/until (YYYY-MM-DD), priority, topic; bucket is hour, day
+    or week. Answered from the in-memory snapshot, which may be one
+    background sync behind.
+    """
+    if not analytics_snapshot:
+        return jsonify({'error': 'Analytics snapshot not available'}), 503
+    try:
+        filters, bucket = parse_analytics_args(request.args)
+    except AnalyticsError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not analytics_snapshot.stats()['refreshed_at']:
+        return jsonify({'error': 'Analytics snapshot is still loading',
+                        'refresh': submissions_sync.state()}), 503
+    
+    report = analytics_snapshot.report(bucket, **filters)
+    report['as_of'] = analytics_snapshot.stats()['watermark']
+    return jsonify(report)
 
 @app.route('/api/database-status')
 def database_status():
-    """API endpoint to check database connection status"""
+    """API endpoint reporting the last background database health check"""
     if not supabase:
         return jsonify({'connected': False, 'error': 'Supabase client not initialized'})
     
+    probe = health_probe.state()
+    status = {'connected': probe['status'] == 'ok', 'probe': probe,
+              'outbox': outbox.stats(), 'cache': submissions_cache.stats(),
+              'idempotency': recent_submissions.stats(), 'rate_limits': rate_limiter.stats()}
+    if mirror:
+        status['mirror'] = dict(mirror.stats(), sync=submissions_sync.state())
+    if analytics_snapshot:
+        status['analytics'] = dict(analytics_snapshot.stats(), refresh=submissions_sync.state())
+    if probe['status'] == 'ok':
+        status['message'] = 'Database connection successful'
+    elif probe['status'] == 'stale':
+        status['error'] = f"No health check completed in the last {health_probe.deadline:g}s"
+    else:
+        status['error'] = probe['last_error'] or 'Health check has not completed yet'
+    return jsonify(status)
+
+@app.route('/health/live')
+def liveness():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'alive'})
+
+@app.route('/health/ready')
+def readiness():
+    """Readiness: the last database health check succeeded and is recent"""
+    if not supabase:
+        return jsonify({'ready': False, 'error': 'Supabase client not initialized'}), 503
+    
+    probe = health_probe.state()
+    ready = probe['status'] == 'ok'
+    return jsonify({'ready': ready, 'probe': probe}), 200 if ready else 503
+
+def load_dashboard_stats():
+    """Dashboard stats from the Supabase counter tables"""
     try:
-        # Try a simple query to test connection
-        result = supabase.table('contact_submissions').select('count').execute()
-        return jsonify({'connected': True, 'message': 'Database connection successful'})
+        with db_timer('supabase', 'dashboard_stats'):
+            return get_dashboard_stats(supabase)
     except Exception as e:
-        return jsonify({'connected': False, 'error': str(e)})
+        # Counter tables not created yet - use the analytics snapshot once
+        # it has loaded, else fall back to a full scan
+        log_event(log, logging.WARNING, 'dashboard_counters_unavailable', error=str(e))
+        if analytics_snapshot and analytics_snapshot.stats()['refreshed_at']:
+            return analytics_snapshot.dashboard_stats()
+        all_submissions = supabase.table('contact_submissions').select('*').execute()
+        return compute_stats_from_rows(all_submissions.data or [])
+
+def load_admin_recent():
+    """The submissions listed on the admin dashboard, newest first"""
+    with db_timer('supabase', 'admin_recent'):
+        recent = supabase.table('contact_submissions')\
+                         .select('*')\
+                         .order('created_at', desc=True)\
+                         .limit(ADMIN_LIST_LIMIT)\
+                         .execute()
+    return recent.data or []
 
 @app.route('/admin')
 def admin():
-    """Admin dashboard to view all contact submissions with statistics"""
+    """Admin dashboard to view all contact submissions with statistics
+    
+    ?all=1 lists every submission instead of the most recent ones, streamed
+    from the mirror (or page by page from Supabase) as the dashboard is rendered.
+    """
     if not supabase:
         flash('Database connection not available', 'error')
         return redirect(url_for('home'))
     
     try:
-        # Get all submissions
-        all_submissions = supabase.table('contact_submissions')\
-                                .select('*')\
-                                .order('created_at', desc=True)\
-                                .execute()
-        
-        submissions = all_submissions.data if all_submissions.data else []
-        
-        # Calculate statistics
-        stats = {
-            'total_submissions': len(submissions),
-            'priority_counts': {'high': 0, 'medium': 0, 'low': 0},
-            'priority_percentages': {'high': 0, 'medium': 0, 'low': 0},
-            'topic_counts': {},
-            'avg_satisfaction': 0,
-            'recent_submissions': len([s for s in submissions if s.get('created_at') and 
-                                     (datetime.now() - datetime.fromisoformat(s['created_at'].replace('Z', '+00:00'))).days <= 7])
-        }
-        
-        # Calculate priority distribution
-        for submission in submissions:
-            priority = submission.get('priority', 'low')
-            if priority in stats['priority_counts']:
-                stats['priority_counts'][priority] += 1
-        
-        # Calculate priority percentages
-        if stats['total_submissions'] > 0:
-            for priority in stats['priority_counts']:
-                stats['priority_percentages'][priority] = round(
-                    (stats['priority_counts'][priority] / stats['total_submissions']) * 100, 1
-                )
-        
-        # Calculate topic popularity
-        for submission in submissions:
-            topics = submission.get('topics', [])
-            if topics:
-                for topic in topics:
-                    stats['topic_counts'][topic] = stats['topic_counts'].get(topic, 0) + 1
+        stats = read_submissions(load_dashboard_stats, lambda: mirror.dashboard_stats())
         
-        # Calculate average satisfaction
-        if submissions:
-            total_satisfaction = sum(s.get('satisfaction', 0) for s in submissions)
-            stats['avg_satisfaction'] = round(total_satisfaction / len(submissions), 1)
+        if request.args.get('all') == '1':
+            records = read_submissions(lambda: iter_contact_submissions({}, newest_first=True),
+                                       lambda: mirror.iter_records({}, newest_first=True))
+            return stream_page('admin.html', title='Admin Dashboard', stats=stats,
+                               submissions=(Submission.from_record(record) for record in records))
         
+        # Otherwise only the most recent submissions are listed
+        recent = read_submissions(load_admin_recent, lambda: mirror.recent(ADMIN_LIST_LIMIT))
+        submissions = [Submission.from_record(record) for record in recent]
         return render_template('admin.html', title='Admin Dashboard', 
                              submissions=submissions, stats=stats)
         
     except Exception as e:
-        print(f"❌ Error retrieving admin data: {e}")
+        log_event(log, logging.ERROR, 'admin_query_failed', error=str(e))
         flash('Error retrieving admin data', 'error')
         return redirect(url_for('home'))
 
@@ -0,0 +1,141 @@
+"""
+Content-addressed storage for contact form attachments.
+
+Uploaded files are stored once per distinct content under their SHA-256,
+e.g. uploads/blobs/3f/3fa9...e1, and submissions reference the hash.
+Identical uploads therefore share one file on disk.
+
+UploadRequest makes Werkzeug write every uploaded file straight into a
+temporary file inside the store while hashing it chunk by chunk as it is
+parsed, so no upload is ever held in memory and saving a file is just a
+hard link from the temporary file to its blob path.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+from flask import Request
+
+CHUNK_SIZE = 64 * 1024
+
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+class HashingTempFile:
+    """A temporary file that computes its SHA-256 as it is written"""
+
+    def __init__(self, directory):
+        # Removed automatically when Werkzeug closes the request's files
+        self._file = tempfile.NamedTemporaryFile(dir=directory, prefix='upload-', delete=True)
+        self.hasher = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.hasher.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+
+class AttachmentStore:
+    """Stores uploads under uploads/blobs/<first two hex digits>/<sha256>"""
+
+    def __init__(self, root, chunk_size=CHUNK_SIZE):
+        self.root = root
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.tmp_dir = os.path.join(root, 'tmp')
+        self.chunk_size = chunk_size
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._stats = {'stored': 0, 'deduplicated': 0, 'bytes_stored': 0, 'bytes_deduplicated': 0}
+
+    def path_for(self, digest):
+        """Blob path for a SHA-256 hex digest"""
+        if not SHA256_PATTERN.match(digest):
+            raise ValueError('Not a SHA-256 hex digest')
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def save(self, file_storage):
+        """Store an uploaded file; returns (sha256 hex digest, size in bytes)"""
+        stream = file_storage.stream
+        if isinstance(stream, HashingTempFile):
+            # Already on disk and hashed while Werkzeug parsed the upload
+            stream.flush()
+            digest, size = stream.hasher.hexdigest(), stream.size
+            self._publish(stream.name, digest, size, link=True)
+            return digest, size
+
+        # Any other stream: copy it to disk in chunks, hashing on the way
+        hasher = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=self.tmp_dir, prefix='upload-', delete=False) as tmp:
+            while True:
+                chunk = stream.read(self.chunk_size)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                size += len(chunk)
+                tmp.write(chunk)
+
+        digest = hasher.hexdigest()
+        self._publish(tmp.name, digest, size, link=False)
+        return digest, size
+
+    def _publish(self, tmp_path, digest, size, link):
+        """Move or link a finished temporary file to its blob path"""
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            if not link:
+                os.unlink(tmp_path)
+            with self._lock:
+                self._stats['deduplicated'] += 1
+                self._stats['bytes_deduplicated'] += size
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if link:
+            try:
+                os.link(tmp_path, path)
+            except FileExistsError:
+                pass  # Same content uploaded concurrently
+            except OSError:
+                # Filesystem without hard links
+                shutil.copyfile(tmp_path, path + '.partial')
+                os.replace(path + '.partial', path)
+        else:
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self._stats['stored'] += 1
+            self._stats['bytes_stored'] += size
+
+    def exists(self, digest):
+        """True if a blob with this digest is stored"""
+        return os.path.exists(self.path_for(digest))
+
+    def stats(self):
+        """Return a snapshot of the store metrics"""
+        with self._lock:
+            return dict(self._stats)
+
+    def request_class(self):
+        """A Flask Request class whose uploads stream into this store"""
+        store = self
+
+        class UploadRequest(Request):
+            def _get_file_stream(self, total_content_length, content_type, filename=None,
+                                 content_length=None):
+                return HashingTempFile(store.tmp_dir)
+
+        return UploadRequest
@@ -0,0 +1,108 @@
+"""
+Batch validation endpoint shared by the app variants (/api/validate-batch).
+
+Accepts either
+- a JSON array of contact records (Content-Type: application/json), answered
+  with one JSON document, or
+- NDJSON, one record per line (Content-Type: application/x-ndjson), answered
+  with a streamed NDJSON response, one result line per input line.
+
+Records are validated with the same schema as the contact form, in chunks
+of CHUNK_SIZE. MAX_BATCH_RECORDS bounds the work and the response size of a
+single call.
+"""
+
+import json
+from itertools import islice
+
+from flask import Response, jsonify, stream_with_context
+
+from validation import validate_records
+
+MAX_BATCH_RECORDS = 10000
+CHUNK_SIZE = 500
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Marks the end of the record stream
+_END = object()
+
+
+def _summary(total, invalid):
+    return {'total': total, 'valid': total - invalid, 'invalid': invalid}
+
+
+def validate_json_batch(request):
+    """Validate a JSON array of records in one response"""
+    records = request.get_json(silent=True)
+    if not isinstance(records, list):
+        return jsonify({'error': 'Expected a JSON array of records'}), 400
+    if len(records) > MAX_BATCH_RECORDS:
+        return jsonify({'error': f'At most {MAX_BATCH_RECORDS} records per request'}), 413
+
+    results = []
+    invalid = 0
+    for start in range(0, len(records), CHUNK_SIZE):
+        for result in validate_records(records[start:start + CHUNK_SIZE], start):
+            invalid += not result['valid']
+            results.append(result)
+
+    return jsonify({'results': results, 'summary': _summary(len(records), invalid)})
+
+
+def _read_lines(stream, block_size=64 * 1024):
+    """Split a byte stream into lines, reading it in large blocks"""
+    pending = b''
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        lines = (pending + block).split(b'\n')
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def _parse_lines(lines):
+    """Decode NDJSON lines; undecodable lines become a non-dict placeholder"""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def validate_ndjson_batch(request):
+    """Validate an NDJSON stream chunk by chunk, streaming results back"""
+    def generate():
+        records = _parse_lines(_read_lines(request.stream))
+        index = 0
+        invalid = 0
+        while index < MAX_BATCH_RECORDS:
+            chunk = list(islice(records, min(CHUNK_SIZE, MAX_BATCH_RECORDS - index)))
+            if not chunk:
+                break
+            lines = []
+            for result in validate_records(chunk, index):
+                invalid += not result['valid']
+                lines.append(json.dumps(result))
+            index += len(chunk)
+            yield '\n'.join(lines) + '\n'
+
+        summary = {'summary': _summary(index, invalid)}
+        if next(records, _END) is not _END:
+            summary['error'] = f'Stopped after {MAX_BATCH_RECORDS} records'
+        yield json.dumps(summary) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def validate_batch(request):
+    """Dispatch on Content-Type to the JSON or NDJSON handler"""
+    if request.mimetype == NDJSON_MIMETYPE:
+        return validate_ndjson_batch(request)
+    return validate_json_batch(request)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dashboard queries on the columnar analytics snapshot vs. a scan over dicts.
+
+Generates --rows submission records shaped like Supabase rows (1M by
+default, spread over the last year), loads them into a SubmissionSnapshot
+through refresh() in PostgREST-sized pages, then times filtered counts,
+averages and histograms, and compares the full dashboard statistics with
+admin_stats.compute_stats_from_rows(), which loops over the dicts.
+
+Usage:
+    python bench_analytics.py [--rows 1000000] [--queries 200]
+"""
+
+import argparse
+import bisect
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+
+from admin_stats import compute_stats_from_rows
+from analytics import SubmissionSnapshot
+from topics import TOPIC_BITS
+from validation import VALID_PRIORITIES
+
+YEAR = 365 * 86400
+
+
+def generate_rows(count, seed=1):
+    rng = random.Random(seed)
+    now = int(time.time())
+    created = sorted(rng.randrange(now - YEAR, now) for _ in range(count))
+    topics = list(TOPIC_BITS)
+    rows = []
+    for i, seconds in enumerate(created, 1):
+        rows.append({
+            'id': i,
+            'created_at': datetime.fromtimestamp(seconds, timezone.utc).isoformat(),
+            'priority': rng.choice(VALID_PRIORITIES),
+            'topics': rng.sample(topics, rng.randint(0, 3)),
+            'satisfaction': rng.randint(1, 10) if rng.random() < 0.9 else None,
+        })
+    return rows
+
+
+def page_loader(rows):
+    """load_since() over an in-memory list, like the PostgREST query in app_with_database.py"""
+    keys = [row['created_at'] for row in rows]
+
+    def load_since(since, limit):
+        start = bisect.bisect_left(keys, since) if since is not None else 0
+        return rows[start:start + limit]
+
+    return load_since
+
+
+def timed(label, func, queries):
+    samples = []
+    for _ in range(queries):
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    p50 = statistics.median(samples) * 1000
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+    print(f"{label:40} p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rows = generate_rows(args.rows)
+    print(f"generated {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+    snapshot = SubmissionSnapshot(page_loader(rows))
+    started = time.perf_counter()
+    snapshot.refresh()
+    print(f"initial refresh in {time.perf_counter() - started:.1f}s, "
+          f"{snapshot.stats()['memory_bytes'] / 1e6:.1f} MB of columns")
+    timed('incremental refresh (no new rows)', snapshot.refresh, 20)
+
+    now = int(time.time())
+    week_ago, month_ago = now - 7 * 86400, now - 30 * 86400
+    timed('count()', lambda: snapshot.count(), args.queries)
+    timed("count(priority='high', topic='ai-ml')",
+          lambda: snapshot.count(priority='high', topic='ai-ml'), args.queries)
+    timed('count(since=week_ago)', lambda: snapshot.count(since=week_ago), args.queries)
+    timed("average_satisfaction(topic='ai-ml')",
+          lambda: snapshot.average_satisfaction(topic='ai-ml'), args.queries)
+    timed('topic_counts()', snapshot.topic_counts, args.queries)
+    timed('histogram(day, last 30 days)', lambda: snapshot.histogram(86400, month_ago), args.queries)
+    timed('histogram(day, whole year)', lambda: snapshot.histogram(86400, now - YEAR), args.queries)
+    timed("histogram(day, 30 days, priority='high')",
+          lambda: snapshot.histogram(86400, month_ago, priority='high'), args.queries)
+    columnar = timed('dashboard_stats()', snapshot.dashboard_stats, args.queries)
+    scanned = timed('compute_stats_from_rows() over dicts', lambda: compute_stats_from_rows(rows), 3)
+
+    assert columnar['total_submissions'] == scanned['total_submissions']
+    assert columnar['topic_counts'] == scanned['topic_counts']
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/validate-batch throughput in records per second.
+
+Posts MAX_BATCH_RECORDS-sized batches (half valid, half invalid records)
+through Flask's test client, as a JSON array and as NDJSON, and compares
+them with one /api/validate-email style call per record.
+
+Usage:
+    python bench_batch_validation.py [--records 10000] [--rounds 3]
+"""
+
+import argparse
+import json
+import time
+
+from flask import Flask, request
+
+from batch_api import validate_batch, MAX_BATCH_RECORDS
+from validation import validate_field
+
+VALID = {'name': 'Jane Doe', 'email': 'jane@example.com', 'phone': '555-123-4567', 'age': 30,
+         'date': '2024-01-15', 'priority': 'medium', 'topics': ['ai-ml'], 'satisfaction': 8,
+         'message': 'Hello, this is a perfectly reasonable message.'}
+INVALID = {'name': 'J', 'email': 'not-an-email', 'age': 'ten', 'priority': 'urgent',
+           'topics': ['cooking'], 'satisfaction': 11, 'message': 'Hi'}
+
+app = Flask(__name__)
+
+
+@app.route('/api/validate-batch', methods=['POST'])
+def validate_batch_api():
+    return validate_batch(request)
+
+
+@app.route('/api/validate-email', methods=['POST'])
+def validate_email_api():
+    email, error = validate_field('email', request.get_json().get('email', ''))
+    return {'valid': error is None, 'email': email, 'error': error}
+
+
+def timed(label, records, rounds, func):
+    """Run func() `rounds` times and print the best records/sec"""
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:28} {records:6d} records in {best * 1000:8.1f} ms = {records / best:10.0f} records/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--records', type=int, default=MAX_BATCH_RECORDS)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    records = [VALID if i % 2 else INVALID for i in range(args.records)]
+    ndjson = '\n'.join(json.dumps(record) for record in records) + '\n'
+    client = app.test_client()
+
+    def post_json():
+        response = client.post('/api/validate-batch', json=records)
+        assert response.json['summary']['total'] == args.records
+
+    def post_ndjson():
+        response = client.post('/api/validate-batch', data=ndjson, content_type='application/x-ndjson')
+        assert response.data.count(b'\n') == args.records + 1
+
+    def one_by_one():
+        for record in records[:1000]:
+            client.post('/api/validate-email', json={'email': record['email']})
+
+    timed('JSON array batch', args.records, args.rounds, post_json)
+    timed('NDJSON stream batch', args.records, args.rounds, post_ndjson)
+    timed('validate-email per record', 1000, args.rounds, one_by_one)
+
+
+if __name__ == '__main__':
+    main()
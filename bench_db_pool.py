@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: connection-per-call SQLite vs. the pooled WAL connection layer.
+
+Runs N concurrent writer threads against a scratch database, each performing
+the same INSERT that app.save_contact_submission() does, while one reader
+thread repeatedly loads the submissions list like the /submissions page.
+
+Usage:
+    python bench_db_pool.py [--writers 8] [--requests 500]
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from db_pool import ConnectionPool
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS contact_submissions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        phone TEXT,
+        age INTEGER,
+        date TEXT,
+        message TEXT NOT NULL,
+        priority TEXT,
+        topics TEXT,
+        satisfaction INTEGER,
+        filename TEXT,
+        submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+INSERT_SQL = '''
+    INSERT INTO contact_submissions
+    (name, email, phone, age, date, message, priority, topics, satisfaction, filename)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SELECT_SQL = '''
+    SELECT id, name, email, phone, age, date, message, priority, topics,
+           satisfaction, filename, submitted_at
+    FROM contact_submissions
+    ORDER BY submitted_at DESC
+    LIMIT 50
+'''
+
+ROW = ('Jane Doe', 'jane@example.com', '5551234567', 30, '2024-01-15',
+       'A benchmark message that is long enough to pass validation.',
+       'medium', 'web-development,ai-ml', 7, None)
+
+
+def legacy_save(database):
+    """The original per-call connect / insert / commit / close"""
+    conn = sqlite3.connect(database)
+    cursor = conn.cursor()
+    cursor.execute(INSERT_SQL, ROW)
+    submission_id = cursor.lastrowid
+    conn.commit()
+    conn.close()
+    return submission_id
+
+
+def legacy_read(database):
+    """The original per-call connect / select / close"""
+    conn = sqlite3.connect(database)
+    rows = conn.execute(SELECT_SQL).fetchall()
+    conn.close()
+    return rows
+
+
+def run(label, save, read, writers, requests_per_writer):
+    """Run the writers plus one reader and report throughput"""
+    errors = []
+    stop = threading.Event()
+    reads = [0]
+
+    def writer():
+        for _ in range(requests_per_writer):
+            try:
+                save()
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+
+    def reader():
+        while not stop.is_set():
+            read()
+            reads[0] += 1
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    reader_thread = threading.Thread(target=reader)
+
+    started = time.perf_counter()
+    reader_thread.start()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    reader_thread.join()
+
+    total = writers * requests_per_writer - len(errors)
+    print(f"{label:10} {total:7d} writes in {elapsed:6.2f}s "
+          f"= {total / elapsed:9.1f} req/s   reads: {reads[0]:6d}   errors: {len(errors)}")
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=500, help='inserts per writer')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = os.path.join(tmp, 'legacy.db')
+        conn = sqlite3.connect(legacy_db)
+        conn.execute(SCHEMA)
+        conn.close()
+
+        pooled_db = os.path.join(tmp, 'pooled.db')
+        pool = ConnectionPool(pooled_db, max_connections=args.writers + 1)
+        with pool.connection() as conn:
+            conn.execute(SCHEMA)
+
+        def pooled_save():
+            return pool.run(lambda conn: conn.execute(INSERT_SQL, ROW).lastrowid)
+
+        def pooled_read():
+            return pool.run(lambda conn: conn.execute(SELECT_SQL).fetchall())
+
+        print(f"{args.writers} concurrent writers x {args.requests} requests, 1 reader")
+        before = run('legacy', lambda: legacy_save(legacy_db), lambda: legacy_read(legacy_db),
+                     args.writers, args.requests)
+        after = run('pooled', pooled_save, pooled_read, args.writers, args.requests)
+        print(f"speedup: {after / before:.2f}x")
+        print(f"pool stats: {pool.stats()}")
+        pool.close_all()
+
+
+if __name__ == '__main__':
+    main()
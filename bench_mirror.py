@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /submissions latency in app_with_database.py served by Supabase, by the local mirror, and during an outage.
+
+Fills a local PostgREST stand-in with --rows submissions. The stand-in
+answers the mirror's sync query (created_at >= watermark, oldest first,
+limited) and the newest-first listing, after a fixed delay per query that
+stands in for the network round-trip to Supabase. The mirror is synced
+once into a scratch SQLite file, then /submissions is requested repeatedly
+through Flask's test client (read cache off) in three modes:
+
+- supabase: mirror off, every request queries the stand-in
+- mirror:   the mirror is fresh, requests read the local file
+- outage:   the stand-in answers 503 and the health probe has noticed;
+            requests are served from the (now stale) mirror
+
+Usage:
+    python bench_mirror.py [--rows 100000] [--requests 500] [--latency-ms 25]
+"""
+
+import argparse
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from supabase import create_client
+
+import config
+import app_with_database
+from supabase_mirror import SupabaseMirror
+
+ROW = {'name': 'Jane Doe', 'email': 'jane@example.com', 'phone': '5551234567', 'age': 30,
+       'contact_date': '2024-01-15', 'priority': 'medium', 'topics': ['web-development', 'ai-ml'],
+       'satisfaction': 7, 'message': 'A benchmark message that is long enough to pass validation.',
+       'filename': None, 'form_version': '2.0', 'timestamp': None}
+
+
+def serve_rows(rows, latency):
+    """Start a stand-in for GET /rest/v1/contact_submissions over rows sorted by created_at"""
+    created = [row['created_at'] for row in rows]
+    state = {'failing': False}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            if state['failing']:
+                return self._reply(503, {'message': 'Service Unavailable'})
+            query = parse_qs(urlparse(self.path).query)
+            limit = int(query.get('limit', [len(rows)])[0])
+            if query.get('order', [''])[0].startswith('created_at.desc'):
+                selected = rows[:-limit - 1:-1]
+            else:
+                # All created_at strings share one format, so text order is time order
+                since = query['created_at'][0].split('.', 1)[1] if 'created_at' in query else ''
+                start = bisect.bisect_left(created, since)
+                selected = rows[start:start + limit]
+            self._reply(200, selected)
+
+        def _reply(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def measure(label, client, requests):
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get('/submissions')
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200 and 'Jane Doe' in response.get_data(as_text=True)
+    timings.sort()
+    print(f"{label:10} p50 {percentile(timings, 0.50) * 1000:7.2f} ms   "
+          f"p99 {percentile(timings, 0.99) * 1000:7.2f} ms   "
+          f"{requests / sum(timings):8.0f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--latency-ms', type=float, default=25.0,
+                        help='simulated Supabase round-trip per query')
+    args = parser.parse_args()
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [dict(ROW, id=i, created_at=(start + timedelta(seconds=i)).isoformat())
+            for i in range(1, args.rows + 1)]
+    server = serve_rows(rows, args.latency_ms / 1000)
+    app_with_database.supabase = create_client(f'http://127.0.0.1:{server.server_address[1]}',
+                                               config.SUPABASE_KEY)
+    app_with_database.submissions_cache.enabled = False
+    client = app_with_database.app.test_client()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        mirror = SupabaseMirror(os.path.join(scratch, 'mirror.db'), app_with_database.load_mirror_rows)
+        started = time.perf_counter()
+        mirror.sync()
+        print(f"mirrored {args.rows} rows in {time.perf_counter() - started:.1f}s")
+        print(f"{args.requests} GET /submissions, {args.latency_ms:.0f} ms simulated round-trip")
+
+        app_with_database.mirror = None
+        measure('supabase', client, args.requests)
+
+        app_with_database.mirror = mirror
+        measure('mirror', client, args.requests)
+
+        server.state['failing'] = True
+        app_with_database.health_probe.probe()
+        mirror.max_staleness = 0
+        measure('outage', client, args.requests)
+        print(f"mirror reads: local {mirror.stats()['reads_local']}, "
+              f"fallback {mirror.stats()['reads_fallback']}, remote {mirror.stats()['reads_remote']}")
+        mirror.pool.close_all()
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
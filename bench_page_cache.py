@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark: renders/sec of the static template pages with and without the page cache.
+
+Requests each cacheable page of app.py through Flask's test client three
+ways: rendered on every request (the cache is cleared first), served from the
+page cache, and revalidated with If-None-Match (304 Not Modified).
+
+Usage:
+    python bench_page_cache.py [--requests 2000]
+"""
+
+import argparse
+import time
+
+import app as contact_app
+
+PAGES = ('/', '/about', '/validation-demo')
+
+
+def timed(label, path, requests, func):
+    started = time.perf_counter()
+    for _ in range(requests):
+        func()
+    elapsed = time.perf_counter() - started
+    print(f"{path:18} {label:16} {requests / elapsed:10.0f} req/s   {elapsed / requests * 1e6:8.1f} us/req")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    client = contact_app.app.test_client()
+
+    for path in PAGES:
+        def uncached():
+            contact_app.page_cache.clear()
+            client.get(path)
+
+        timed('render each hit', path, args.requests, uncached)
+        etag = client.get(path).headers['ETag']
+        timed('page cache', path, args.requests, lambda: client.get(path))
+        timed('304 revalidate', path, args.requests,
+              lambda: client.get(path, headers={'If-None-Match': etag}))
+
+    print(f"page cache stats: {contact_app.page_cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory per submission row for each way a result set can be held.
+
+Loads --rows generated submissions from a scratch SQLite database (app.py's
+SUBMISSION_SELECT) and from a JSON array shaped like a Supabase response,
+and measures with tracemalloc what each representation costs per row,
+including the strings it holds:
+
+- sqlite3 tuples (the default row type) and sqlite3.Row
+- records.Submission built by submission_factory
+- Supabase dicts (json.loads), and Submission.from_record() of them with
+  the dicts discarded
+
+Usage:
+    python bench_records.py [--rows 100000]
+"""
+
+import argparse
+import gc
+import json
+import random
+import sqlite3
+import time
+import tracemalloc
+
+from records import Submission, submission_factory
+
+SCHEMA_SQL = '''
+    CREATE TABLE contact_submissions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        phone TEXT,
+        age INTEGER,
+        date TEXT,
+        message TEXT NOT NULL,
+        priority TEXT,
+        topics_mask INTEGER NOT NULL DEFAULT 0,
+        satisfaction INTEGER,
+        filename TEXT,
+        submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        attachment_sha256 TEXT
+    )
+'''
+
+SELECT_SQL = '''
+    SELECT id, name, email, phone, age, date, message, priority, topics_mask,
+           satisfaction, filename, submitted_at, attachment_sha256
+    FROM contact_submissions
+'''
+
+TOPICS = ('web-development', 'mobile-apps', 'data-science', 'ai-ml', 'cybersecurity')
+
+
+def generate(count, seed=1):
+    rng = random.Random(seed)
+    words = ('hello', 'question', 'about', 'your', 'service', 'thanks', 'order', 'please', 'help', 'account')
+    for i in range(count):
+        yield {
+            'name': f'User {i}', 'email': f'user{i}@example.com', 'phone': '555-123-4567',
+            'age': rng.randint(18, 80), 'date': '2024-01-15',
+            'message': ' '.join(rng.choices(words, k=30)).capitalize() + '.',
+            'priority': rng.choice(('low', 'medium', 'high')), 'topics_mask': rng.randrange(32),
+            'satisfaction': rng.randint(1, 10),
+        }
+
+
+def sqlite_corpus(rows):
+    conn = sqlite3.connect(':memory:')
+    conn.execute(SCHEMA_SQL)
+    conn.executemany('INSERT INTO contact_submissions (name, email, phone, age, date, message, priority, '
+                     'topics_mask, satisfaction) VALUES (:name, :email, :phone, :age, :date, :message, '
+                     ':priority, :topics_mask, :satisfaction)', generate(rows))
+    return conn
+
+
+def supabase_corpus(rows):
+    """JSON text of a Supabase select('*') response"""
+    records = []
+    for i, row in enumerate(generate(rows), 1):
+        records.append({
+            'id': i, 'name': row['name'], 'email': row['email'], 'phone': row['phone'], 'age': row['age'],
+            'contact_date': row['date'], 'priority': row['priority'],
+            'topics': [topic for bit, topic in enumerate(TOPICS) if row['topics_mask'] & (1 << bit)],
+            'satisfaction': row['satisfaction'], 'message': row['message'], 'filename': None,
+            'form_version': '2.0', 'timestamp': '2024-01-15T12:00:00.000Z',
+            'created_at': '2024-01-15T12:00:00.123456+00:00',
+            'dedupe_key': '6f1c2a9e-7d3b-4c55-9a0e-2b8f4d1e3c77',
+        })
+    return json.dumps(records)
+
+
+def measure(label, load, rows):
+    """Print bytes per row held by load()'s result and how long it took"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - started
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:38} {held / rows:7.0f} bytes/row   {elapsed * 1000:7.1f} ms")
+    return result
+
+
+def fetch(conn, row_factory=None):
+    cursor = conn.execute(SELECT_SQL)
+    if row_factory:
+        cursor.row_factory = row_factory
+    return cursor.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    conn = sqlite_corpus(args.rows)
+    print(f"{args.rows} rows, memory held by the result list (values included)")
+    measure('sqlite3 tuples', lambda: fetch(conn), args.rows)
+    measure('sqlite3.Row', lambda: fetch(conn, sqlite3.Row), args.rows)
+    submissions = measure('Submission (submission_factory)', lambda: fetch(conn, submission_factory), args.rows)
+    del submissions
+
+    text = supabase_corpus(args.rows)
+    records = measure('Supabase dicts (json.loads)', lambda: json.loads(text), args.rows)
+    del records
+    # The dicts are dropped once converted; only what the records keep is held
+    measure('Submission.from_record(json.loads)',
+            lambda: [Submission.from_record(record) for record in json.loads(text)], args.rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full-text search latency over a large corpus of submission messages.
+
+Builds a scratch database of --rows generated submissions (1M by default),
+indexes it with search_index.rebuild(), then times the /submissions?q=
+query (search_index.SEARCH_SQL) for common, rare, multi-word and prefix
+searches, first page and a deep page, and compares one of them with the
+LIKE '%word%' scan it replaces. Common words match nearly every row; see
+MAX_RANKED_MATCHES in search_index.py for how ranking is bounded.
+
+Usage:
+    python bench_search.py [--rows 1000000] [--queries 200] [--keep scratch.db]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from search_index import SEARCH_INDEX_MIGRATION, SEARCH_SQL, fts_query, rebuild
+
+PAGE_SIZE = 25
+
+# Weighted so a few words are in most messages and the rest are rare
+COMMON_WORDS = ('the', 'and', 'help', 'please', 'question', 'account', 'thanks', 'order', 'issue', 'time')
+RARE_WORDS = ('invoice', 'refund', 'password', 'shipping', 'warranty', 'upgrade', 'cancellation',
+              'integration', 'latency', 'discount', 'webinar', 'certificate', 'billing', 'timeout')
+
+SEARCHES = (
+    ('common word', 'help'),
+    ('rare word', 'warranty'),
+    ('two words', 'help refund'),
+    ('prefix', 'integr*'),
+    ('no match', 'zyzzyva'),
+)
+
+SCHEMA_SQL = '''
+    CREATE TABLE contact_submissions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        phone TEXT,
+        age INTEGER,
+        date TEXT,
+        message TEXT NOT NULL,
+        priority TEXT,
+        topics TEXT,
+        topics_mask INTEGER NOT NULL DEFAULT 0,
+        satisfaction INTEGER,
+        filename TEXT,
+        submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        attachment_sha256 TEXT
+    )
+'''
+
+
+def generate_messages(count, seed=1):
+    rng = random.Random(seed)
+    for i in range(count):
+        words = rng.choices(COMMON_WORDS, k=rng.randint(8, 30))
+        # About one message in twenty mentions one of the rare words
+        if rng.random() < 0.05:
+            words.insert(rng.randrange(len(words)), rng.choice(RARE_WORDS))
+        yield (f'User {i}', f'user{i}@example.com', ' '.join(words).capitalize() + '.')
+
+
+def build_corpus(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=OFF')
+    conn.execute(SCHEMA_SQL)
+
+    started = time.perf_counter()
+    conn.executemany('INSERT INTO contact_submissions (name, email, message) VALUES (?, ?, ?)',
+                     generate_messages(rows))
+    conn.commit()
+    print(f"inserted {rows} rows in {time.perf_counter() - started:.1f}s")
+
+    # Creates the FTS table and triggers and indexes the existing rows
+    started = time.perf_counter()
+    for statement in SEARCH_INDEX_MIGRATION:
+        conn.execute(statement)
+    conn.commit()
+    print(f"migration (initial index) in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    rebuild(conn)
+    print(f"rebuild + optimize in {time.perf_counter() - started:.1f}s")
+    return conn
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return statistics.median(samples) * 1000, p99 * 1000
+
+
+def timed(conn, label, sql, params, queries):
+    samples = []
+    for _ in range(queries):
+        started = time.perf_counter()
+        rows = conn.execute(sql, params).fetchall()
+        samples.append(time.perf_counter() - started)
+    p50, p99 = percentiles(samples)
+    print(f"{label:34} {len(rows):4d} rows   p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=200, help='timed runs per search')
+    parser.add_argument('--keep', help='build the corpus at this path and keep it')
+    args = parser.parse_args()
+
+    scratch = None
+    if args.keep:
+        path = args.keep
+    else:
+        scratch = tempfile.TemporaryDirectory()
+        path = os.path.join(scratch.name, 'search.db')
+
+    conn = build_corpus(path, args.rows)
+    try:
+        for label, text in SEARCHES:
+            timed(conn, f'{label} ({text!r})', SEARCH_SQL, (fts_query(text), PAGE_SIZE + 1, 0), args.queries)
+        timed(conn, "common word, page 40", SEARCH_SQL,
+              (fts_query('help'), PAGE_SIZE + 1, 39 * PAGE_SIZE), args.queries)
+
+        # Without the index: newest-first LIKE scan, which only stops early
+        # when enough rows match, so a search with no results reads every row
+        like_sql = ('SELECT id, message FROM contact_submissions WHERE message LIKE ? '
+                    'ORDER BY id DESC LIMIT ?')
+        for text in ('warranty', 'zyzzyva'):
+            timed(conn, f"LIKE scan ({text!r})", like_sql, (f'%{text}%', PAGE_SIZE + 1),
+                  max(1, args.queries // 20))
+    finally:
+        conn.close()
+        if scratch is not None:
+            scratch.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time to first byte and peak RSS of a full submissions listing, buffered vs streamed.
+
+Fills a scratch contact_submissions.db (app.py's schema) with --rows
+submissions, then renders every row into submissions.html two ways, each
+in a fresh process so peak RSS is measured separately:
+
+- buffered: get_all_submissions() + render_template(), the whole document
+  is built before the first byte can be sent
+- streamed: GET /submissions?all=1, rows come from the DB cursor and the
+  page is sent while it is rendered (streaming.stream_page)
+
+Usage:
+    python bench_streaming.py [--rows 100000]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def fill_database(rows):
+    import app
+
+    rng = random.Random(1)
+    words = ('hello', 'question', 'about', 'your', 'service', 'thanks', 'order', 'please', 'help', 'account')
+    records = (
+        (f'User {i}', f'user{i}@example.com', '555-123-4567', 30, '2024-01-15',
+         ' '.join(rng.choices(words, k=30)).capitalize() + '.', rng.choice(('low', 'medium', 'high')),
+         rng.randrange(32), rng.randint(1, 10), None, None, None)
+        for i in range(rows)
+    )
+    sql = app.INSERT_SUBMISSION_SQL
+    app.db_pool.run(lambda conn: conn.executemany(sql, records))
+
+
+def run_mode(mode):
+    """Render the full listing once and print TTFB, total time, size and peak RSS as JSON"""
+    import app
+    from flask import render_template
+
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    if mode == 'buffered':
+        with app.app.test_request_context('/submissions'):
+            body = render_template('submissions.html', title='Contact Submissions',
+                                   submissions=app.get_all_submissions(), query='')
+        first_byte = time.perf_counter()
+        size = len(body.encode())
+    else:
+        client = app.app.test_client()
+        response = client.get('/submissions?all=1', buffered=False)
+        chunks = iter(response.response)
+        size = len(next(chunks))
+        first_byte = time.perf_counter()
+        for chunk in chunks:
+            size += len(chunk)
+        response.close()
+    finished = time.perf_counter()
+
+    print(json.dumps({'mode': mode, 'ttfb_ms': (first_byte - started) * 1000,
+                      'total_ms': (finished - started) * 1000, 'bytes': size,
+                      'peak_rss_mb': peak_rss_mb(), 'baseline_rss_mb': baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--mode', choices=('fill', 'buffered', 'streamed'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sys.path.insert(0, HERE)
+    if args.mode == 'fill':
+        fill_database(args.rows)
+        return
+    if args.mode:
+        run_mode(args.mode)
+        return
+
+    def run(mode):
+        return subprocess.run([sys.executable, os.path.abspath(__file__), '--rows', str(args.rows), '--mode', mode],
+                              check=True, capture_output=True, text=True).stdout
+
+    with tempfile.TemporaryDirectory() as scratch:
+        # app.py opens contact_submissions.db in the working directory
+        os.chdir(scratch)
+        started = time.perf_counter()
+        run('fill')
+        print(f"inserted {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+        for mode in ('buffered', 'streamed'):
+            # The result is the last line; app.py logs to stdout too
+            result = json.loads(run(mode).strip().splitlines()[-1])
+            print(f"{mode:9} TTFB {result['ttfb_ms']:9.1f} ms   total {result['total_ms']:8.1f} ms   "
+                  f"{result['bytes'] / 1e6:6.1f} MB of HTML   peak RSS {result['peak_rss_mb']:6.1f} MB "
+                  f"(+{result['peak_rss_mb'] - result['baseline_rss_mb']:.1f} MB while rendering)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /submissions latency in app_with_database.py with the read cache on and off.
+
+Serves 20 submissions from a local PostgREST stand-in that adds a fixed
+delay per query (standing in for the network round-trip to Supabase), then
+requests /submissions repeatedly through Flask's test client, like a page
+left on auto-refresh, and prints p50/p99 latency for each mode.
+
+Usage:
+    python bench_submissions_cache.py [--requests 500] [--latency-ms 25]
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from supabase import create_client
+
+import config
+import app_with_database
+
+ROW = {'name': 'Jane Doe', 'email': 'jane@example.com', 'phone': '5551234567', 'age': 30,
+       'contact_date': '2024-01-15', 'priority': 'medium', 'topics': ['web-development', 'ai-ml'],
+       'satisfaction': 7, 'message': 'A benchmark message that is long enough to pass validation.',
+       'filename': None, 'form_version': '2.0', 'timestamp': None,
+       'created_at': '2024-01-15T12:00:00+00:00'}
+
+
+def serve_rows(rows, latency):
+    """Start a stand-in for GET /rest/v1/<table> that answers after `latency` seconds"""
+    body = json.dumps(rows).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def measure(label, client, requests):
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get('/submissions')
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200
+    timings.sort()
+    print(f"{label:14} p50 {percentile(timings, 0.50) * 1000:7.2f} ms   "
+          f"p99 {percentile(timings, 0.99) * 1000:7.2f} ms   "
+          f"{requests / sum(timings):8.0f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--latency-ms', type=float, default=25.0,
+                        help='simulated Supabase round-trip per query')
+    args = parser.parse_args()
+
+    rows = [dict(ROW, id=i) for i in range(20, 0, -1)]
+    server = serve_rows(rows, args.latency_ms / 1000)
+    app_with_database.supabase = create_client(f'http://127.0.0.1:{server.server_address[1]}',
+                                               config.SUPABASE_KEY)
+    # Measure the cache alone, in front of Supabase (see bench_mirror.py)
+    app_with_database.mirror = None
+    cache = app_with_database.submissions_cache
+    client = app_with_database.app.test_client()
+
+    print(f"{args.requests} GET /submissions, {args.latency_ms:.0f} ms simulated round-trip, "
+          f"TTL {cache.ttl:.0f}s")
+
+    cache.enabled = False
+    measure('cache off', client, args.requests)
+
+    cache.enabled = True
+    cache.invalidate()
+    measure('cache on', client, args.requests)
+    print(f"cache stats: {cache.stats()}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
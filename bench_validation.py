@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request contact form validation cost.
+
+Compares the original try/except-per-field validators (reproduced below
+exactly as they were in app.py) with the schema-driven validate_form() from
+validation.py, on a valid form and on a form where most fields fail. Before
+timing, it checks that both produce the same data and error messages.
+
+Usage:
+    python bench_validation.py [--iterations 100000]
+"""
+
+import argparse
+import re
+import timeit
+from datetime import datetime
+
+from werkzeug.datastructures import MultiDict
+
+from validation import validate_form
+
+VALID_FORM = MultiDict([
+    ('name', 'Jane Doe'), ('email', 'Jane.Doe@Example.com'), ('phone', '(555) 123-4567'),
+    ('age', '30'), ('date', '2024-01-15'), ('priority', 'medium'),
+    ('topics', 'web-development'), ('topics', 'ai-ml'), ('satisfaction', '8'),
+    ('message', 'Hello, this is a perfectly reasonable message.'),
+])
+
+INVALID_FORM = MultiDict([
+    ('name', 'J4ne'), ('email', 'not-an-email'), ('phone', '123'),
+    ('age', 'ten'), ('date', '2024-13-45'), ('priority', 'urgent'),
+    ('topics', 'cooking'), ('satisfaction', '11'), ('message', 'Hi'),
+])
+
+
+def with_fields(form, **fields):
+    """Copy of form with single-valued fields replaced"""
+    form = form.copy()
+    for name, value in fields.items():
+        form[name] = value
+    return form
+
+
+# Inputs the schema once got wrong; both implementations must agree on them
+EDGE_FORMS = [
+    with_fields(VALID_FORM, age='\u00b2', satisfaction='\u00b3'),  # superscript digits
+    with_fields(VALID_FORM, date='0000-01-01'),                      # year 0
+    with_fields(VALID_FORM, date='\u0662\u0660\u0662\u0664-01-15'),      # Arabic-Indic digits
+]
+
+
+# --- Original implementation ---------------------------------------------
+
+class ValidationError(Exception):
+    pass
+
+
+def validate_email(email):
+    if not email:
+        raise ValidationError("Email is required")
+    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    if not re.match(email_pattern, email):
+        raise ValidationError("Please enter a valid email address")
+    return email.lower().strip()
+
+
+def validate_name(name):
+    if not name:
+        raise ValidationError("Name is required")
+    name = name.strip()
+    if len(name) < 2:
+        raise ValidationError("Name must be at least 2 characters long")
+    if len(name) > 50:
+        raise ValidationError("Name must be less than 50 characters")
+    if not re.match(r"^[a-zA-Z\s\-']+$", name):
+        raise ValidationError("Name can only contain letters, spaces, hyphens, and apostrophes")
+    return name
+
+
+def validate_phone(phone):
+    if not phone:
+        return None
+    phone_digits = re.sub(r'\D', '', phone)
+    if len(phone_digits) < 10:
+        raise ValidationError("Phone number must have at least 10 digits")
+    if len(phone_digits) > 15:
+        raise ValidationError("Phone number must have less than 15 digits")
+    return phone_digits
+
+
+def validate_age(age_str):
+    if not age_str:
+        raise ValidationError("Age is required")
+    try:
+        age = int(age_str)
+    except ValueError:
+        raise ValidationError("Age must be a valid number")
+    if age < 13:
+        raise ValidationError("You must be at least 13 years old")
+    if age > 120:
+        raise ValidationError("Please enter a valid age")
+    return age
+
+
+def validate_date(date_str):
+    if not date_str:
+        return None
+    try:
+        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+        if date_obj.date() > datetime.now().date():
+            raise ValidationError("Date cannot be in the future")
+        return date_obj.date()
+    except ValueError:
+        raise ValidationError("Please enter a valid date")
+
+
+def validate_message(message):
+    if not message:
+        raise ValidationError("Message is required")
+    message = message.strip()
+    if len(message) < 10:
+        raise ValidationError("Message must be at least 10 characters long")
+    if len(message) > 1000:
+        raise ValidationError("Message must be less than 1000 characters")
+    return message
+
+
+def legacy_validate(form):
+    errors = []
+    validated_data = {}
+    for key, label, func in (('name', 'Name', validate_name), ('email', 'Email', validate_email),
+                             ('phone', 'Phone', validate_phone), ('age', 'Age', validate_age),
+                             ('date', 'Date', validate_date), ('message', 'Message', validate_message)):
+        try:
+            validated_data[key] = func(form.get(key))
+        except ValidationError as e:
+            errors.append(f"{label}: {str(e)}")
+
+    priority = form.get('priority')
+    if priority not in ['low', 'medium', 'high']:
+        errors.append("Priority: Please select a valid priority level")
+    else:
+        validated_data['priority'] = priority
+
+    topics = form.getlist('topics')
+    valid_topics = ['web-development', 'mobile-apps', 'data-science', 'ai-ml', 'cybersecurity']
+    invalid_topics = [topic for topic in topics if topic not in valid_topics]
+    if invalid_topics:
+        errors.append(f"Topics: Invalid topics selected: {', '.join(invalid_topics)}")
+    else:
+        validated_data['topics'] = topics
+
+    try:
+        satisfaction = int(form.get('satisfaction', 0))
+        if satisfaction < 1 or satisfaction > 10:
+            errors.append("Satisfaction: Please select a value between 1 and 10")
+        else:
+            validated_data['satisfaction'] = satisfaction
+    except ValueError:
+        errors.append("Satisfaction: Invalid satisfaction rating")
+
+    return validated_data, errors
+
+
+# --- Benchmark ------------------------------------------------------------
+
+def new_validate(form):
+    result = validate_form(form)
+    return result.data, result.messages()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--iterations', type=int, default=100000)
+    args = parser.parse_args()
+
+    for form in EDGE_FORMS:
+        assert legacy_validate(form) == new_validate(form), (legacy_validate(form), new_validate(form))
+
+    for label, form in (('valid form', VALID_FORM), ('invalid form', INVALID_FORM)):
+        legacy_data, legacy_errors = legacy_validate(form)
+        new_data, new_errors = new_validate(form)
+        assert legacy_data == new_data, (legacy_data, new_data)
+        assert sorted(legacy_errors) == sorted(new_errors), (legacy_errors, new_errors)
+
+        before = min(timeit.repeat(lambda: legacy_validate(form), number=args.iterations, repeat=3))
+        after = min(timeit.repeat(lambda: new_validate(form), number=args.iterations, repeat=3))
+        per_before = before / args.iterations * 1e6
+        per_after = after / args.iterations * 1e6
+        print(f"{label:13} legacy {per_before:6.2f} us/request   "
+              f"schema {per_after:6.2f} us/request   ({per_before / per_after:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
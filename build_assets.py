@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Build fingerprinted, precompressed copies of the static assets.
+
+For every CSS and JS file under static/ this writes, into static/dist/,
+- a copy named after its content hash, e.g. css/style.3f9a1c2b7d4e.css,
+- a gzip variant next to it (css/style.3f9a1c2b7d4e.css.gz), and
+- a brotli variant (.br) when the optional `brotli` package is installed,
+plus static/dist/manifest.json mapping each source path to its built name.
+
+The apps read the manifest at startup (see static_assets.py), link the
+hashed names from templates and serve the matching precompressed file, so
+no compression happens while serving requests. Re-run after editing any
+asset; old builds are removed.
+
+Usage:
+    python build_assets.py [--static-dir static]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ASSET_EXTENSIONS = ('.css', '.js')
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 12
+
+
+def find_assets(static_dir):
+    """Yield asset paths relative to static_dir, skipping the build output"""
+    for root, dirs, files in os.walk(static_dir):
+        if os.path.abspath(root) == os.path.abspath(static_dir):
+            dirs[:] = [d for d in dirs if d != DIST_DIR]
+        for name in sorted(files):
+            if name.endswith(ASSET_EXTENSIONS):
+                yield os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, '/')
+
+
+def fingerprinted_name(path, content):
+    """css/style.css -> css/style.<hash>.css"""
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    base, ext = os.path.splitext(path)
+    return f'{base}.{digest}{ext}'
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def build(static_dir):
+    """Build every asset; returns the manifest"""
+    dist_dir = os.path.join(static_dir, DIST_DIR)
+    # Start clean so stale fingerprints do not pile up
+    shutil.rmtree(dist_dir, ignore_errors=True)
+
+    manifest = {}
+    for path in find_assets(static_dir):
+        with open(os.path.join(static_dir, path), 'rb') as f:
+            content = f.read()
+
+        built = fingerprinted_name(path, content)
+        target = os.path.join(dist_dir, built)
+        write_file(target, content)
+
+        encodings = ['gzip']
+        # mtime=0 keeps the output byte-identical across builds
+        write_file(target + '.gz', gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli is not None:
+            write_file(target + '.br', brotli.compress(content, quality=11))
+            encodings.append('br')
+
+        manifest[path] = {'file': built, 'encodings': encodings}
+        sizes = ', '.join(f"{encoding} {os.path.getsize(target + ('.gz' if encoding == 'gzip' else '.br'))}"
+                          for encoding in encodings)
+        print(f"  {path} -> {DIST_DIR}/{built} ({len(content)} bytes; {sizes})")
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--static-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'))
+    args = parser.parse_args()
+
+    manifest = build(args.static_dir)
+    print(f"✅ Built {len(manifest)} assets into {os.path.join(args.static_dir, DIST_DIR)}")
+    if brotli is None:
+        print("   (install the 'brotli' package to also write .br variants)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+SQLite connection pool used by the contact form storage functions.
+
+Opening a connection per call means paying for the file open, schema
+parsing and statement compilation on every request. The pool keeps a small
+set of long-lived connections per worker process instead, switches the
+database to WAL journaling so readers never wait for writers, and relies on
+sqlite3's per-connection statement cache so that the same SQL text is only
+prepared once per connection.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """A bounded pool of WAL-mode SQLite connections with usage metrics"""
+
+    def __init__(self, database, max_connections=8, busy_timeout=5.0,
+                 cached_statements=256, max_retries=5):
+        self.database = database
+        self.max_connections = max_connections
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        self.max_retries = max_retries
+
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        """Start with an empty pool owned by the current process"""
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._stats = {
+            'connections_opened': 0,
+            'checkouts': 0,
+            'reuses': 0,
+            'waits': 0,
+            'wait_seconds': 0.0,
+            'busy_retries': 0,
+        }
+
+    def _check_pid(self):
+        """Drop connections inherited from a parent process after fork()"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+
+    def _connect(self):
+        """Open a new connection and apply the pool's PRAGMAs"""
+        conn = sqlite3.connect(
+            self.database,
+            timeout=self.busy_timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        conn.execute('PRAGMA journal_mode=WAL')
+        # NORMAL is durable across application crashes in WAL mode; only an
+        # OS crash or power loss can roll back the last few commits.
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout * 1000)}')
+        conn.execute('PRAGMA foreign_keys=ON')
+        return conn
+
+    def acquire(self):
+        """Check out a connection, opening one if the pool is not full yet"""
+        self._check_pid()
+
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._stats['checkouts'] += 1
+                self._stats['reuses'] += 1
+            return conn
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = len(self._all) < self.max_connections
+            if can_open:
+                self._stats['connections_opened'] += 1
+                self._stats['checkouts'] += 1
+
+        if can_open:
+            conn = self._connect()
+            with self._lock:
+                self._all.append(conn)
+            return conn
+
+        # Pool exhausted - wait for another thread to give one back
+        started = time.perf_counter()
+        try:
+            conn = self._idle.get(timeout=self.busy_timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError('Timed out waiting for a pooled connection')
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['reuses'] += 1
+            self._stats['waits'] += 1
+            self._stats['wait_seconds'] += time.perf_counter() - started
+        return conn
+
+    def release(self, conn):
+        """Return a connection to the pool"""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            owned = conn in self._all
+        if owned:
+            self._idle.put(conn)
+        else:
+            # The pool was reset or closed while this connection was out
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commit on success, roll back on error"""
+        conn = self.acquire()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def run(self, func):
+        """Run func(conn) in a transaction, retrying if the database is busy"""
+        attempt = 0
+        while True:
+            try:
+                with self.connection() as conn:
+                    return func(conn)
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) and 'busy' not in str(e):
+                    raise
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                with self._lock:
+                    self._stats['busy_retries'] += 1
+                time.sleep(min(0.005 * (2 ** attempt), 0.25))
+
+    def stats(self):
+        """Return a snapshot of the pool metrics"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['open_connections'] = len(self._all)
+        snapshot['idle_connections'] = self._idle.qsize()
+        snapshot['in_use_connections'] = snapshot['open_connections'] - snapshot['idle_connections']
+        snapshot['max_connections'] = self.max_connections
+        return snapshot
+
+    def close_all(self):
+        """Close every connection the pool has opened"""
+        with self._lock:
+            connections, self._all = self._all, []
+            self._idle = queue.LifoQueue()
+        for conn in connections:
+            conn.close()
@@ -0,0 +1,87 @@
+"""
+Memoized email validation for /api/validate-email.
+
+main.js asks the server to validate the email field as the user types, so
+the same handful of addresses arrives over and over. EmailValidator keeps
+the result for each address in a bounded LRU cache (QueryCache with no
+expiry), and identical lookups that arrive while the first is still being
+computed wait for it instead of repeating the work.
+
+Addresses that pass the contact form's syntax check go through domain
+checks, cached per domain. The built-in one rejects domains listed in a
+local blocklist file (one domain per line, # for comments), e.g. a list of
+disposable email providers; subdomains of a listed domain are rejected too.
+
+Results are counted in cache_lookups_total{cache="email_validation"} and
+{cache="email_domain"} on /metrics.
+"""
+
+import math
+
+from query_cache import QueryCache
+from validation import validate_field
+
+BLOCKED_DOMAIN_MESSAGE = "Please use a permanent email address"
+
+
+def load_domain_list(path):
+    """Domains listed in a file, lowercased; empty if the file does not exist"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            lines = [line.split('#', 1)[0].strip().lower() for line in f]
+    except FileNotFoundError:
+        return frozenset()
+    return frozenset(line for line in lines if line)
+
+
+def cache_key(email):
+    """Addresses that validate identically share a key
+
+    The email pattern is ASCII-only and case-insensitive, and a valid address
+    is lowercased, so case does not change the result. Non-ASCII input is
+    left alone because str.lower() can turn it into ASCII (e.g. the Kelvin
+    sign becomes "k").
+    """
+    return email.lower() if email.isascii() else email
+
+
+class EmailValidator:
+    """validate_field('email') plus domain checks, memoized per address and per domain"""
+
+    def __init__(self, blocked_domains=frozenset(), max_entries=4096):
+        self.blocked_domains = frozenset(blocked_domains)
+        self.results = QueryCache(ttl=math.inf, max_entries=max_entries, name='email_validation')
+        self.domains = QueryCache(ttl=math.inf, max_entries=max_entries, name='email_domain')
+
+    def validate(self, email):
+        """Returns (normalized address, None) or (None, error message)"""
+        if not isinstance(email, str):
+            return validate_field('email', email)
+        return self.results.get_or_load(cache_key(email), lambda: self._validate(email))
+
+    def _validate(self, email):
+        value, error = validate_field('email', email)
+        if error:
+            return value, error
+        domain = value.rsplit('@', 1)[1]
+        error = self.domains.get_or_load(domain, lambda: self.check_domain(domain))
+        return (None, error) if error else (value, None)
+
+    def check_domain(self, domain):
+        """Error message for a domain that is not accepted, else None"""
+        labels = domain.split('.')
+        # example.com, then for mail.example.com also its parent domains
+        for i in range(len(labels) - 1):
+            if '.'.join(labels[i:]) in self.blocked_domains:
+                return BLOCKED_DOMAIN_MESSAGE
+        return None
+
+    def set_blocked_domains(self, domains):
+        """Replace the blocklist and forget results computed with the old one"""
+        self.blocked_domains = frozenset(domains)
+        self.domains.invalidate()
+        self.results.invalidate()
+
+    def stats(self):
+        return {'results': self.results.stats(), 'domains': self.domains.stats(),
+                'blocked_domains': len(self.blocked_domains)}
@@ -0,0 +1,139 @@
+"""
+Streaming CSV / NDJSON export of contact submissions.
+
+Both app variants hand a row generator to export_response(). Rows are
+serialized and (optionally) gzip-compressed chunk by chunk as the client
+reads the response, so memory use does not depend on how many rows are
+exported.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, timedelta
+
+from flask import Response
+
+from validation import VALID_PRIORITIES
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows serialized per yielded chunk - keeps the number of socket writes low
+ROWS_PER_CHUNK = 200
+
+
+class ExportError(Exception):
+    """Raised for invalid export parameters"""
+    pass
+
+
+def parse_export_args(args):
+    """Read format, filters and gzip flag from the query string"""
+    export_format = args.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f"Unsupported format '{export_format}'. Use csv or ndjson")
+
+    filters = {}
+    for name in ('since', 'until'):
+        value = args.get(name)
+        if value:
+            try:
+                filters[name] = datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                raise ExportError(f"'{name}' must be a date in YYYY-MM-DD format")
+
+    # 'until' is inclusive, so filter on the start of the following day
+    if 'until' in filters:
+        filters['before'] = filters.pop('until') + timedelta(days=1)
+
+    priority = args.get('priority')
+    if priority:
+        if priority not in VALID_PRIORITIES:
+            raise ExportError(f"'priority' must be one of {', '.join(VALID_PRIORITIES)}")
+        filters['priority'] = priority
+
+    use_gzip = args.get('gzip', '0').lower() in ('1', 'true', 'yes')
+    return export_format, filters, use_gzip
+
+
+def _cell(value):
+    """Flatten a value for CSV output"""
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ','.join(str(item) for item in value)
+    return value
+
+
+def _json_default(value):
+    """JSON fallback for dates"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def csv_chunks(rows, fields):
+    """Yield CSV text, a header line followed by the rows in chunks"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+
+    count = 0
+    for row in rows:
+        writer.writerow([_cell(row.get(field)) for field in fields])
+        count += 1
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(rows, fields):
+    """Yield newline-delimited JSON, one object per row"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({field: row.get(field) for field in fields}, default=_json_default))
+        if len(lines) == ROWS_PER_CHUNK:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def gzip_chunks(chunks):
+    """Gzip-compress a stream of text chunks on the fly"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(rows, fields, export_format='csv', use_gzip=False, basename='contact_submissions'):
+    """Build a streaming download response from a row generator"""
+    if export_format == 'csv':
+        chunks = csv_chunks(rows, fields)
+    else:
+        chunks = ndjson_chunks(rows, fields)
+
+    filename = f"{basename}_{date.today().isoformat()}.{export_format}"
+    if use_gzip:
+        body = gzip_chunks(chunks)
+        mimetype = 'application/gzip'
+        filename += '.gz'
+    else:
+        body = (chunk.encode('utf-8') for chunk in chunks)
+        mimetype = EXPORT_FORMATS[export_format]
+
+    response = Response(body, mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,109 @@
+"""
+Background health probe for the database connection.
+
+A daemon thread runs a cheap check every `interval` seconds and records
+its status, latency and last error. Health endpoints read that cached
+state instead of querying the database themselves, so they answer in
+microseconds and put no load on the database however often a load
+balancer polls them.
+
+If no check has completed within `deadline` seconds (the database call is
+hanging, or the probe thread died), the state is reported as stale.
+"""
+
+import os
+import threading
+import time
+
+
+class HealthProbe:
+    """Runs check() periodically and caches the outcome"""
+
+    def __init__(self, check, interval=5.0, deadline=None, name='health-probe'):
+        self.check = check
+        self.interval = interval
+        self.deadline = deadline if deadline is not None else interval * 3
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._state = {
+            'status': 'unknown',     # 'ok', 'error' or 'unknown' before the first check
+            'latency_ms': None,
+            'last_error': None,
+            'checked_at': None,      # wall-clock time of the last completed check
+            'last_ok_at': None,
+            'consecutive_failures': 0,
+            'checks': 0,
+        }
+        self._checked_monotonic = None
+        self._started_monotonic = None
+
+    def start(self):
+        """Start the probe thread in this process if it is not running"""
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            # A forked worker inherits the object but not the thread
+            self._pid = os.getpid()
+            self._started_monotonic = time.monotonic()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.interval)
+
+    def probe(self):
+        """Run the check once and record the outcome"""
+        started = time.perf_counter()
+        try:
+            self.check()
+            error = None
+        except Exception as e:
+            error = str(e)[:500]
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        now = time.time()
+        with self._lock:
+            state = self._state
+            state['checks'] += 1
+            state['latency_ms'] = latency_ms
+            state['checked_at'] = now
+            if error is None:
+                state['status'] = 'ok'
+                state['last_ok_at'] = now
+                state['consecutive_failures'] = 0
+            else:
+                state['status'] = 'error'
+                state['last_error'] = error
+                state['consecutive_failures'] += 1
+            self._checked_monotonic = time.monotonic()
+
+    def stop(self):
+        """Stop the probe thread"""
+        self._stop.set()
+
+    def state(self):
+        """Return the cached probe state; never touches the database"""
+        self.start()
+        now = time.monotonic()
+        with self._lock:
+            snapshot = dict(self._state)
+            last = self._checked_monotonic if self._checked_monotonic is not None else self._started_monotonic
+
+        snapshot['age_seconds'] = round(now - self._checked_monotonic, 3) if self._checked_monotonic else None
+        snapshot['stale'] = now - last > self.deadline
+        if snapshot['stale']:
+            snapshot['status'] = 'stale'
+        return snapshot
+
+    def ready(self):
+        """True if the last check succeeded and is recent enough"""
+        return self.state()['status'] == 'ok'
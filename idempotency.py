@@ -0,0 +1,158 @@
+"""
+Idempotent contact form submissions.
+
+A double-clicked submit button or a browser retrying a POST should not
+save the same message twice. Every rendered contact form carries a random
+idempotency key in a hidden field; a repeat of the same key returns the
+submission ID saved the first time. Requests without a usable key (old
+pages, scripts) fall back to a hash of the normalized submission content.
+
+RecentSubmissions remembers keys for a time window in memory, so a repeat
+seen by the same worker is answered without touching the database. Client
+keys are also stored with the row under a unique index, which catches
+repeats that reach another worker or arrive after the window. Content
+hashes are only remembered for the window: sending the same message again
+tomorrow is a new submission.
+
+    key = client_key(request.form.get(FORM_FIELD)) or content_key(data)
+    claimed, submission_id = recent_submissions.claim(key)
+    if claimed:
+        try:
+            submission_id = save(data)
+        except Exception:
+            recent_submissions.release(key)
+            raise
+        recent_submissions.complete(key, submission_id)
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# Name of the hidden form field holding the client's key
+FORM_FIELD = 'idempotency_key'
+
+# Fields that make two submissions "the same message"
+CONTENT_FIELDS = ('name', 'email', 'phone', 'age', 'date', 'message', 'priority', 'topics',
+                  'satisfaction', 'filename', 'attachment_sha256')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def new_key():
+    """A fresh key for a rendered form"""
+    return str(uuid.uuid4())
+
+
+def client_key(value):
+    """Canonical form of a client-supplied key, or None if it is not a UUID"""
+    if not value:
+        return None
+    try:
+        return str(uuid.UUID(value))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _normalize(field, value):
+    if value is None or value == '':
+        return None
+    if field == 'topics':
+        return sorted(value)
+    if field == 'phone':
+        return re.sub(r'\D', '', str(value))
+    if isinstance(value, str):
+        return _WHITESPACE.sub(' ', value).strip().casefold()
+    return str(value)
+
+
+def content_key(data):
+    """Hash of a validated submission, ignoring case and whitespace differences"""
+    normalized = {field: _normalize(field, data.get(field)) for field in CONTENT_FIELDS}
+    encoded = json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+    return 'sha256:' + hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class _Entry:
+    __slots__ = ('submission_id', 'expires_at', 'done')
+
+    def __init__(self, expires_at):
+        self.submission_id = None
+        self.expires_at = expires_at
+        self.done = threading.Event()
+
+
+class RecentSubmissions:
+    """Keys seen in the last `window` seconds and the submission ID they saved"""
+
+    def __init__(self, window=600.0, max_entries=10000, wait_timeout=10.0):
+        self.window = window
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+
+        self._entries = OrderedDict()  # key -> _Entry, oldest first
+        self._lock = threading.Lock()
+        self._stats = {'claimed': 0, 'repeats': 0, 'waited': 0, 'expired': 0, 'evicted': 0}
+
+    def _purge(self, now):
+        """Drop expired entries (and the oldest beyond max_entries); caller holds the lock"""
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+            self._stats['expired' if entry.expires_at <= now else 'evicted'] += 1
+
+    def claim(self, key):
+        """Claim a key before saving its submission
+
+        Returns (True, None) if the caller should save and then complete() or
+        release() the key, or (False, submission_id) for a repeat. A repeat of
+        a submission that is still being saved waits for it to finish.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = _Entry(now + self.window)
+                self._stats['claimed'] += 1
+                return True, None
+            self._stats['repeats'] += 1
+            waiting = not entry.done.is_set()
+            if waiting:
+                self._stats['waited'] += 1
+
+        if waiting and not entry.done.wait(self.wait_timeout):
+            return False, None
+        if entry.submission_id is None:
+            # The first attempt failed and released the key; try again
+            return self.claim(key)
+        return False, entry.submission_id
+
+    def complete(self, key, submission_id):
+        """Record the ID saved for a claimed key"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            entry.submission_id = submission_id
+            entry.done.set()
+
+    def release(self, key):
+        """Forget a claimed key whose submission was not saved"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+    def stats(self):
+        """Return a snapshot of the dedupe counters"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['tracked_keys'] = len(self._entries)
+        snapshot['window_seconds'] = self.window
+        return snapshot
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Bulk-import historical contact submissions into contact_submissions.db.
+
+Reads CSV (with a header row) or JSONL, validates every record with the same
+rules as the contact form across a pool of worker processes, and writes the
+valid rows with executemany() in large transactions. Records that fail
+validation are appended to a rejects file (JSONL) together with their
+error messages. A record's submitted_at, if present, must be an ISO 8601
+timestamp (or date). It is stored in UTC as SQLite's own
+'YYYY-MM-DD HH:MM:SS', so imported rows sort and filter like rows written
+by the app.
+
+The import is resumable: every transaction also records how many input
+records have been consumed and how long the rejects file is, so after a
+crash the importer skips what was committed and truncates any rejects
+written after the last commit.
+
+Usage:
+    python import_submissions.py legacy.csv [--workers 4] [--batch-size 5000]
+    python import_submissions.py legacy.jsonl --rejects legacy.rejects.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+from itertools import islice
+from multiprocessing import Pool
+
+from validation import validate_form
+
+# Records handed to a worker process at a time
+CHUNK_SIZE = 1000
+
+CHECKPOINT_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS import_checkpoints (
+        source TEXT PRIMARY KEY,
+        records_consumed INTEGER NOT NULL,
+        rows_imported INTEGER NOT NULL,
+        rows_rejected INTEGER NOT NULL,
+        rejects_offset INTEGER NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+SAVE_CHECKPOINT_SQL = '''
+    INSERT INTO import_checkpoints
+    (source, records_consumed, rows_imported, rows_rejected, rejects_offset, updated_at)
+    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT (source) DO UPDATE SET
+        records_consumed = excluded.records_consumed,
+        rows_imported = excluded.rows_imported,
+        rows_rejected = excluded.rows_rejected,
+        rejects_offset = excluded.rejects_offset,
+        updated_at = excluded.updated_at
+'''
+
+
+def read_records(path):
+    """Yield raw records (dicts) from a CSV or JSONL file"""
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+    else:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield {'_raw': line}
+
+
+def normalize_submitted_at(value):
+    """ISO 8601 timestamp -> 'YYYY-MM-DD HH:MM:SS' in UTC, like CURRENT_TIMESTAMP
+
+    Timestamps without an offset are taken to be UTC already. Returns None
+    for a missing value; raises ValueError for anything unparseable.
+    """
+    if value is None or value == '':
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f'Expected a timestamp string, got {value!r}')
+    parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def validate_chunk(chunk):
+    """Worker: validate (position, record) pairs
+
+    Returns (records consumed so far, valid rows, rejected records).
+    """
+    valid = []
+    rejected = []
+    for position, record in chunk:
+        if not isinstance(record, dict) or '_raw' in record:
+            rejected.append((position, record, {'record': 'Not a valid JSON object'}))
+            continue
+
+        # CSV (and some JSON exports) store topics as one comma-joined string
+        topics = record.get('topics')
+        if isinstance(topics, str):
+            record['topics'] = [topic.strip() for topic in topics.split(',') if topic.strip()]
+
+        try:
+            result = validate_form(record)
+        except Exception as e:
+            # Rejected like any other invalid record instead of aborting the import
+            rejected.append((position, record, {'record': f'Could not validate record: {e}'}))
+            continue
+
+        errors = dict(result.errors)
+        try:
+            submitted_at = normalize_submitted_at(record.get('submitted_at'))
+        except ValueError:
+            errors['submitted_at'] = 'Please enter a valid ISO 8601 timestamp'
+
+        if not errors:
+            data = result.data
+            data['filename'] = record.get('filename') or None
+            valid.append((data, submitted_at))
+        else:
+            rejected.append((position, record, errors))
+    return chunk[-1][0] + 1, valid, rejected
+
+
+def chunked(records, start):
+    """Group (position, record) pairs into CHUNK_SIZE lists, skipping `start` records"""
+    numbered = enumerate(islice(records, start, None), start)
+    while True:
+        chunk = list(islice(numbered, CHUNK_SIZE))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bounded_imap(pool, func, items, window):
+    """Like pool.imap(), but with at most `window` items in flight
+
+    Pool.imap() reads its whole input ahead of the workers, which would
+    load the entire file into memory.
+    """
+    in_flight = deque()
+    for item in items:
+        in_flight.append(pool.apply_async(func, (item,)))
+        if len(in_flight) >= window:
+            yield in_flight.popleft().get()
+    while in_flight:
+        yield in_flight.popleft().get()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('input', help='CSV or JSONL file to import')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-size', type=int, default=5000, help='rows per transaction')
+    parser.add_argument('--rejects', help='where to write rejected records (default: <input>.rejects.jsonl)')
+    parser.add_argument('--restart', action='store_true', help='ignore any saved checkpoint')
+    parser.add_argument('--durable', action='store_true',
+                        help='keep synchronous=NORMAL instead of relaxing it for speed')
+    args = parser.parse_args()
+
+    # Imported here so worker processes only load the validators
+    import app
+
+    source = os.path.abspath(args.input)
+    rejects_path = args.rejects or os.path.splitext(args.input)[0] + '.rejects.jsonl'
+
+    conn = app.db_pool.acquire()
+    try:
+        conn.execute(CHECKPOINT_TABLE_SQL)
+        conn.commit()
+
+        # Relaxed settings for this connection only - the app's pooled
+        # connections keep their own PRAGMAs
+        if not args.durable:
+            conn.execute('PRAGMA synchronous=OFF')
+        conn.execute('PRAGMA cache_size=-200000')  # ~200MB page cache
+        conn.execute('PRAGMA temp_store=MEMORY')
+
+        checkpoint = None
+        if not args.restart:
+            checkpoint = conn.execute(
+                'SELECT records_consumed, rows_imported, rows_rejected, rejects_offset '
+                'FROM import_checkpoints WHERE source = ?', (source,)
+            ).fetchone()
+
+        if checkpoint:
+            consumed, imported, rejected_count, rejects_offset = checkpoint
+            print(f"Resuming {args.input} after {consumed} records "
+                  f"({imported} imported, {rejected_count} rejected)")
+        else:
+            consumed = imported = rejected_count = rejects_offset = 0
+
+        # Drop reject lines written after the last committed batch
+        rejects = open(rejects_path, 'a+b')
+        rejects.truncate(rejects_offset)
+        rejects.seek(rejects_offset)
+
+        columns = app.SUBMISSION_COLUMNS + ('submitted_at',)
+        insert_sql = (
+            f"INSERT INTO contact_submissions ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in app.SUBMISSION_COLUMNS)}, COALESCE(?, CURRENT_TIMESTAMP))"
+        )
+
+        started = time.perf_counter()
+        last_report = started
+        session_records = 0
+        pending_rows = []
+
+        def commit(position):
+            """Write pending rows and the checkpoint in one transaction"""
+            nonlocal imported
+            rejects.flush()
+            os.fsync(rejects.fileno())
+            conn.executemany(insert_sql, pending_rows)
+            imported += len(pending_rows)
+            conn.execute(SAVE_CHECKPOINT_SQL, (source, position, imported, rejected_count, rejects.tell()))
+            conn.commit()
+            pending_rows.clear()
+
+        with Pool(args.workers) as pool:
+            chunks = chunked(read_records(args.input), consumed)
+            for position, valid, rejected in bounded_imap(pool, validate_chunk, chunks, args.workers * 2):
+                for data, submitted_at in valid:
+                    pending_rows.append(app.submission_params(data) + (submitted_at,))
+                for reject_position, record, errors in rejected:
+                    line = json.dumps({'position': reject_position, 'record': record, 'errors': errors},
+                                      default=str)
+                    rejects.write(line.encode('utf-8') + b'\n')
+                rejected_count += len(rejected)
+                session_records += position - consumed
+                consumed = position
+
+                if len(pending_rows) >= args.batch_size:
+                    commit(consumed)
+
+                now = time.perf_counter()
+                if now - last_report >= 2:
+                    last_report = now
+                    rate = session_records / (now - started)
+                    print(f"  {consumed:>10} records read  {imported + len(pending_rows):>10} imported  "
+                          f"{rejected_count:>8} rejected  {rate:>9.0f} records/s", flush=True)
+
+            commit(consumed)
+
+        rejects.close()
+        elapsed = time.perf_counter() - started
+        rate = session_records / elapsed if elapsed else 0
+        print(f"✅ Imported {imported} submissions, rejected {rejected_count} "
+              f"({session_records} records in {elapsed:.1f}s, {rate:.0f} records/s)")
+        if rejected_count:
+            print(f"   Rejected records: {rejects_path}")
+    finally:
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA cache_size=-2000')
+        app.db_pool.release(conn)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+In-process metrics exposed in Prometheus text format on /metrics.
+
+Recording a sample must be cheap enough to do on every request, so each
+thread writes to its own shard of plain dicts and the hot path takes no
+lock: under the GIL a dict update by the only thread that writes that
+shard is safe. A scrape walks every shard and adds them up. Shards of
+threads that have exited are folded into one retired shard, so thread
+churn (e.g. the development server's thread-per-request) does not grow
+the list without bound.
+
+Metric families are declared once at import time:
+
+    REQUESTS = registry.counter('http_requests_total', 'HTTP requests', ('route', 'method', 'status'))
+    REQUESTS.inc('/contact', 'POST', '302')
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import Response, g, request
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bounds (seconds) for latency histograms
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Shard:
+    """One thread's samples: {(metric name, label values): value}"""
+
+    __slots__ = ('counters', 'gauges', 'histograms')
+
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}  # key -> [count per bucket..., +Inf count, sum]
+
+    def merge(self, other):
+        for key, value in other.counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, value in other.gauges.items():
+            self.gauges[key] = self.gauges.get(key, 0) + value
+        for key, values in other.histograms.items():
+            mine = self.histograms.get(key)
+            if mine is None:
+                self.histograms[key] = list(values)
+            else:
+                for i, value in enumerate(values):
+                    mine[i] += value
+
+
+class Registry:
+    """Holds metric families and the per-thread shards they write to"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []  # (thread, shard) for live threads
+        self._retired = _Shard()
+        self._families = []
+
+    def shard(self):
+        """The calling thread's shard"""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._fold_dead_threads()
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def _fold_dead_threads(self):
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                self._retired.merge(shard)
+        self._shards = live
+
+    def snapshot(self):
+        """Sum of every shard, as one _Shard"""
+        total = _Shard()
+        with self._lock:
+            self._fold_dead_threads()
+            total.merge(self._retired)
+            shards = [shard for _, shard in self._shards]
+        for shard in shards:
+            # Copy first: the owning thread may add keys while we read
+            copy = _Shard()
+            copy.counters = dict(shard.counters)
+            copy.gauges = dict(shard.gauges)
+            copy.histograms = {key: list(values) for key, values in list(shard.histograms.items())}
+            total.merge(copy)
+        return total
+
+    def counter(self, name, documentation, labels=()):
+        return self._add(Counter(self, name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()):
+        return self._add(Gauge(self, name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(self, name, documentation, labels, buckets))
+
+    def _add(self, family):
+        self._families.append(family)
+        return family
+
+    def render(self):
+        """All metrics in Prometheus text exposition format"""
+        total = self.snapshot()
+        lines = []
+        for family in self._families:
+            lines.append(f'# HELP {family.name} {family.documentation}')
+            lines.append(f'# TYPE {family.name} {family.kind}')
+            family.render(total, lines)
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Family:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labels):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    def _samples(self, values):
+        return sorted((key[1], value) for key, value in values.items() if key[0] == self.name)
+
+
+class Counter(_Family):
+    kind = 'counter'
+
+    def inc(self, *label_values, amount=1):
+        counters = self.registry.shard().counters
+        key = (self.name, label_values)
+        counters[key] = counters.get(key, 0) + amount
+
+    def render(self, total, lines):
+        for label_values, value in self._samples(total.counters):
+            lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}')
+
+
+class Gauge(_Family):
+    """A gauge moved up and down by inc()/dec(); shards hold deltas that sum to the value"""
+
+    kind = 'gauge'
+
+    def inc(self, *label_values, amount=1):
+        gauges = self.registry.shard().gauges
+        key = (self.name, label_values)
+        gauges[key] = gauges.get(key, 0) + amount
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+    def render(self, total, lines):
+        samples = self._samples(total.gauges)
+        if not samples and not self.labels:
+            samples = [((), 0)]
+        for label_values, value in samples:
+            lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}')
+
+
+class Histogram(_Family):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labels, buckets):
+        super().__init__(registry, name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *label_values):
+        histograms = self.registry.shard().histograms
+        key = (self.name, label_values)
+        counts = histograms.get(key)
+        if counts is None:
+            # One slot per bucket, one for +Inf, then the running sum
+            counts = histograms[key] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def render(self, total, lines):
+        for label_values, counts in self._samples(total.histograms):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == '+Inf' else f'le="{bound}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}')
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f'{self.name}_sum{labels} {_format_value(counts[-1])}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+
+
+# Metrics shared by both app variants
+registry = Registry()
+
+REQUESTS = registry.counter(
+    'http_requests_total', 'HTTP requests handled', ('route', 'method', 'status'))
+IN_FLIGHT = registry.gauge(
+    'http_requests_in_flight', 'HTTP requests currently being handled')
+REQUEST_DURATION = registry.histogram(
+    'http_request_duration_seconds', 'Time to handle an HTTP request', ('route', 'method', 'status'))
+DB_DURATION = registry.histogram(
+    'db_call_duration_seconds', 'Time spent in database calls', ('backend', 'operation'))
+DB_ERRORS = registry.counter(
+    'db_call_errors_total', 'Database calls that raised', ('backend', 'operation'))
+VALIDATION_FAILURES = registry.counter(
+    'validation_failures_total', 'Contact form fields that failed validation', ('field',))
+CACHE_LOOKUPS = registry.counter(
+    'cache_lookups_total', 'Cache lookups by outcome (hits, misses, coalesced)', ('cache', 'outcome'))
+RATE_LIMITED = registry.counter(
+    'rate_limited_requests_total', 'Requests refused with 429 by the rate limiter', ('endpoint', 'key'))
+
+
+@contextmanager
+def db_timer(backend, operation):
+    """Time the enclosed database call into DB_DURATION (and DB_ERRORS if it raises)"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        DB_ERRORS.inc(backend, operation)
+        raise
+    finally:
+        DB_DURATION.observe(time.perf_counter() - started, backend, operation)
+
+
+def db_call(backend, operation):
+    """Decorator form of db_timer()"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with db_timer(backend, operation):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_validation_failures(errors):
+    """Count each failed field of a FormResult.errors mapping"""
+    for field in errors:
+        VALIDATION_FAILURES.inc(field)
+
+
+class RequestMetrics:
+    """Per-request counters, in-flight gauge and latency histogram, plus /metrics"""
+
+    def __init__(self, app, endpoint='/metrics'):
+        app.before_request(self._before)
+        app.after_request(self._after)
+        app.teardown_request(self._teardown)
+        app.add_url_rule(endpoint, 'metrics', self.serve)
+
+    def _before(self):
+        g._metrics_started = time.perf_counter()
+        IN_FLIGHT.inc()
+
+    def _after(self, response):
+        g._metrics_status = response.status_code
+        return response
+
+    def _teardown(self, error):
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return
+        IN_FLIGHT.dec()
+        # The rule, not the URL, so /attachments/<digest> stays one series
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        status = str(g.pop('_metrics_status', 500))
+        REQUESTS.inc(route, request.method, status)
+        REQUEST_DURATION.observe(time.perf_counter() - started, route, request.method, status)
+
+    def serve(self):
+        return Response(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,89 @@
+"""
+Rendered-response cache for pages whose output never changes.
+
+Views decorated with @page_cache.cached are rendered once per URL. The
+body and a strong ETag (SHA-256 of the body) are kept in memory, so later
+hits skip template rendering entirely. A request whose If-None-Match
+matches gets an empty 304.
+
+Rendered pages are the same for every visitor except for flashed messages,
+which base.html reads from the session. A request with pending flashes is
+therefore rendered normally and neither served from nor stored in the
+cache. Responses are sent with "Cache-Control: no-cache", so browsers
+revalidate each time (a cheap 304) and always see a pending flash.
+
+The cache is on unless the app sets PAGE_CACHE_ENABLED to false. It does
+not watch template files, so a template edited while the app is running
+shows up after a restart (or with the cache turned off).
+"""
+
+import hashlib
+import threading
+from functools import wraps
+
+from flask import Response, current_app, request, session
+
+CACHE_CONTROL = 'public, no-cache'
+
+
+class PageCache:
+    """In-memory cache of rendered pages keyed by endpoint and URL arguments"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._pages = {}  # key -> (body bytes, etag, mimetype)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'bypassed': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def cached(self, view):
+        """Decorator: serve the view's rendered output from memory"""
+        @wraps(view)
+        def wrapper(**view_args):
+            # Flashed messages are per-visitor
+            if not self.enabled or request.method not in ('GET', 'HEAD') or '_flashes' in session:
+                self._count('bypassed')
+                response = current_app.make_response(view(**view_args))
+                response.headers['Cache-Control'] = 'no-store'
+                return response
+
+            key = (request.endpoint, request.script_root, tuple(sorted(view_args.items())))
+            page = self._pages.get(key)
+            if page is None:
+                response = current_app.make_response(view(**view_args))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                page = (body, hashlib.sha256(body).hexdigest()[:32], response.mimetype)
+                with self._lock:
+                    self._pages[key] = page
+                self._count('misses')
+            else:
+                self._count('hits')
+
+            body, etag, mimetype = page
+            if request.if_none_match.contains(etag):
+                self._count('not_modified')
+                response = Response(status=304)
+            else:
+                response = Response(body, mimetype=mimetype)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = CACHE_CONTROL
+            response.vary.add('Cookie')  # the flash check above depends on the session
+            return response
+        return wrapper
+
+    def clear(self):
+        """Forget every rendered page, e.g. after editing templates"""
+        with self._lock:
+            self._pages.clear()
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['pages'] = len(self._pages)
+        return snapshot
@@ -0,0 +1,88 @@
+"""
+Background periodic tasks.
+
+A daemon thread calls a function every `interval` seconds and records when
+it last ran, how long it took and whether it raised, so status endpoints
+can report on background jobs (syncing the Supabase mirror, refreshing the
+analytics snapshot) without running them.
+"""
+
+import os
+import threading
+import time
+
+
+class PeriodicTask:
+    """Runs func() every `interval` seconds in a daemon thread"""
+
+    def __init__(self, func, interval, name):
+        self.func = func
+        self.interval = interval
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._state = {
+            'status': 'unknown',     # 'ok', 'error' or 'unknown' before the first run
+            'runs': 0,
+            'duration_ms': None,
+            'last_run_at': None,     # wall-clock time the last run finished
+            'last_ok_at': None,
+            'last_error': None,
+            'consecutive_failures': 0,
+        }
+
+    def start(self):
+        """Start the thread in this process if it is not running"""
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            # A forked worker inherits the object but not the thread
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    def run_once(self):
+        """Call func() once and record the outcome"""
+        started = time.perf_counter()
+        try:
+            self.func()
+            error = None
+        except Exception as e:
+            error = str(e)[:500]
+        duration_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        now = time.time()
+        with self._lock:
+            state = self._state
+            state['runs'] += 1
+            state['duration_ms'] = duration_ms
+            state['last_run_at'] = now
+            if error is None:
+                state['status'] = 'ok'
+                state['last_ok_at'] = now
+                state['consecutive_failures'] = 0
+            else:
+                state['status'] = 'error'
+                state['last_error'] = error
+                state['consecutive_failures'] += 1
+
+    def stop(self):
+        """Stop the thread after its current run"""
+        self._stop.set()
+
+    def state(self):
+        """Return the outcome of the most recent runs"""
+        self.start()
+        with self._lock:
+            return dict(self._state)
@@ -0,0 +1,127 @@
+"""
+Read-through TTL + LRU cache for repeated database queries.
+
+Entries are keyed by the shape of the query (table, order, limit,
+filters), expire after `ttl` seconds and the least recently used entry is
+evicted once `max_entries` is reached. invalidate() drops everything; it
+also bumps a generation counter so a load that was already in flight when
+the data changed is not stored afterwards.
+
+Concurrent misses for the same key are coalesced: one caller runs the
+loader and the others wait for its result instead of repeating the work.
+A cache created with a name also counts its hits, misses and coalesced
+lookups in the cache_lookups_total metric.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import CACHE_LOOKUPS
+
+
+class _Flight:
+    """One in-progress load that other callers can wait for"""
+
+    __slots__ = ('done', 'value', 'failed')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.failed = False
+
+
+class QueryCache:
+    """Thread-safe TTL cache with LRU eviction and hit/miss counters"""
+
+    def __init__(self, ttl=5.0, max_entries=128, enabled=True, name=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.name = name
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}  # (key, generation) -> _Flight
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'expired': 0, 'evictions': 0,
+                       'invalidations': 0}
+
+    def _count(self, outcome):
+        """Count a lookup outcome; caller holds the lock"""
+        self._stats[outcome] += 1
+        if self.name:
+            CACHE_LOOKUPS.inc(self.name, outcome)
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() on a miss
+
+        Exceptions from loader() propagate and nothing is cached. A caller
+        that was waiting on a load that failed runs loader() itself.
+        """
+        if not self.enabled:
+            return loader()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._count('hits')
+                    return entry[1]
+                del self._entries[key]
+                self._stats['expired'] += 1
+            generation = self._generation
+            # Keyed by generation too: a lookup after invalidate() must not
+            # be handed the result of a load that started before it
+            flight = self._inflight.get((key, generation))
+            leader = flight is None
+            if leader:
+                flight = self._inflight[(key, generation)] = _Flight()
+                self._count('misses')
+            else:
+                self._count('coalesced')
+
+        if not leader:
+            flight.done.wait()
+            return loader() if flight.failed else flight.value
+
+        # Loaded outside the lock so one slow query does not block other keys
+        try:
+            value = loader()
+        except BaseException:
+            with self._lock:
+                del self._inflight[(key, generation)]
+            flight.failed = True
+            flight.done.set()
+            raise
+
+        with self._lock:
+            del self._inflight[(key, generation)]
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats['evictions'] += 1
+        flight.value = value
+        flight.done.set()
+        return value
+
+    def invalidate(self):
+        """Drop every entry, e.g. after a write"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot['size'] = len(self._entries)
+        lookups = snapshot['hits'] + snapshot['misses'] + snapshot['coalesced']
+        snapshot['hit_ratio'] = round(snapshot['hits'] / lookups, 3) if lookups else 0.0
+        snapshot.update(enabled=self.enabled, ttl=self.ttl, max_entries=self.max_entries)
+        return snapshot
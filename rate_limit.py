@@ -0,0 +1,213 @@
+"""
+Token-bucket rate limiting for the form endpoints.
+
+Each client gets a bucket per route holding up to `burst` tokens that refill
+at `rate` per second; a request takes one token or is refused with
+429 Too Many Requests and a Retry-After header saying when the next token
+will be there.
+
+Buckets are keyed by client IP, checked in a before_request hook so a
+throttled request is refused before its body is read. The IP is
+request.remote_addr; behind a reverse proxy that is the proxy's address,
+so the app must apply werkzeug's ProxyFix (TRUSTED_PROXIES in both apps)
+for every visitor to get a bucket of their own. A request carrying
+X-Forwarded-For without ProxyFix in place is logged once as a warning. Routes can also
+limit per email address; the view calls check() with the submitted address
+as soon as the form is parsed, before any validation or database work.
+
+Two bucket stores:
+- MemoryStore: a dict in this process (one worker, or a per-worker limit).
+- SQLiteStore: one table in a shared database file, so every worker on the
+  host draws from the same buckets.
+
+    limiter = RateLimiter(app, MemoryStore(), {
+        'contact': RouteLimits(ip=parse_limit('10/minute'), email=parse_limit('5/minute')),
+    })
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import Response, jsonify, request
+
+from app_logging import get_logger, log_event
+from db_pool import ConnectionPool
+from metrics import RATE_LIMITED
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+# Refill `rate` tokens per second, hold at most `burst`
+Limit = namedtuple('Limit', 'rate burst')
+
+# Limits for one endpoint: per client IP and/or per submitted email, applied
+# to the listed methods only
+RouteLimits = namedtuple('RouteLimits', 'ip email methods', defaults=(None, None, ('POST',)))
+
+
+def parse_limit(text):
+    """'10/minute' -> Limit allowing a burst of 10, refilled at 10 per minute"""
+    count, _, period = text.partition('/')
+    count = float(count)
+    if count <= 0 or period not in PERIODS:
+        raise ValueError(f'Invalid rate limit {text!r}; expected e.g. "10/minute"')
+    return Limit(rate=count / PERIODS[period], burst=count)
+
+
+def take_token(tokens, updated, now, limit):
+    """Refill a bucket and try to take one token
+
+    Returns (allowed, tokens, retry_after seconds).
+    """
+    tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / limit.rate
+
+
+class MemoryStore:
+    """Buckets in a dict, least recently used dropped beyond max_keys"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (limit.burst, now))
+            allowed, tokens, retry_after = take_token(tokens, updated, now, limit)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                # A dropped bucket comes back full, which only errs towards allowing
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def stats(self):
+        return {'store': 'memory', 'buckets': len(self._buckets)}
+
+
+class SQLiteStore:
+    """Buckets in a table of a database file shared by every worker"""
+
+    # Rows idle this long are full again and can be deleted
+    PRUNE_AFTER = 86400
+    PRUNE_EVERY = 1000
+
+    def __init__(self, database, max_connections=4):
+        self.pool = ConnectionPool(database, max_connections=max_connections)
+        self._hits = 0
+        self.pool.run(lambda conn: conn.execute('''
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            ) WITHOUT ROWID
+        '''))
+
+    def hit(self, key, limit, now=None):
+        # Wall clock: it has to agree between processes
+        now = time.time() if now is None else now
+
+        def take(conn):
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?',
+                               (key,)).fetchone()
+            tokens, updated = row if row else (limit.burst, now)
+            allowed, tokens, retry_after = take_token(tokens, updated, now, limit)
+            conn.execute('INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                         (key, tokens, now))
+            return allowed, retry_after
+
+        result = self.pool.run(take)
+        self._hits += 1
+        if self._hits % self.PRUNE_EVERY == 0:
+            self.pool.run(lambda conn: conn.execute('DELETE FROM rate_limit_buckets WHERE updated < ?',
+                                                    (now - self.PRUNE_AFTER,)))
+        return result
+
+    def stats(self):
+        count = self.pool.run(lambda conn: conn.execute('SELECT count(*) FROM rate_limit_buckets').fetchone()[0])
+        return {'store': 'sqlite', 'buckets': count, 'database': self.pool.database}
+
+
+def make_store(kind, database):
+    """Bucket store named by the RATE_LIMIT_STORE setting ('memory' or 'sqlite')"""
+    if kind == 'sqlite':
+        return SQLiteStore(database)
+    if kind == 'memory':
+        return MemoryStore()
+    raise ValueError(f'Unknown rate limit store {kind!r}')
+
+
+class RateLimiter:
+    """Per-endpoint token buckets in front of a Flask app"""
+
+    def __init__(self, app, store, limits, enabled=True):
+        self.store = store
+        self.limits = limits  # endpoint -> RouteLimits
+        self.enabled = enabled
+        self._throttled = {}  # (endpoint, scope) -> count
+        self._lock = threading.Lock()
+        self._warned_proxy = False
+        app.before_request(self._check_ip)
+
+    def _applies(self, endpoint):
+        route = self.limits.get(endpoint) if self.enabled else None
+        if route is None or request.method not in route.methods:
+            return None
+        return route
+
+    def _hit(self, endpoint, scope, value, limit):
+        allowed, retry_after = self.store.hit(f'{endpoint}:{scope}:{value}', limit)
+        if allowed:
+            return None
+        RATE_LIMITED.inc(endpoint, scope)
+        with self._lock:
+            self._throttled[(endpoint, scope)] = self._throttled.get((endpoint, scope), 0) + 1
+        return self.too_many_requests(retry_after)
+
+    def _check_ip(self):
+        route = self._applies(request.endpoint)
+        if route is None or route.ip is None:
+            return None
+        if not self._warned_proxy and 'X-Forwarded-For' in request.headers \
+                and 'werkzeug.proxy_fix.orig' not in request.environ:
+            # Every client behind this proxy shares the proxy's bucket
+            self._warned_proxy = True
+            log_event(get_logger(), logging.WARNING, 'rate_limit_untrusted_proxy',
+                      remote_addr=request.remote_addr,
+                      hint='set TRUSTED_PROXIES to the number of proxies in front of the app')
+        return self._hit(request.endpoint, 'ip', request.remote_addr, route.ip)
+
+    def check(self, scope, value):
+        """Take a token for `value` (e.g. the submitted email) on the current endpoint
+
+        Returns a 429 response to send back, or None if the request may go on.
+        """
+        route = self._applies(request.endpoint)
+        limit = getattr(route, scope, None) if route else None
+        if limit is None or not value:
+            return None
+        return self._hit(request.endpoint, scope, str(value).strip().lower(), limit)
+
+    def too_many_requests(self, retry_after):
+        seconds = max(1, math.ceil(retry_after))
+        message = f'Too many requests. Please try again in {seconds} seconds.'
+        if request.path.startswith('/api/'):
+            response = jsonify({'error': message})
+            response.status_code = 429
+        else:
+            response = Response(message, status=429, mimetype='text/plain')
+        response.headers['Retry-After'] = str(seconds)
+        return response
+
+    def stats(self):
+        with self._lock:
+            throttled = {f'{endpoint}:{scope}': count for (endpoint, scope), count in self._throttled.items()}
+        return {'enabled': self.enabled, 'throttled': throttled, **self.store.stats()}
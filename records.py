@@ -0,0 +1,86 @@
+"""
+Submission records shared by both app variants.
+
+A Submission holds one contact form submission in __slots__ attributes,
+so templates read `submission.priority` instead of `submission[7]` while a
+row costs about as much memory as the tuple sqlite3 returns (and far less
+than the dict of every column Supabase returns).
+
+- app.py builds them straight from cursor rows with submission_factory
+  (cursor.row_factory), in SUBMISSION_SELECT column order
+- app_with_database.py converts Supabase records with Submission.from_record
+
+Stored values are kept as they come from the database; `topics` (bitmask
+or list), `contact_date` and `submitted` are decoded only when accessed.
+"""
+
+from datetime import date, datetime
+
+from topics import topic_names
+
+# Attributes written by as_dict(), e.g. for |tojson in admin.html
+FIELDS = ('id', 'name', 'email', 'phone', 'age', 'date', 'message', 'priority', 'topics',
+          'satisfaction', 'filename', 'submitted_at', 'attachment_sha256', 'form_version')
+
+
+class Submission:
+    """One contact form submission"""
+
+    __slots__ = ('id', 'name', 'email', 'phone', 'age', 'date', 'message', 'priority', 'raw_topics',
+                 'satisfaction', 'filename', 'submitted_at', 'attachment_sha256', 'excerpt', 'form_version')
+
+    def __init__(self, id, name, email, phone, age, date, message, priority, raw_topics,
+                 satisfaction, filename, submitted_at, attachment_sha256=None, excerpt=None,
+                 form_version=None):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.phone = phone
+        self.age = age
+        self.date = date                  # contact date as stored, e.g. '2024-01-15'
+        self.message = message
+        self.priority = priority
+        self.raw_topics = raw_topics      # topics_mask (SQLite) or list of names (Supabase)
+        self.satisfaction = satisfaction
+        self.filename = filename
+        self.submitted_at = submitted_at  # timestamp text as stored
+        self.attachment_sha256 = attachment_sha256
+        self.excerpt = excerpt            # search results only (see search_index.py)
+        self.form_version = form_version
+
+    @classmethod
+    def from_record(cls, record):
+        """Submission from a Supabase contact_submissions record"""
+        return cls(record.get('id'), record.get('name'), record.get('email'), record.get('phone'),
+                   record.get('age'), record.get('contact_date'), record.get('message'),
+                   record.get('priority'), record.get('topics'), record.get('satisfaction'),
+                   record.get('filename'), record.get('created_at'),
+                   form_version=record.get('form_version'))
+
+    @property
+    def topics(self):
+        """Topic names, in VALID_TOPICS order for SQLite rows"""
+        return topic_names(self.raw_topics)
+
+    @property
+    def contact_date(self):
+        """The contact date as a date, or None"""
+        return date.fromisoformat(self.date) if self.date else None
+
+    @property
+    def submitted(self):
+        """submitted_at as a datetime, or None"""
+        if not self.submitted_at:
+            return None
+        return datetime.fromisoformat(self.submitted_at.replace('Z', '+00:00'))
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+    def __repr__(self):
+        return f'<Submission {self.id} {self.email!r}>'
+
+
+def submission_factory(cursor, row):
+    """sqlite3 row factory for SUBMISSION_SELECT (and SEARCH_SQL) rows"""
+    return Submission(*row)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Full-text search over contact submission messages (SQLite FTS5).
+
+submissions_fts is an external-content FTS5 table: it stores only the
+inverted index and reads message text from contact_submissions, which
+triggers keep it in sync on INSERT, UPDATE and DELETE. app.py creates it in
+migration 4 and serves it on /submissions?q=.
+
+Run this script to rebuild the index from scratch, e.g. after restoring a
+database copied without it or loading rows with the triggers dropped:
+
+Usage:
+    python search_index.py [--database contact_submissions.db] [--no-optimize]
+"""
+
+import argparse
+import re
+import sqlite3
+import time
+
+from markupsafe import Markup, escape
+
+FTS_TABLE = 'submissions_fts'
+
+# Markers wrapped around matched terms by snippet(); the excerpt is
+# HTML-escaped before they are turned into <mark> tags.
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+# Tokens of context shown around the best match
+EXCERPT_TOKENS = 24
+
+# bm25 has to score every matching row before the best can be picked, which
+# takes seconds for a word found in most of a million messages. Only the
+# most recent MAX_RANKED_MATCHES matches are ranked and paged through.
+MAX_RANKED_MATCHES = 2000
+
+SEARCH_INDEX_MIGRATION = [
+    # porter: "billing" matches "billed"; remove_diacritics: "cafe" matches "café"
+    f'''CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        message,
+        content='contact_submissions',
+        content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )''',
+    f'''CREATE TRIGGER IF NOT EXISTS submissions_fts_insert AFTER INSERT ON contact_submissions BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, message) VALUES (new.id, new.message);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS submissions_fts_delete AFTER DELETE ON contact_submissions BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, message) VALUES ('delete', old.id, old.message);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS submissions_fts_update AFTER UPDATE OF message ON contact_submissions BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, message) VALUES ('delete', old.id, old.message);
+        INSERT INTO {FTS_TABLE} (rowid, message) VALUES (new.id, new.message);
+    END''',
+    # Index the rows that existed before the migration
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+# Best matches first (bm25). Parameters: ?1 MATCH expression, ?2 LIMIT,
+# ?3 OFFSET. The scalar subquery finds the rowid of the MAX_RANKED_MATCHES-th
+# newest match so FTS5 skips older ones with a rowid range instead of scoring
+# them. Ranking and paging use the index alone; only the page of rows
+# returned is joined back to contact_submissions.
+SEARCH_SQL = f'''
+    SELECT s.id, s.name, s.email, s.phone, s.age, s.date, s.message, s.priority, s.topics_mask,
+           s.satisfaction, s.filename, s.submitted_at, s.attachment_sha256, m.excerpt
+    FROM (
+        SELECT rowid, rank,
+               snippet({FTS_TABLE}, 0, '{MATCH_START}', '{MATCH_END}', '…', {EXCERPT_TOKENS}) AS excerpt
+        FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH ?1
+          AND rowid >= COALESCE((
+              SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?1
+              ORDER BY rowid DESC LIMIT 1 OFFSET {MAX_RANKED_MATCHES - 1}
+          ), 0)
+        ORDER BY rank
+        LIMIT ?2 OFFSET ?3
+    ) AS m
+    JOIN contact_submissions s ON s.id = m.rowid
+    ORDER BY m.rank
+'''
+
+_WORD = re.compile(r'(\w+)(\*?)')
+
+
+def fts_query(text):
+    """Turn free text from the search box into an FTS5 MATCH expression
+
+    Every word must match (after stemming, so "refunds" finds "refunded").
+    A trailing * makes a word a prefix search ("integr*"); prefixes are not
+    added automatically because expanding them costs far more than a word
+    lookup. Words are quoted, so FTS5 operators and stray quotes in the input
+    are searched for literally instead of raising a syntax error. Returns
+    None if there are no words.
+    """
+    terms = [f'"{word}"{star}' for word, star in _WORD.findall(text or '')]
+    if not terms:
+        return None
+    return ' '.join(terms)
+
+
+def highlight(excerpt):
+    """Escape a search excerpt and mark its matched terms with <mark>"""
+    if not excerpt:
+        return ''
+    html = str(escape(excerpt))
+    return Markup(html.replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>'))
+
+
+def rebuild(conn, optimize=True):
+    """Re-index every message; optionally merge the index into one segment"""
+    conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+    if optimize:
+        conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--database', default='contact_submissions.db')
+    parser.add_argument('--no-optimize', action='store_true',
+                        help="skip merging the index into a single b-tree after rebuilding")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.database)
+    try:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (FTS_TABLE,)).fetchone()
+        if not exists:
+            # Older database: create the table and triggers (this also indexes it)
+            for statement in SEARCH_INDEX_MIGRATION:
+                conn.execute(statement)
+            conn.commit()
+        started = time.perf_counter()
+        rebuild(conn, optimize=not args.no_optimize)
+        count = conn.execute('SELECT count(*) FROM contact_submissions').fetchone()[0]
+        print(f"✅ Indexed {count} submission messages in {time.perf_counter() - started:.1f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Serve the fingerprinted, precompressed assets written by build_assets.py.
+
+StaticAssets(app) loads static/dist/manifest.json and replaces url_for in
+templates so url_for('static', filename='css/style.css') links the hashed
+build, e.g. /assets/css/style.3f9a1c2b7d4e.css. Those URLs never change
+content, so they are served with one-year immutable caching, choosing the
+.br or .gz file that matches Accept-Encoding. Nothing is compressed at
+request time.
+
+Without a build (no manifest) url_for falls back to Flask's regular static
+files, so the app still works in development.
+"""
+
+import json
+import mimetypes
+import os
+
+from flask import abort, request, send_file, url_for
+
+from build_assets import DIST_DIR, MANIFEST_NAME
+
+ONE_YEAR = 365 * 24 * 60 * 60
+
+# Preferred first; file suffix written by build_assets.py
+ENCODING_SUFFIXES = (('br', '.br'), ('gzip', '.gz'))
+
+
+class StaticAssets:
+    """Manifest lookup, template url_for override and the /assets route"""
+
+    def __init__(self, app, url_prefix='/assets'):
+        self.dist_dir = os.path.join(app.static_folder, DIST_DIR)
+        self.manifest = {}
+        self.built = {}  # hashed name -> available encodings
+        self.load_manifest()
+
+        app.add_url_rule(f'{url_prefix}/<path:filename>', 'assets', self.serve)
+        app.jinja_env.globals['url_for'] = self.url_for
+
+    def load_manifest(self):
+        """(Re)read the build manifest; empty if build_assets.py has not run"""
+        try:
+            with open(os.path.join(self.dist_dir, MANIFEST_NAME)) as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            self.manifest = {}
+        self.built = {entry['file']: frozenset(entry['encodings']) for entry in self.manifest.values()}
+
+    def url_for(self, endpoint, **values):
+        """url_for for templates: static files resolve to their fingerprinted build"""
+        if endpoint == 'static':
+            entry = self.manifest.get(values.get('filename'))
+            if entry is not None:
+                values['filename'] = entry['file']
+                return url_for('assets', **values)
+        return url_for(endpoint, **values)
+
+    def serve(self, filename):
+        """Send a built asset, precompressed to match Accept-Encoding"""
+        encodings = self.built.get(filename)
+        if encodings is None:
+            abort(404)
+
+        path = os.path.join(self.dist_dir, filename)
+        content_encoding = None
+        for encoding, suffix in ENCODING_SUFFIXES:
+            if encoding in encodings and request.accept_encodings[encoding]:
+                path += suffix
+                content_encoding = encoding
+                break
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_file(path, mimetype=mimetype, max_age=ONE_YEAR, conditional=True)
+        if content_encoding:
+            response.content_encoding = content_encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
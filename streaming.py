@@ -0,0 +1,54 @@
+"""
+Streamed rendering for long listing pages.
+
+render_template() builds the whole document in memory before the first
+byte is sent. stream_page() renders with Flask's stream_template()
+instead, so a template looping over a row generator (e.g. straight from a
+DB cursor) sends the page while it is being rendered: memory stays flat
+however many rows there are and the browser starts on the <head> at once.
+
+Jinja yields many tiny strings; they are joined into chunks of about
+STREAM_CHUNK_SIZE characters so each socket write carries a useful amount.
+
+Streamed templates cannot use |length or test the row generator for
+emptiness; they get `streamed=True` and use {% for %}...{% else %}.
+"""
+
+from types import GeneratorType
+
+from flask import Response, get_flashed_messages, stream_template
+
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def coalesce(chunks, size=STREAM_CHUNK_SIZE):
+    """Join small strings from `chunks` into pieces of at least `size` characters"""
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_page(template_name, **context):
+    """Response that renders template_name as it is sent"""
+    # Popped from the session now: it cannot be saved once streaming starts
+    get_flashed_messages(with_categories=True)
+    chunks = stream_template(template_name, streamed=True, **context)
+
+    def generate():
+        try:
+            yield from coalesce(chunks)
+        finally:
+            # If the client went away mid-page, release the DB cursors now
+            # rather than whenever the generators are garbage collected
+            chunks.close()
+            for value in context.values():
+                if isinstance(value, GeneratorType):
+                    value.close()
+
+    return Response(generate(), mimetype='text/html')
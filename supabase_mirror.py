@@ -0,0 +1,352 @@
+"""
+Local read-through SQLite mirror of the Supabase contact_submissions table.
+
+A background thread calls sync() every few seconds. It asks
+`load_since(watermark, limit)` for rows with created_at >= watermark,
+oldest first, one batch at a time, and upserts them by id into a local
+SQLite table. The first batch of every sync reaches `overlap` seconds
+behind the watermark, so a row committed late with an earlier created_at
+is still picked up; re-read rows are simply written again. The watermark
+and the time of the last complete sync are stored next to the rows, so a
+restarted worker carries on where it left off.
+
+Reads go through read_through(), which serves from the mirror while its
+last complete sync is at most `max_staleness` seconds old and asks
+Supabase otherwise. While Supabase is down (the caller says so, or the
+remote read raises) the mirror keeps being served for up to
+`outage_max_staleness` seconds. Writes never touch the mirror; they go to
+Supabase through the outbox and show up here on a later sync.
+
+The table is append-only as far as the mirror is concerned: rows deleted
+in Supabase stay in the mirror, and rows updated there are only refreshed
+while they are inside the overlap window.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from types import GeneratorType
+
+from db_pool import ConnectionPool
+from admin_stats import PRIORITIES, empty_stats, finish_stats
+from app_logging import get_logger, log_event
+
+# Supabase columns kept in the mirror, in table order; topics is stored as JSON
+MIRROR_COLUMNS = ('id', 'name', 'email', 'phone', 'age', 'contact_date', 'priority', 'topics',
+                  'satisfaction', 'message', 'filename', 'form_version', 'timestamp', 'created_at')
+
+MIRROR_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS contact_submissions_mirror (
+        id INTEGER PRIMARY KEY,
+        name TEXT,
+        email TEXT,
+        phone TEXT,
+        age INTEGER,
+        contact_date TEXT,
+        priority TEXT,
+        topics TEXT,
+        satisfaction INTEGER,
+        message TEXT,
+        filename TEXT,
+        form_version TEXT,
+        timestamp TEXT,
+        created_at TEXT NOT NULL
+    )
+'''
+
+# Supabase writes every created_at with the same +00:00 offset, so text order is time order
+MIRROR_CREATED_INDEX_SQL = '''
+    CREATE INDEX IF NOT EXISTS idx_contact_submissions_mirror_created
+    ON contact_submissions_mirror (created_at, id)
+'''
+
+STATE_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS mirror_state (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+'''
+
+UPSERT_SQL = f'''
+    INSERT OR REPLACE INTO contact_submissions_mirror ({', '.join(MIRROR_COLUMNS)})
+    VALUES ({', '.join('?' * len(MIRROR_COLUMNS))})
+'''
+
+SELECT_STATE_SQL = 'SELECT key, value FROM mirror_state'
+
+SET_STATE_SQL = 'INSERT OR REPLACE INTO mirror_state (key, value) VALUES (?, ?)'
+
+SELECT_SQL = f'SELECT {", ".join(MIRROR_COLUMNS)} FROM contact_submissions_mirror'
+
+PRIORITY_STATS_SQL = '''
+    SELECT priority, COUNT(*), TOTAL(satisfaction), TOTAL(created_at >= ?)
+    FROM contact_submissions_mirror
+    GROUP BY priority
+'''
+
+TOPIC_STATS_SQL = '''
+    SELECT topic.value, COUNT(*)
+    FROM contact_submissions_mirror, json_each(contact_submissions_mirror.topics) AS topic
+    GROUP BY topic.value
+'''
+
+COUNT_SQL = 'SELECT COUNT(*) FROM contact_submissions_mirror'
+
+ROWS_SINCE_SQL = f'{SELECT_SQL} WHERE created_at >= ? ORDER BY created_at, id LIMIT ?'
+
+FIRST_ROWS_SQL = f'{SELECT_SQL} ORDER BY created_at, id LIMIT ?'
+
+
+def parse_timestamp(value):
+    """Supabase timestamptz string -> aware datetime"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def encode_record(record):
+    """One Supabase record as UPSERT_SQL parameters"""
+    values = [record.get(column) for column in MIRROR_COLUMNS]
+    values[MIRROR_COLUMNS.index('topics')] = json.dumps(record.get('topics') or [])
+    return values
+
+
+def started(generator):
+    """Run generator up to its first item now; returns an iterator over all of them"""
+    for first in generator:
+        return chain((first,), generator)
+    return iter(())
+
+
+def decode_row(row):
+    """A mirror row as the dict Supabase would have returned"""
+    record = dict(zip(MIRROR_COLUMNS, row))
+    record['topics'] = json.loads(record['topics']) if record['topics'] else []
+    return record
+
+
+class SupabaseMirror:
+    """SQLite copy of contact_submissions, synced incrementally by created_at"""
+
+    def __init__(self, database, load_since, batch_size=1000, overlap=60,
+                 max_staleness=30.0, outage_max_staleness=86400.0):
+        self.load_since = load_since
+        self.batch_size = batch_size
+        self.overlap = overlap
+        self.max_staleness = max_staleness
+        self.outage_max_staleness = outage_max_staleness
+
+        self.pool = ConnectionPool(database, max_connections=8)
+        with self.pool.connection() as conn:
+            conn.execute(MIRROR_TABLE_SQL)
+            conn.execute(MIRROR_CREATED_INDEX_SQL)
+            conn.execute(STATE_TABLE_SQL)
+            state = dict(conn.execute(SELECT_STATE_SQL).fetchall())
+
+        self._watermark = state.get('watermark')  # created_at string of the newest row copied
+        # Start time of the last complete sync, possibly by an earlier process
+        self._synced_at = float(state['synced_at']) if state.get('synced_at') else None
+        self._sync_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stats = {
+            'syncs': 0,
+            'rows_synced': 0,
+            'sync_ms': None,
+            'reads_local': 0,
+            'reads_remote': 0,
+            'reads_fallback': 0,
+        }
+
+    # Syncing
+
+    def sync(self):
+        """Copy rows added since the last sync; returns how many were read
+
+        Each batch is committed together with the watermark it reaches, so
+        an interrupted sync resumes from the last committed batch.
+        """
+        with self._sync_lock:
+            started = time.time()
+            since = self._overlap_start()
+            batch_size = self.batch_size
+            copied = 0
+            while True:
+                rows = self.load_since(since, batch_size)
+                if rows:
+                    watermark = self._newer(rows[-1]['created_at'])
+                    self.pool.run(lambda conn: self._store(conn, rows, watermark))
+                    self._watermark = watermark
+                    copied += len(rows)
+                if len(rows) < batch_size:
+                    break
+                if rows[-1]['created_at'] == since:
+                    # A full batch sharing one timestamp: widen the batch to get past it
+                    batch_size *= 2
+                since = rows[-1]['created_at']
+
+            self.pool.run(lambda conn: conn.execute(SET_STATE_SQL, ('synced_at', repr(started))))
+            self._synced_at = started
+            with self._lock:
+                self._stats['syncs'] += 1
+                self._stats['rows_synced'] += copied
+                self._stats['sync_ms'] = round((time.time() - started) * 1000, 2)
+            return copied
+
+    @staticmethod
+    def _store(conn, rows, watermark):
+        conn.executemany(UPSERT_SQL, [encode_record(record) for record in rows])
+        conn.execute(SET_STATE_SQL, ('watermark', watermark))
+
+    def _newer(self, created_at):
+        """The later of created_at and the current watermark"""
+        if self._watermark is None or parse_timestamp(created_at) > parse_timestamp(self._watermark):
+            return created_at
+        return self._watermark
+
+    def _overlap_start(self):
+        if self._watermark is None:
+            return None
+        return (parse_timestamp(self._watermark) - timedelta(seconds=self.overlap)).isoformat()
+
+    # Reading
+
+    def staleness(self):
+        """Seconds since the last complete sync started (inf before the first)"""
+        if self._synced_at is None:
+            return math.inf
+        return max(0.0, time.time() - self._synced_at)
+
+    def read_through(self, load_remote, load_local, remote_up=True):
+        """Return load_local() while the mirror is fresh enough, else load_remote()
+
+        With Supabase down (remote_up is False, or load_remote() raises) the
+        mirror is served instead as long as it is within outage_max_staleness.
+        A generator from load_remote() (a paged listing) is started here, so
+        a failure on its first page falls back too; a failure on a later
+        page surfaces mid-stream, after part of the response has been sent.
+        """
+        staleness = self.staleness()
+        if staleness <= self.max_staleness:
+            self._count('reads_local')
+            return load_local()
+
+        if remote_up or staleness > self.outage_max_staleness:
+            try:
+                result = load_remote()
+                if isinstance(result, GeneratorType):
+                    result = started(result)
+            except Exception as e:
+                if staleness > self.outage_max_staleness:
+                    raise
+                log_event(get_logger(), logging.WARNING, 'mirror_fallback', error=str(e),
+                          staleness_seconds=round(staleness, 3))
+            else:
+                self._count('reads_remote')
+                return result
+
+        self._count('reads_fallback')
+        return load_local()
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def recent(self, limit):
+        """The newest `limit` submissions, newest first"""
+        sql = f'{SELECT_SQL} ORDER BY created_at DESC, id DESC LIMIT ?'
+        rows = self.pool.run(lambda conn: conn.execute(sql, (limit,)).fetchall())
+        return [decode_row(row) for row in rows]
+
+    def iter_records(self, filters, newest_first=False, batch_size=500):
+        """Yield matching submissions, oldest (or newest) first, batch_size at a time
+
+        Takes the same filters as iter_contact_submissions(): since and
+        before (dates or datetimes) and priority. Each batch is a keyset
+        query on id, and the connection goes back to the pool in between,
+        so a slow streamed response never holds one.
+        """
+        conditions, params = [], []
+        if 'since' in filters:
+            conditions.append('created_at >= ?')
+            params.append(filters['since'].isoformat())
+        if 'before' in filters:
+            conditions.append('created_at < ?')
+            params.append(filters['before'].isoformat())
+        if 'priority' in filters:
+            conditions.append('priority = ?')
+            params.append(filters['priority'])
+
+        def batch_sql(seek):
+            where = conditions + ([seek] if seek else [])
+            sql = SELECT_SQL
+            if where:
+                sql += ' WHERE ' + ' AND '.join(where)
+            return sql + (' ORDER BY id DESC LIMIT ?' if newest_first else ' ORDER BY id LIMIT ?')
+
+        first_sql = batch_sql(None)
+        next_sql = batch_sql('id < ?' if newest_first else 'id > ?')
+
+        rows = self.pool.run(lambda conn: conn.execute(first_sql, (*params, batch_size)).fetchall())
+        while rows:
+            for row in rows:
+                yield decode_row(row)
+            if len(rows) < batch_size:
+                break
+            last_id = rows[-1][0]
+            rows = self.pool.run(
+                lambda conn: conn.execute(next_sql, (*params, last_id, batch_size)).fetchall()
+            )
+
+    def rows_since(self, since, limit):
+        """Mirrored rows created at or after `since`, oldest first
+
+        The same contract as `load_since`, answered locally, so other
+        incremental readers (the analytics snapshot) can follow the mirror
+        instead of polling Supabase themselves.
+        """
+        if since is None:
+            rows = self.pool.run(lambda conn: conn.execute(FIRST_ROWS_SQL, (limit,)).fetchall())
+        else:
+            rows = self.pool.run(lambda conn: conn.execute(ROWS_SINCE_SQL, (since, limit)).fetchall())
+        return [decode_row(row) for row in rows]
+
+    def dashboard_stats(self, recent_days=7):
+        """The admin dashboard stats, computed over the mirror"""
+        since = (datetime.now(timezone.utc) - timedelta(days=recent_days)).date().isoformat()
+
+        def query(conn):
+            return (conn.execute(PRIORITY_STATS_SQL, (since,)).fetchall(),
+                    conn.execute(TOPIC_STATS_SQL).fetchall())
+
+        by_priority, by_topic = self.pool.run(query)
+
+        stats = empty_stats()
+        satisfaction_sum = 0
+        for priority, count, satisfaction, recent in by_priority:
+            stats['total_submissions'] += count
+            if priority in PRIORITIES:
+                stats['priority_counts'][priority] += count
+            satisfaction_sum += satisfaction
+            stats['recent_submissions'] += int(recent)
+        stats['topic_counts'] = {topic: count for topic, count in by_topic}
+        return finish_stats(stats, satisfaction_sum)
+
+    def stats(self):
+        """Return the watermark, staleness and read counters"""
+        rows = self.pool.run(lambda conn: conn.execute(COUNT_SQL).fetchone()[0])
+        staleness = self.staleness()
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['rows'] = rows
+        snapshot['watermark'] = self._watermark
+        snapshot['synced_at'] = self._synced_at
+        snapshot['staleness_seconds'] = round(staleness, 3) if staleness != math.inf else None
+        snapshot['fresh'] = staleness <= self.max_staleness
+        snapshot['max_staleness'] = self.max_staleness
+        snapshot['outage_max_staleness'] = self.outage_max_staleness
+        return snapshot
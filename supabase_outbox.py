@@ -0,0 +1,295 @@
+"""
+Durable local outbox for Supabase writes.
+
+A request appends the validated submission to a local SQLite table (one
+small WAL commit, well under a millisecond) and returns immediately.
+A background sender thread takes the oldest pending rows, sends them to
+Supabase in one batched upsert and deletes them locally once Supabase has
+accepted them.
+
+Every row carries a random dedupe_key that is also sent to Supabase, where
+a UNIQUE constraint on it makes the upsert idempotent: if a batch reaches
+Supabase but the response is lost, the retry inserts nothing twice.
+Failed batches are retried with exponential backoff (with jitter), and
+rows stay in the outbox across restarts until they have been delivered.
+
+A batch that Supabase rejects for its content (a data or constraint
+error) is split in half and each half is sent again, down to single rows,
+so one bad row cannot hold back the rest. A row rejected on its own is
+retried with backoff like any other; after `max_attempts` rejections it
+is moved to the supabase_outbox_dead table. Outages and other transient
+errors never dead-letter a row.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+
+from db_pool import ConnectionPool
+from metrics import db_timer
+from app_logging import get_logger, log_event
+
+OUTBOX_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS supabase_outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dedupe_key TEXT NOT NULL UNIQUE,
+        payload TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL,
+        last_error TEXT
+    )
+'''
+
+OUTBOX_DUE_INDEX_SQL = '''
+    CREATE INDEX IF NOT EXISTS idx_supabase_outbox_due
+    ON supabase_outbox (next_attempt_at, id)
+'''
+
+APPEND_SQL = '''
+    INSERT INTO supabase_outbox (dedupe_key, payload, created_at, next_attempt_at)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (dedupe_key) DO NOTHING
+'''
+
+SELECT_ID_BY_KEY_SQL = 'SELECT id FROM supabase_outbox WHERE dedupe_key = ?'
+
+SELECT_DUE_SQL = '''
+    SELECT id, dedupe_key, payload, attempts FROM supabase_outbox
+    WHERE next_attempt_at <= ?
+    ORDER BY next_attempt_at, id
+    LIMIT ?
+'''
+
+DELETE_SENT_SQL = 'DELETE FROM supabase_outbox WHERE id = ?'
+
+RESCHEDULE_SQL = '''
+    UPDATE supabase_outbox
+    SET attempts = attempts + 1, next_attempt_at = ?, last_error = ?
+    WHERE id = ?
+'''
+
+DEAD_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS supabase_outbox_dead (
+        id INTEGER PRIMARY KEY,
+        dedupe_key TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        attempts INTEGER NOT NULL,
+        failed_at REAL NOT NULL,
+        last_error TEXT
+    )
+'''
+
+MOVE_TO_DEAD_SQL = '''
+    INSERT OR REPLACE INTO supabase_outbox_dead
+        (id, dedupe_key, payload, created_at, attempts, failed_at, last_error)
+    SELECT id, dedupe_key, payload, created_at, attempts + 1, ?, ?
+    FROM supabase_outbox WHERE id = ?
+'''
+
+DEAD_COUNT_SQL = 'SELECT COUNT(*) FROM supabase_outbox_dead'
+
+BACKLOG_SQL = '''
+    SELECT COUNT(*), MIN(created_at), MAX(attempts), MIN(next_attempt_at)
+    FROM supabase_outbox
+'''
+
+# SQLSTATE classes of errors caused by the rows themselves: data exceptions,
+# integrity constraint violations, and undefined columns or type mismatches
+REJECTED_SQLSTATE_CLASSES = ('22', '23', '42')
+
+
+def is_rejection(error):
+    """True if Supabase refused the rows themselves, not just the request"""
+    code = getattr(error, 'code', None)
+    return isinstance(code, str) and len(code) == 5 and code[:2] in REJECTED_SQLSTATE_CLASSES
+
+
+class SupabaseOutbox:
+    """Queues Supabase inserts in SQLite and delivers them from a background thread"""
+
+    def __init__(self, database, client, table='contact_submissions', batch_size=100,
+                 poll_interval=1.0, base_backoff=0.5, max_backoff=300.0, max_attempts=5,
+                 on_sent=None):
+        self.client = client
+        self.on_sent = on_sent  # called after each delivered batch
+        self.table = table
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts  # rejections of a single row before it is dead-lettered
+
+        self.pool = ConnectionPool(database, max_connections=4)
+        with self.pool.connection() as conn:
+            conn.execute(OUTBOX_TABLE_SQL)
+            conn.execute(OUTBOX_DUE_INDEX_SQL)
+            conn.execute(DEAD_TABLE_SQL)
+
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._stats = {
+            'appended': 0,
+            'sent': 0,
+            'batches': 0,
+            'failed_batches': 0,
+            'dead_lettered': 0,
+            'last_sent_at': None,
+            'last_error': None,
+        }
+
+    def start(self):
+        """Start the sender thread in this process if it is not running"""
+        if self._closed or (self._pid == os.getpid() and self._thread is not None):
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            # A forked worker inherits the object but not the thread
+            self._pid = os.getpid()
+            self._wakeup = threading.Event()
+            self._thread = threading.Thread(target=self._run, name='supabase-outbox', daemon=True)
+            self._thread.start()
+
+    def append(self, record, dedupe_key=None):
+        """Durably queue one row for Supabase; returns (outbox id, dedupe key)
+
+        Pass the caller's own idempotency key (a UUID) as dedupe_key to have
+        repeats collapse into one row: while the first is still queued this
+        returns its outbox id, and after it was sent Supabase ignores the copy.
+        """
+        dedupe_key = dedupe_key or str(uuid.uuid4())
+        payload = json.dumps(dict(record, dedupe_key=dedupe_key), default=str)
+        now = time.time()
+
+        def insert(conn):
+            cursor = conn.execute(APPEND_SQL, (dedupe_key, payload, now, now))
+            if cursor.rowcount == 0:
+                return conn.execute(SELECT_ID_BY_KEY_SQL, (dedupe_key,)).fetchone()[0]
+            return cursor.lastrowid
+
+        outbox_id = self.pool.run(insert)
+
+        with self._lock:
+            self._stats['appended'] += 1
+        self.start()
+        self._wakeup.set()
+        return outbox_id, dedupe_key
+
+    def _run(self):
+        """Sender loop: deliver due batches until nothing is due, then wait"""
+        while not self._closed:
+            # Cleared before looking, so an append during send_due() is not missed
+            self._wakeup.clear()
+            try:
+                delivered_any = self.send_due()
+            except Exception as e:
+                # Local database trouble; try again after the poll interval
+                log_event(get_logger(), logging.ERROR, 'outbox_sender_error', error=str(e))
+                delivered_any = False
+
+            if not delivered_any:
+                self._wakeup.wait(self.poll_interval)
+
+    def send_due(self):
+        """Send one batch of due rows; returns True if any of them were delivered"""
+        rows = self.pool.run(
+            lambda conn: conn.execute(SELECT_DUE_SQL, (time.time(), self.batch_size)).fetchall()
+        )
+        if not rows:
+            return False
+        return self._send(rows) > 0
+
+    def _send(self, rows):
+        """Upsert rows, splitting a rejected batch in half; returns how many were delivered"""
+        records = [json.loads(payload) for _, _, payload, _ in rows]
+        try:
+            with db_timer('supabase', 'outbox_upsert'):
+                self.client.table(self.table)\
+                           .upsert(records, on_conflict='dedupe_key', ignore_duplicates=True,
+                                   returning='minimal')\
+                           .execute()
+        except Exception as e:
+            message = str(e)[:500]
+            with self._lock:
+                self._stats['failed_batches'] += 1
+                self._stats['last_error'] = message
+
+            if not is_rejection(e):
+                self._reschedule(rows, message)
+            elif len(rows) > 1:
+                middle = len(rows) // 2
+                return self._send(rows[:middle]) + self._send(rows[middle:])
+            elif rows[0][3] + 1 >= self.max_attempts:
+                self._dead_letter(rows[0], message)
+            else:
+                self._reschedule(rows, message)
+            return 0
+
+        self.pool.run(lambda conn: conn.executemany(DELETE_SENT_SQL, [(row[0],) for row in rows]))
+        with self._lock:
+            self._stats['sent'] += len(rows)
+            self._stats['batches'] += 1
+            self._stats['last_sent_at'] = time.time()
+        if self.on_sent:
+            self.on_sent()
+        return len(rows)
+
+    def _reschedule(self, rows, message):
+        """Back off exponentially (with jitter) before retrying failed rows"""
+        now = time.time()
+        updates = []
+        for outbox_id, _, _, attempts in rows:
+            delay = min(self.max_backoff, self.base_backoff * 2 ** attempts)
+            updates.append((now + delay * random.uniform(0.5, 1.0), message, outbox_id))
+        self.pool.run(lambda conn: conn.executemany(RESCHEDULE_SQL, updates))
+
+    def _dead_letter(self, row, message):
+        """Move a row Supabase keeps rejecting out of the outbox"""
+        outbox_id, dedupe_key = row[0], row[1]
+
+        def move(conn):
+            conn.execute(MOVE_TO_DEAD_SQL, (time.time(), message, outbox_id))
+            conn.execute(DELETE_SENT_SQL, (outbox_id,))
+
+        self.pool.run(move)
+        with self._lock:
+            self._stats['dead_lettered'] += 1
+        log_event(get_logger(), logging.ERROR, 'outbox_dead_letter', outbox_id=outbox_id,
+                  dedupe_key=dedupe_key, error=message)
+
+    def close(self, timeout=5.0):
+        """Stop (or never start) the sender thread; undelivered rows stay in the outbox"""
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+
+    def stats(self):
+        """Return outbox depth, lag, dead letters and delivery counters"""
+
+        def query(conn):
+            return conn.execute(BACKLOG_SQL).fetchone(), conn.execute(DEAD_COUNT_SQL).fetchone()[0]
+
+        (depth, oldest, max_attempts, next_attempt), dead = self.pool.run(query)
+        now = time.time()
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['depth'] = depth
+        # Rows Supabase rejected max_attempts times, kept in supabase_outbox_dead
+        snapshot['dead_letter'] = dead
+        # Age of the oldest undelivered row - how far Supabase is behind
+        snapshot['lag_seconds'] = round(now - oldest, 3) if oldest is not None else 0.0
+        snapshot['max_attempts'] = max_attempts or 0
+        snapshot['next_attempt_in'] = round(max(0.0, next_attempt - now), 3) if next_attempt else None
+        if snapshot['last_sent_at'] is not None:
+            snapshot['seconds_since_last_send'] = round(now - snapshot['last_sent_at'], 3)
+        return snapshot
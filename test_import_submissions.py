@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the legacy submission importer's per-record checks.
+
+validate_chunk() runs in the worker processes, so it is called directly
+here with (position, record) pairs the way the importer hands them out.
+
+Run with:
+    python -m pytest test_import_submissions.py
+    python test_import_submissions.py
+"""
+
+import unittest
+
+from import_submissions import normalize_submitted_at, validate_chunk
+
+RECORD = {
+    'name': 'Jane Doe', 'email': 'jane@example.com', 'phone': '(555) 123-4567', 'age': '30',
+    'date': '2024-01-15', 'priority': 'medium', 'topics': 'web-development, ai-ml',
+    'satisfaction': '8', 'message': 'Hello, this is a perfectly reasonable message.',
+}
+
+
+class SubmittedAtTests(unittest.TestCase):
+    def test_timestamps_are_stored_like_current_timestamp(self):
+        cases = {
+            '2024-01-15 10:30:00': '2024-01-15 10:30:00',
+            '2024-01-15T10:30:00': '2024-01-15 10:30:00',
+            '2024-01-15T10:30:00Z': '2024-01-15 10:30:00',
+            '2024-01-15T12:30:00.250+02:00': '2024-01-15 10:30:00',
+            '2024-01-14T23:30:00-05:00': '2024-01-15 04:30:00',
+            '2024-01-15': '2024-01-15 00:00:00',
+        }
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(normalize_submitted_at(value), expected)
+
+    def test_missing_timestamp_defaults_later(self):
+        self.assertIsNone(normalize_submitted_at(None))
+        self.assertIsNone(normalize_submitted_at(''))
+
+    def test_unparseable_timestamps_raise(self):
+        for value in ('15/01/2024 10:30', 'yesterday', '2024-13-01', 1705314600):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    normalize_submitted_at(value)
+
+    def test_chunk_normalizes_and_rejects(self):
+        chunk = [
+            (0, dict(RECORD, submitted_at='2024-01-15T12:30:00+02:00')),
+            (1, dict(RECORD)),
+            (2, dict(RECORD, submitted_at='01/15/2024')),
+            (3, dict(RECORD, submitted_at='not a date', age='x')),
+        ]
+
+        consumed, valid, rejected = validate_chunk(chunk)
+
+        self.assertEqual(consumed, 4)
+        self.assertEqual([submitted_at for _, submitted_at in valid], ['2024-01-15 10:30:00', None])
+        self.assertEqual([position for position, _, _ in rejected], [2, 3])
+        self.assertEqual(set(rejected[0][2]), {'submitted_at'})
+        self.assertEqual(set(rejected[1][2]), {'submitted_at', 'age'})
+
+
+if __name__ == '__main__':
+    unittest.main()
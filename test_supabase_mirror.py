@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Tests for the Supabase read-through mirror against a local PostgREST stand-in.
+
+The stand-in answers the one query the mirror's loader makes (rows with
+created_at >= a timestamp, ordered by created_at and id, limited) from an
+in-memory table, and can be told to fail, so incremental syncs and reads
+during an outage are exercised through the real postgrest client.
+
+Run with:
+    python -m pytest test_supabase_mirror.py
+    python test_supabase_mirror.py
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from postgrest import SyncPostgrestClient
+
+from admin_stats import compute_stats_from_rows
+from supabase_mirror import SupabaseMirror, MIRROR_COLUMNS, parse_timestamp
+
+BASE_TIME = datetime(2024, 1, 15, 12, 0, tzinfo=timezone.utc)
+
+
+class PostgrestStandIn(ThreadingHTTPServer):
+    """In-memory stand-in for PostgREST's GET /contact_submissions"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), PostgrestHandler)
+        self.rows = []           # contact_submissions records
+        self.requests = []       # (since, number of rows returned) per request
+        self.failing = False     # answer every request with a 503
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def add(self, count, seconds=None, priority='high', topics=('ai-ml',)):
+        """Insert `count` rows created `seconds` after BASE_TIME (next id by default)"""
+        with self.lock:
+            for _ in range(count):
+                row_id = len(self.rows) + 1
+                created = BASE_TIME + timedelta(seconds=row_id if seconds is None else seconds)
+                self.rows.append({
+                    'id': row_id, 'name': f'User {row_id}', 'email': f'user{row_id}@example.com',
+                    'phone': None, 'age': 30, 'contact_date': '2024-01-15', 'priority': priority,
+                    'topics': list(topics), 'satisfaction': row_id % 10 + 1, 'message': 'Hello there',
+                    'filename': None, 'form_version': '2.0', 'timestamp': None,
+                    'created_at': created.isoformat(), 'dedupe_key': f'key-{row_id}',
+                })
+
+
+class PostgrestHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=None):
+        data = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        query = parse_qs(urlparse(self.path).query)
+        if query.get('order') != ['created_at.asc,id.asc']:
+            return self._reply(400, {'message': 'Expected order=created_at.asc,id.asc'})
+        since = query['created_at'][0].split('.', 1)[1] if 'created_at' in query else None
+        columns = query['select'][0].split(',')
+        limit = int(query['limit'][0])
+
+        with server.lock:
+            if server.failing:
+                return self._reply(503, {'message': 'Service Unavailable'})
+            rows = [row for row in server.rows
+                    if since is None or parse_timestamp(row['created_at']) >= parse_timestamp(since)]
+            rows.sort(key=lambda row: (parse_timestamp(row['created_at']), row['id']))
+            rows = [{column: row[column] for column in columns} for row in rows[:limit]]
+            server.requests.append((since, len(rows)))
+        self._reply(200, rows)
+
+
+class SupabaseMirrorTests(unittest.TestCase):
+    def setUp(self):
+        self.server = PostgrestStandIn()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = SyncPostgrestClient(self.server.url)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.tmpdir.name, 'mirror.db')
+        self.mirror = self.make_mirror()
+
+    def tearDown(self):
+        self.mirror.pool.close_all()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def load_since(self, since, limit):
+        # The same query as app_with_database.load_mirror_rows()
+        query = self.client.table('contact_submissions').select(','.join(MIRROR_COLUMNS))
+        if since is not None:
+            query = query.gte('created_at', since)
+        return query.order('created_at').order('id').limit(limit).execute().data or []
+
+    def make_mirror(self, **kwargs):
+        options = dict(batch_size=50, overlap=60, max_staleness=30, outage_max_staleness=3600)
+        options.update(kwargs)
+        return SupabaseMirror(self.database, self.load_since, **options)
+
+    def mirrored_ids(self):
+        return [record['id'] for record in self.mirror.iter_records({})]
+
+    def test_first_sync_copies_everything_in_batches(self):
+        self.server.add(120)
+
+        self.mirror.sync()
+
+        self.assertEqual(self.mirrored_ids(), list(range(1, 121)))
+        # Each batch starts at the previous batch's last created_at, re-reading that row
+        self.assertEqual([count for _, count in self.server.requests], [50, 50, 22])
+        stats = self.mirror.stats()
+        self.assertEqual(stats['rows'], 120)
+        self.assertEqual(stats['watermark'], self.server.rows[-1]['created_at'])
+        self.assertTrue(stats['fresh'])
+
+    def test_later_syncs_only_read_from_the_watermark(self):
+        self.server.add(500)
+        self.mirror.sync()
+        self.server.requests.clear()
+        self.server.add(5)
+
+        self.mirror.sync()
+
+        # Only the overlap window (60 rows a second apart) and the new rows are read again
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertLessEqual(sum(count for _, count in self.server.requests), 70)
+        self.assertEqual(self.mirrored_ids(), list(range(1, 506)))
+
+    def test_late_row_inside_overlap_is_picked_up(self):
+        self.server.add(100)
+        self.mirror.sync()
+        # Committed late, with a created_at behind the watermark
+        self.server.add(1, seconds=90)
+
+        self.mirror.sync()
+
+        self.assertIn(101, self.mirrored_ids())
+
+    def test_full_batch_sharing_one_timestamp_is_not_skipped(self):
+        self.server.add(10)
+        self.server.add(120, seconds=20)
+        self.server.add(10, seconds=30)
+
+        self.mirror.sync()
+
+        self.assertEqual(len(self.mirrored_ids()), 140)
+
+    def test_records_read_back_like_supabase_returned_them(self):
+        self.server.add(3, topics=('ai-ml', 'web-development'))
+        self.mirror.sync()
+
+        expected = [{column: row[column] for column in MIRROR_COLUMNS} for row in reversed(self.server.rows)]
+        self.assertEqual(self.mirror.recent(10), expected)
+        self.assertEqual([record['id'] for record in self.mirror.recent(2)], [3, 2])
+
+    def test_iter_records_filters(self):
+        self.server.add(5, priority='low')
+        self.server.add(5, priority='high')
+        self.server.add(1, seconds=3 * 86400, priority='high')
+        self.mirror.sync()
+
+        high = self.mirror.iter_records({'priority': 'high'}, newest_first=True)
+        self.assertEqual([record['id'] for record in high], [11, 10, 9, 8, 7, 6])
+        later = self.mirror.iter_records({'since': date(2024, 1, 16), 'before': date(2024, 1, 20)})
+        self.assertEqual([record['id'] for record in later], [11])
+
+    def test_iter_records_returns_connections_between_batches(self):
+        self.server.add(25, priority='low')
+        self.server.add(25, priority='high')
+        self.mirror.sync()
+
+        records = self.mirror.iter_records({'priority': 'high'}, newest_first=True, batch_size=10)
+        first = next(records)
+        self.assertEqual(self.mirror.pool.stats()['in_use_connections'], 0)
+        self.assertEqual([first['id']] + [record['id'] for record in records], list(range(50, 25, -1)))
+
+    def test_dashboard_stats_match_a_full_scan(self):
+        self.server.add(7, priority='high', topics=('ai-ml',))
+        self.server.add(4, priority='low', topics=('ai-ml', 'cybersecurity'))
+        self.server.add(2, priority=None, topics=())
+        self.mirror.sync()
+
+        expected = compute_stats_from_rows(self.server.rows)
+        self.assertEqual(self.mirror.dashboard_stats(), expected)
+
+    def test_rows_since_answers_like_supabase(self):
+        self.server.add(30)
+        self.server.add(5, seconds=10)
+        self.mirror.sync()
+
+        since = (BASE_TIME + timedelta(seconds=10)).isoformat()
+        for cursor, limit in ((None, 7), (since, 12), (since, 100)):
+            with self.subTest(since=cursor, limit=limit):
+                self.assertEqual(self.mirror.rows_since(cursor, limit), self.load_since(cursor, limit))
+
+    def test_analytics_snapshot_follows_the_mirror(self):
+        from analytics import SubmissionSnapshot
+
+        self.server.add(40, priority='low')
+        self.mirror.sync()
+        snapshot = SubmissionSnapshot(self.mirror.rows_since, page_size=16)
+        snapshot.refresh()
+        self.server.add(10, priority='high')
+        self.server.add(1, seconds=5, priority='high')  # committed late
+        self.mirror.sync()
+        self.server.requests.clear()
+
+        snapshot.refresh()
+
+        # Everything came from the local copy; Supabase was not asked again
+        self.assertEqual(self.server.requests, [])
+        self.assertEqual(snapshot.count(), 51)
+        self.assertEqual(snapshot.priority_counts(), {'low': 40, 'medium': 0, 'high': 11})
+
+    def test_fresh_mirror_serves_reads_without_supabase(self):
+        self.server.add(3)
+        self.mirror.sync()
+
+        def load_remote():
+            self.fail('Supabase should not be asked while the mirror is fresh')
+
+        records = self.mirror.read_through(load_remote, lambda: self.mirror.recent(10))
+        self.assertEqual(len(records), 3)
+        self.assertEqual(self.mirror.stats()['reads_local'], 1)
+
+    def test_stale_mirror_reads_from_supabase(self):
+        self.server.add(3)
+        self.mirror.sync()
+        self.mirror._synced_at -= 60
+
+        result = self.mirror.read_through(lambda: 'remote', lambda: 'local')
+
+        self.assertEqual(result, 'remote')
+        self.assertEqual(self.mirror.stats()['reads_remote'], 1)
+
+    def test_outage_falls_back_to_a_stale_mirror(self):
+        self.server.add(3)
+        self.mirror.sync()
+        self.mirror._synced_at -= 600
+        self.server.failing = True
+
+        def load_remote():
+            return self.load_since(None, 10)
+
+        self.assertEqual(self.mirror.read_through(load_remote, lambda: 'local'), 'local')
+        # Known to be down: Supabase is not even asked
+        self.assertEqual(self.mirror.read_through(self.fail, lambda: 'local', remote_up=False), 'local')
+        self.assertEqual(self.mirror.stats()['reads_fallback'], 2)
+        with self.assertRaises(Exception):
+            self.mirror.sync()
+
+    def test_failing_paged_read_falls_back_before_streaming(self):
+        self.server.add(3)
+        self.mirror.sync()
+        self.mirror._synced_at -= 600
+        self.server.failing = True
+
+        def load_remote():
+            # A lazy paged listing, like iter_contact_submissions()
+            yield from self.load_since(None, 10)
+
+        records = self.mirror.read_through(load_remote, lambda: self.mirror.iter_records({}))
+        self.assertEqual([record['id'] for record in records], [1, 2, 3])
+        self.assertEqual(self.mirror.stats()['reads_fallback'], 1)
+
+        self.server.failing = False
+        records = self.mirror.read_through(load_remote, lambda: self.fail('mirror read'))
+        self.assertEqual([record['id'] for record in records], [1, 2, 3])
+        self.assertEqual(self.mirror.stats()['reads_remote'], 1)
+
+    def test_outage_beyond_the_bound_raises(self):
+        self.server.add(3)
+        self.mirror.sync()
+        self.mirror._synced_at -= 7200
+        self.server.failing = True
+
+        with self.assertRaises(Exception):
+            self.mirror.read_through(lambda: self.load_since(None, 10), lambda: 'local', remote_up=False)
+
+    def test_state_survives_restart(self):
+        self.server.add(100)
+        self.mirror.sync()
+        self.mirror.pool.close_all()
+        self.server.requests.clear()
+
+        self.mirror = self.make_mirror()
+        self.assertTrue(self.mirror.stats()['fresh'])
+        self.server.add(1)
+        self.mirror.sync()
+
+        # Resumed from the stored watermark rather than copying everything again
+        self.assertLess(self.server.requests[0][1], 100)
+        self.assertEqual(self.mirror.stats()['rows'], 101)
+
+    def test_local_reads_are_fast(self):
+        self.server.add(2000)
+        self.mirror.sync()
+        for _ in range(20):
+            self.mirror.recent(20)
+
+        timings = []
+        for _ in range(200):
+            started = time.perf_counter()
+            self.mirror.recent(20)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+
+        # Median read is a short index scan of the local file
+        self.assertLess(timings[len(timings) // 2], 0.005)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Tests for the Supabase outbox against a local PostgREST stand-in.
+
+The stand-in is a tiny HTTP server that understands the one request the
+outbox makes (a bulk upsert with on_conflict=dedupe_key) and can be told to
+fail or to drop responses, so retries and deduplication are exercised
+through the real postgrest client without a Supabase project.
+
+Run with:
+    python -m pytest test_supabase_outbox.py
+    python test_supabase_outbox.py
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from postgrest import SyncPostgrestClient
+
+from supabase_outbox import SupabaseOutbox
+
+
+class PostgrestStandIn(ThreadingHTTPServer):
+    """In-memory stand-in for PostgREST's POST /<table> upsert"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), PostgrestHandler)
+        self.rows = {}           # table -> {dedupe_key: row}
+        self.requests = []       # (table, number of rows) per accepted request
+        self.fail_next = 0       # answer this many requests with a 503
+        self.drop_response = 0   # store the rows, then answer with a 503 anyway
+        self.bad_names = set()   # reject any request containing a row with one of these names
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+
+class PostgrestHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=None):
+        data = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        url = urlparse(self.path)
+        table = url.path.strip('/')
+        on_conflict = parse_qs(url.query).get('on_conflict', [None])[0]
+        rows = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        rows = rows if isinstance(rows, list) else [rows]
+
+        with server.lock:
+            if server.fail_next:
+                server.fail_next -= 1
+                return self._reply(503, {'message': 'Service Unavailable'})
+
+            if on_conflict != 'dedupe_key' or 'resolution=ignore-duplicates' not in self.headers.get('Prefer', ''):
+                return self._reply(400, {'message': 'Expected an ignore-duplicates upsert on dedupe_key'})
+
+            if any(row.get('name') in server.bad_names for row in rows):
+                # Like Postgres, one bad row fails the whole statement
+                return self._reply(400, {'code': '22P02', 'message': 'invalid input syntax for type integer',
+                                         'details': None, 'hint': None})
+
+            stored = server.rows.setdefault(table, {})
+            for row in rows:
+                stored.setdefault(row['dedupe_key'], row)
+            server.requests.append((table, len(rows)))
+
+            if server.drop_response:
+                server.drop_response -= 1
+                return self._reply(503, {'message': 'Response lost'})
+
+        self._reply(201)
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll until condition() is true or the timeout passes"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class SupabaseOutboxTests(unittest.TestCase):
+    def setUp(self):
+        self.server = PostgrestStandIn()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.database = os.path.join(self.tmpdir.name, 'outbox.db')
+        self.outbox = self.make_outbox()
+
+    def tearDown(self):
+        self.outbox.close()
+        self.outbox.pool.close_all()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def make_outbox(self, **kwargs):
+        options = dict(batch_size=50, poll_interval=0.05, base_backoff=0.01, max_backoff=0.05)
+        options.update(kwargs)
+        return SupabaseOutbox(self.database, SyncPostgrestClient(self.server.url), **options)
+
+    def delivered(self):
+        return self.server.rows.get('contact_submissions', {})
+
+    def test_append_is_delivered_and_removed(self):
+        outbox_id, key = self.outbox.append({'name': 'Jane Doe', 'age': 30})
+
+        self.assertTrue(wait_for(lambda: self.outbox.stats()['depth'] == 0))
+        self.assertEqual(self.delivered()[key]['name'], 'Jane Doe')
+        stats = self.outbox.stats()
+        self.assertEqual((stats['appended'], stats['sent']), (1, 1))
+        self.assertEqual(stats['lag_seconds'], 0.0)
+
+    def test_repeated_dedupe_key_is_queued_once(self):
+        self.outbox.close()
+        key = str(uuid.uuid4())
+        first = self.outbox.append({'name': 'Double Click'}, dedupe_key=key)
+        second = self.outbox.append({'name': 'Double Click'}, dedupe_key=key)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.outbox.stats()['depth'], 1)
+        self.outbox.send_due()
+        # Appended again after delivery: Supabase keeps the first row
+        self.outbox.append({'name': 'Late Retry'}, dedupe_key=key)
+        self.outbox.send_due()
+        self.assertEqual(self.delivered()[key]['name'], 'Double Click')
+        self.assertEqual(len(self.delivered()), 1)
+
+    def test_rows_are_sent_in_batches(self):
+        self.outbox.close()  # queue everything first, then deliver by hand
+        for i in range(120):
+            self.outbox.append({'name': f'User {i}'})
+        self.assertEqual(self.outbox.stats()['depth'], 120)
+
+        while self.outbox.send_due():
+            pass
+
+        self.assertEqual(len(self.delivered()), 120)
+        self.assertEqual([count for _, count in self.server.requests], [50, 50, 20])
+
+    def test_failures_are_retried_with_backoff(self):
+        self.server.fail_next = 3
+        _, key = self.outbox.append({'name': 'Retry Me'})
+
+        self.assertTrue(wait_for(lambda: key in self.delivered()))
+        self.assertTrue(wait_for(lambda: self.outbox.stats()['depth'] == 0))
+        stats = self.outbox.stats()
+        self.assertEqual(stats['failed_batches'], 3)
+        self.assertIn('Service Unavailable', stats['last_error'])
+
+    def test_backoff_grows_exponentially(self):
+        outbox = self.make_outbox(base_backoff=10, max_backoff=25)
+        outbox.close()  # drive send_due() by hand
+        self.server.fail_next = 10
+        outbox.append({'name': 'Slow Down'})
+
+        delays = []
+        for attempt in range(3):
+            outbox.pool.run(lambda conn: conn.execute('UPDATE supabase_outbox SET next_attempt_at = 0'))
+            before = time.time()
+            self.assertFalse(outbox.send_due())
+            next_attempt = outbox.pool.run(
+                lambda conn: conn.execute('SELECT next_attempt_at FROM supabase_outbox').fetchone()[0]
+            )
+            delays.append(next_attempt - before)
+
+        # base * 2**attempts, jittered into [50%, 100%], capped at max_backoff
+        self.assertTrue(5 <= delays[0] <= 10.1)
+        self.assertTrue(10 <= delays[1] <= 20.1)
+        self.assertTrue(12.5 <= delays[2] <= 25.1)
+        self.assertEqual(outbox.stats()['max_attempts'], 3)
+        outbox.pool.close_all()
+
+    def test_rejected_row_does_not_hold_back_its_batch(self):
+        self.outbox.close()
+        outbox = self.make_outbox(max_attempts=3)
+        outbox.close()  # drive send_due() by hand
+        self.server.bad_names = {'Bad Row'}
+        keys = [outbox.append({'name': 'Bad Row' if i == 17 else f'User {i}'})[1] for i in range(50)]
+
+        self.assertTrue(outbox.send_due())
+        # The 49 good rows are delivered; only the bad row is left, backing off
+        self.assertEqual(set(self.delivered()), set(keys) - {keys[17]})
+        stats = outbox.stats()
+        self.assertEqual((stats['sent'], stats['depth'], stats['max_attempts']), (49, 1, 1))
+
+        for _ in range(2):
+            outbox.pool.run(lambda conn: conn.execute('UPDATE supabase_outbox SET next_attempt_at = 0'))
+            self.assertFalse(outbox.send_due())
+
+        stats = outbox.stats()
+        self.assertEqual((stats['depth'], stats['dead_letter'], stats['dead_lettered']), (0, 1, 1))
+        self.assertIn('invalid input syntax', stats['last_error'])
+        dead = outbox.pool.run(
+            lambda conn: conn.execute('SELECT dedupe_key, attempts FROM supabase_outbox_dead').fetchall()
+        )
+        self.assertEqual(dead, [(keys[17], 3)])
+        outbox.pool.close_all()
+
+    def test_outage_never_dead_letters(self):
+        self.outbox.close()
+        outbox = self.make_outbox(max_attempts=2)
+        outbox.close()
+        self.server.fail_next = 10
+        outbox.append({'name': 'Patient'})
+
+        for _ in range(5):
+            outbox.pool.run(lambda conn: conn.execute('UPDATE supabase_outbox SET next_attempt_at = 0'))
+            self.assertFalse(outbox.send_due())
+
+        stats = outbox.stats()
+        self.assertEqual((stats['depth'], stats['dead_letter'], stats['max_attempts']), (1, 0, 5))
+        outbox.pool.close_all()
+
+    def test_lost_response_does_not_duplicate(self):
+        self.server.drop_response = 1
+        _, key = self.outbox.append({'name': 'Only Once'})
+
+        self.assertTrue(wait_for(lambda: self.outbox.stats()['depth'] == 0))
+        # Delivered twice (first response was lost), stored once
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(list(self.delivered()), [key])
+
+    def test_undelivered_rows_survive_restart(self):
+        self.server.fail_next = 1000
+        _, key = self.outbox.append({'name': 'Persistent'})
+        self.assertTrue(wait_for(lambda: self.outbox.stats()['failed_batches'] > 0))
+        self.outbox.close()
+        self.outbox.pool.close_all()
+
+        self.server.fail_next = 0
+        self.outbox = self.make_outbox()
+        self.assertEqual(self.outbox.stats()['depth'], 1)
+        self.outbox.start()
+
+        self.assertTrue(wait_for(lambda: key in self.delivered()))
+        self.assertTrue(wait_for(lambda: self.outbox.stats()['depth'] == 0))
+
+    def test_lag_reports_oldest_undelivered_row(self):
+        self.outbox.close()
+        self.outbox.append({'name': 'Waiting'})
+        time.sleep(0.05)
+
+        stats = self.outbox.stats()
+        self.assertEqual(stats['depth'], 1)
+        self.assertGreaterEqual(stats['lag_seconds'], 0.05)
+
+    def test_append_is_fast(self):
+        self.outbox.close()
+        for _ in range(20):
+            self.outbox.append({'name': 'Warm Up'})
+
+        timings = []
+        for _ in range(200):
+            started = time.perf_counter()
+            self.outbox.append({'name': 'Jane Doe', 'message': 'x' * 500})
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+
+        # Median append is a single small WAL commit
+        self.assertLess(timings[len(timings) // 2], 0.005)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the contact form schema in validation.py.
+
+Every input, however malformed, must come back as a per-field error rather
+than an exception: form values that int() or date() reject, and the
+numbers and lists a JSON record can carry where a form sends strings.
+
+Run with:
+    python -m pytest test_validation.py
+    python test_validation.py
+"""
+
+import json
+import unittest
+from datetime import date
+
+from flask import Flask, request
+
+from batch_api import validate_batch
+from validation import validate_field, validate_form, validate_records
+
+VALID_RECORD = {
+    'name': 'Jane Doe', 'email': 'jane@example.com', 'phone': '(555) 123-4567', 'age': '30',
+    'date': '2024-01-15', 'priority': 'medium', 'topics': ['web-development', 'ai-ml'],
+    'satisfaction': '8', 'message': 'Hello, this is a perfectly reasonable message.',
+}
+
+
+class ValidationTests(unittest.TestCase):
+    def test_valid_record(self):
+        result = validate_form(VALID_RECORD)
+        self.assertEqual(result.errors, {})
+        self.assertEqual(result.data['age'], 30)
+        self.assertEqual(result.data['date'], date(2024, 1, 15))
+        self.assertEqual(result.data['phone'], '5551234567')
+
+    def test_superscript_digits_are_not_numbers(self):
+        self.assertEqual(validate_field('age', '²'), (None, 'Age must be a valid number'))
+        self.assertEqual(validate_field('satisfaction', '³'), (None, 'Invalid satisfaction rating'))
+
+    def test_year_zero_is_not_a_date(self):
+        self.assertEqual(validate_field('date', '0000-01-01'), (None, 'Please enter a valid date'))
+        self.assertEqual(validate_field('date', '0001-01-01'), (date(1, 1, 1), None))
+
+    def test_non_string_values_are_invalid(self):
+        cases = {
+            'name': 12,
+            'email': 5,
+            'phone': 5551234567,
+            'message': ['Hello, this is a message.'],
+            'priority': ['high'],
+            'age': 30.5,
+        }
+        for name, value in cases.items():
+            with self.subTest(field=name):
+                value, error = validate_field(name, value)
+                self.assertIsNone(value)
+                self.assertTrue(error)
+
+    def test_topics_of_other_types_are_invalid(self):
+        self.assertEqual(validate_field('topics', [1, 'ai-ml']), (None, 'Invalid topics selected: 1'))
+        self.assertIn('topics', validate_form(dict(VALID_RECORD, topics=5)).errors)
+
+    def test_every_record_gets_a_result(self):
+        records = [VALID_RECORD, dict(VALID_RECORD, name=12, topics=[1, 2]), 'not a record',
+                   dict(VALID_RECORD, age='²', date='0000-01-01')]
+        results = list(validate_records(records))
+        self.assertEqual([result['valid'] for result in results], [True, False, False, False])
+        self.assertEqual(set(results[3]['errors']), {'age', 'date'})
+
+    def test_record_that_raises_gets_an_error_entry(self):
+        class Broken(dict):
+            def get(self, key, default=None):
+                raise RuntimeError('unreadable')
+
+        results = list(validate_records([Broken(), VALID_RECORD]))
+        self.assertEqual(results[0], {'index': 0, 'valid': False,
+                                      'errors': {'record': 'Could not validate record: unreadable'}})
+        self.assertEqual(results[1], {'index': 1, 'valid': True})
+
+
+class BatchApiTests(unittest.TestCase):
+    RECORDS = [VALID_RECORD, dict(VALID_RECORD, name=12, phone=5551234567, topics=[1, 2]),
+               dict(VALID_RECORD, age='\u00b2')]
+
+    def setUp(self):
+        app = Flask(__name__)
+        app.add_url_rule('/api/validate-batch', 'validate_batch_api',
+                         lambda: validate_batch(request), methods=['POST'])
+        self.client = app.test_client()
+
+    def test_json_batch_reports_every_record(self):
+        response = self.client.post('/api/validate-batch', json=self.RECORDS)
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual([result['valid'] for result in body['results']], [True, False, False])
+        self.assertEqual(body['summary'], {'total': 3, 'valid': 1, 'invalid': 2})
+
+    def test_ndjson_batch_reports_every_record(self):
+        data = '\n'.join(json.dumps(record) for record in self.RECORDS)
+        response = self.client.post('/api/validate-batch', data=data,
+                                    content_type='application/x-ndjson')
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([line['valid'] for line in lines[:-1]], [True, False, False])
+        self.assertEqual(lines[-1]['summary']['invalid'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
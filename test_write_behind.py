@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Tests for the group-commit write-behind queue.
+
+Each test writes to a throwaway SQLite file shaped like contact_submissions
+(an AUTOINCREMENT id and a key under a partial unique index), so ID
+reservation, deduplication and draining on close() run against a real
+database through the same connection pool the app uses.
+
+Run with:
+    python -m pytest test_write_behind.py
+    python test_write_behind.py
+"""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from db_pool import ConnectionPool
+from write_behind import WriteBehindWriter, QueueFull
+
+TABLE_SQL = '''
+    CREATE TABLE submissions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        dedupe_key TEXT
+    )
+'''
+
+UNIQUE_INDEX_SQL = '''
+    CREATE UNIQUE INDEX idx_submissions_dedupe_key
+    ON submissions (dedupe_key) WHERE dedupe_key IS NOT NULL
+'''
+
+
+class WriteBehindTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.pool = ConnectionPool(os.path.join(self.tmpdir.name, 'submissions.db'))
+        with self.pool.connection() as conn:
+            conn.execute(TABLE_SQL)
+            conn.execute(UNIQUE_INDEX_SQL)
+        self.writer = self.make_writer()
+
+    def tearDown(self):
+        self.writer.close(timeout=1.0)
+        self.pool.close_all()
+        self.tmpdir.cleanup()
+
+    def make_writer(self, **kwargs):
+        options = dict(max_batch_size=50, max_delay=0.005, unique_column='dedupe_key')
+        options.update(kwargs)
+        return WriteBehindWriter(self.pool, 'submissions', ('name', 'dedupe_key'), **options)
+
+    def insert_directly(self, name):
+        cursor = self.pool.run(
+            lambda conn: conn.execute('INSERT INTO submissions (name) VALUES (?)', (name,))
+        )
+        return cursor.lastrowid
+
+    def rows(self):
+        return self.pool.run(lambda conn: conn.execute(
+            'SELECT id, name, dedupe_key FROM submissions ORDER BY id').fetchall())
+
+    # ID reservation
+
+    def test_ids_match_the_rows_written(self):
+        futures = [self.writer.submit((f'User {i}', None)) for i in range(120)]
+        ids = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(ids, list(range(1, 121)))
+        self.assertEqual([(row_id, name) for row_id, name, _ in self.rows()],
+                         [(i, f'User {i - 1}') for i in range(1, 121)])
+
+    def test_deleted_ids_are_not_reused(self):
+        last = self.insert_directly('Deleted')
+        self.pool.run(lambda conn: conn.execute('DELETE FROM submissions'))
+
+        # MAX(id) is gone, but sqlite_sequence still remembers it
+        self.assertEqual(self.writer.submit(('After Delete', None)).result(timeout=5), last + 1)
+
+    def test_batches_and_direct_inserts_never_collide(self):
+        results, errors = [], []
+
+        def submit_rows(prefix):
+            for i in range(100):
+                results.append(self.writer.submit((f'{prefix} {i}', None)).result(timeout=5))
+
+        def insert_rows(prefix):
+            try:
+                for i in range(100):
+                    results.append(self.insert_directly(f'{prefix} {i}'))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=submit_rows, args=(f'Queued {n}',)) for n in range(4)]
+        threads += [threading.Thread(target=insert_rows, args=(f'Direct {n}',)) for n in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), 600)
+        self.assertEqual(sorted(results), [row[0] for row in self.rows()])
+
+    # Deduplication
+
+    def test_repeated_key_resolves_to_the_first_row(self):
+        first = self.writer.submit(('First', 'key-1')).result(timeout=5)
+        # The same key twice in one batch, and a third time later
+        repeats = [self.writer.submit((f'Repeat {i}', 'key-1')) for i in range(2)]
+        other = self.writer.submit(('Other', 'key-2'))
+
+        self.assertEqual([future.result(timeout=5) for future in repeats], [first, first])
+        self.assertEqual(self.writer.submit(('Late', 'key-1')).result(timeout=5), first)
+        self.assertNotEqual(other.result(timeout=5), first)
+        self.assertEqual([(name, key) for _, name, key in self.rows()],
+                         [('First', 'key-1'), ('Other', 'key-2')])
+
+    def test_rows_without_a_key_are_all_written(self):
+        futures = [self.writer.submit(('No Key', None)) for _ in range(3)]
+
+        self.assertEqual(len({future.result(timeout=5) for future in futures}), 3)
+        self.assertEqual(len(self.rows()), 3)
+
+    # Draining
+
+    def test_close_writes_everything_queued(self):
+        futures = [self.writer.submit((f'User {i}', None)) for i in range(500)]
+        self.writer.close()
+
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(len(self.rows()), 500)
+        with self.assertRaises(RuntimeError):
+            self.writer.submit(('Too Late', None))
+
+    def test_submits_racing_close_are_written_or_refused(self):
+        accepted, refused = [], []
+        stop = threading.Event()
+
+        def submit_rows(n):
+            i = 0
+            while not stop.is_set():
+                try:
+                    accepted.append(self.writer.submit((f'Racer {n}-{i}', None)))
+                except RuntimeError:
+                    refused.append(n)
+                    return
+                i += 1
+
+        threads = [threading.Thread(target=submit_rows, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        self.writer.close()
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        # No row was queued behind the stop marker and left pending
+        self.assertTrue(all(future.done() for future in accepted))
+        self.assertEqual(len(self.rows()), len(accepted))
+
+    def test_close_with_a_stuck_writer_fails_queued_rows(self):
+        writer = self.make_writer(max_queue_size=2, enqueue_timeout=0.01)
+        unblock = threading.Event()
+        flush = writer._flush
+
+        def slow_flush(batch):
+            unblock.wait(5)
+            flush(batch)
+
+        writer._flush = slow_flush
+        taken = writer.submit(('Being Written', None))
+        time.sleep(0.05)  # let the writer take it and block
+        queued = [writer.submit((f'Queued {i}', None)) for i in range(2)]
+        with self.assertRaises(QueueFull):
+            writer.submit(('Overflow', None))
+
+        started = time.monotonic()
+        writer.close(timeout=0.2)
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        for future in queued:
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=0)
+        unblock.set()
+        self.assertEqual(taken.result(timeout=5), 1)
+        self.assertEqual(writer.stats()['failed_rows'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
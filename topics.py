@@ -0,0 +1,92 @@
+"""
+Submission topics stored as a bitmask over the fixed set of valid topics.
+
+contact_submissions.topics_mask holds one bit per topic instead of a
+comma-joined string. Every topic also has a partial index covering only the
+rows with its bit set, so "newest ai-ml submissions", "high-priority ai-ml
+submissions" and per-topic counts are index scans in SQL:
+
+    WHERE topics_mask & 8          -- uses idx_submissions_topic_ai_ml
+
+Bits are fixed forever (they are stored in the database): add new topics
+with new bits, never renumber.
+"""
+
+from validation import VALID_TOPICS
+
+TOPIC_BITS = {
+    'web-development': 1,
+    'mobile-apps': 2,
+    'data-science': 4,
+    'ai-ml': 8,
+    'cybersecurity': 16,
+}
+
+assert set(TOPIC_BITS) == set(VALID_TOPICS), 'every valid topic needs a bit'
+
+# Topic names for every possible mask, in VALID_TOPICS order, so decoding a
+# row is a tuple lookup
+TOPIC_SETS = tuple(
+    tuple(topic for topic in VALID_TOPICS if mask & TOPIC_BITS[topic])
+    for mask in range(1 << len(TOPIC_BITS))
+)
+
+
+def topics_mask(topics):
+    """['ai-ml', 'web-development'] -> 9"""
+    mask = 0
+    for topic in topics or ():
+        mask |= TOPIC_BITS[topic]
+    return mask
+
+
+def topic_names(value):
+    """Topic names of a stored mask; lists (e.g. Supabase rows) pass through"""
+    if isinstance(value, int):
+        return TOPIC_SETS[value]
+    return value or ()
+
+
+def topic_condition(topic):
+    """SQL condition selecting rows with a topic, written to match its partial index
+
+    The bit is inlined rather than bound: SQLite only uses a partial index
+    when the query repeats the index's WHERE expression literally.
+    """
+    return f'topics_mask & {TOPIC_BITS[topic]}'
+
+
+def index_name(topic):
+    return 'idx_submissions_topic_' + topic.replace('-', '_')
+
+
+def topics_migration():
+    """Statements adding topics_mask, converting existing rows and indexing each topic"""
+    convert = ' | '.join(
+        f"(CASE WHEN ',' || topics || ',' LIKE '%,{topic},%' THEN {bit} ELSE 0 END)"
+        for topic, bit in TOPIC_BITS.items()
+    )
+    statements = [
+        'ALTER TABLE contact_submissions ADD COLUMN topics_mask INTEGER NOT NULL DEFAULT 0',
+        f"UPDATE contact_submissions SET topics_mask = {convert} WHERE topics IS NOT NULL AND topics != ''",
+    ]
+    for topic in TOPIC_BITS:
+        # priority rides along so "high-priority <topic>" is answered from the index
+        statements.append(
+            f'CREATE INDEX IF NOT EXISTS {index_name(topic)} '
+            f'ON contact_submissions (submitted_at, id, priority) WHERE {topic_condition(topic)}'
+        )
+    return statements
+
+
+TOPIC_COUNTS_SQL = 'SELECT ' + ', '.join(
+    f'(SELECT count(*) FROM contact_submissions WHERE {topic_condition(topic)})'
+    for topic in VALID_TOPICS
+)
+
+# The topic indexes do not hold topics_mask, so a per-topic count of one
+# priority would read every matching row once per topic; this counts all
+# topics in a single pass over that priority's rows instead
+TOPIC_COUNTS_BY_PRIORITY_SQL = 'SELECT ' + ', '.join(
+    f'count(nullif(topics_mask & {TOPIC_BITS[topic]}, 0))' for topic in VALID_TOPICS
+) + ' FROM contact_submissions WHERE priority = ?1'
@@ -0,0 +1,331 @@
+"""
+Declarative contact form validation shared by every app variant.
+
+Each field is described once in CONTACT_FIELDS as a list of steps. Building
+the schema compiles every regex and binds every limit up front, so
+validating a request is just a walk over prebuilt closures. Every step
+returns a (value, error) pair instead of raising, and validate_form()
+checks the whole form in one pass and collects all errors.
+"""
+
+import re
+from calendar import monthrange
+import time
+from datetime import MINYEAR, date, datetime, timedelta
+
+VALID_PRIORITIES = ('low', 'medium', 'high')
+VALID_TOPICS = ('web-development', 'mobile-apps', 'data-science', 'ai-ml', 'cybersecurity')
+ALLOWED_EXTENSIONS = frozenset({'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx'})
+MAX_UPLOAD_SIZE = 16 * 1024 * 1024  # 16MB
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+NAME_PATTERN = r"^[a-zA-Z\s\-']+$"
+
+
+class Invalid:
+    """A failed check; created once per rule so a failure allocates nothing"""
+
+    __slots__ = ('message',)
+
+    def __init__(self, message):
+        self.message = message
+
+
+# Validation steps - each factory returns a function that takes the value
+# and returns either the (possibly cleaned) value or an Invalid
+
+def is_text(message):
+    # Plain-dict input (JSON records) can carry numbers or lists where the
+    # form always sends strings; reject them before any str method runs
+    invalid = Invalid(message)
+    return lambda value: value if isinstance(value, str) else invalid
+
+
+def strip():
+    return str.strip
+
+
+def lower():
+    return str.lower
+
+
+def matches(pattern, message):
+    match = re.compile(pattern).match
+    invalid = Invalid(message)
+    return lambda value: value if match(value) else invalid
+
+
+def substitute(pattern, replacement):
+    sub = re.compile(pattern).sub
+    return lambda value: sub(replacement, value)
+
+
+def length(minimum, maximum, too_short, too_long):
+    too_short, too_long = Invalid(too_short), Invalid(too_long)
+
+    def check(value):
+        size = len(value)
+        if size < minimum:
+            return too_short
+        if size > maximum:
+            return too_long
+        return value
+    return check
+
+
+def to_int(message):
+    invalid = Invalid(message)
+
+    def convert(value):
+        if isinstance(value, int):
+            return value
+        if not isinstance(value, str):
+            return invalid
+        try:
+            return int(value)
+        except ValueError:
+            return invalid
+    return convert
+
+
+def between(minimum, maximum, too_low, too_high):
+    too_low, too_high = Invalid(too_low), Invalid(too_high)
+
+    def check(value):
+        if value < minimum:
+            return too_low
+        if value > maximum:
+            return too_high
+        return value
+    return check
+
+
+def to_date(message):
+    # Accepts the same input as strptime('%Y-%m-%d') without re-parsing the format
+    parts = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$').match
+    invalid = Invalid(message)
+
+    def convert(value):
+        found = parts(value) if isinstance(value, str) else None
+        if not found:
+            return invalid
+        year, month, day = int(found[1]), int(found[2]), int(found[3])
+        if not (MINYEAR <= year and 1 <= month <= 12 and 1 <= day <= monthrange(year, month)[1]):
+            return invalid
+        return date(year, month, day)
+    return convert
+
+
+_today = [date.min, 0.0]  # [today's date, timestamp of the next local midnight]
+
+
+def today():
+    """date.today(), recomputed only when the local date changes"""
+    if time.time() >= _today[1]:
+        current = date.today()
+        _today[0] = current
+        _today[1] = datetime.combine(current + timedelta(days=1), datetime.min.time()).timestamp()
+    return _today[0]
+
+
+def not_in_future(message):
+    invalid = Invalid(message)
+    return lambda value: value if value <= today() else invalid
+
+
+def one_of(choices, message):
+    choices = frozenset(choices)
+    invalid = Invalid(message)
+    return lambda value: value if isinstance(value, str) and value in choices else invalid
+
+
+def all_of(choices, message):
+    choices = frozenset(choices)
+
+    def check(values):
+        invalid = [str(value) for value in values if not (isinstance(value, str) and value in choices)]
+        if invalid:
+            return Invalid(f"{message}: {', '.join(invalid)}")
+        return values
+    return check
+
+
+class Field:
+    """A form field: how to read it and the steps it must pass"""
+
+    __slots__ = ('name', 'label', 'steps', 'required', 'empty', 'multiple')
+
+    def __init__(self, name, label, steps=(), required=None, empty=None, multiple=False):
+        self.name = name
+        self.label = label
+        self.steps = tuple(steps)
+        self.required = Invalid(required) if required else None  # None means optional
+        self.empty = empty        # value used when an optional field is missing
+        self.multiple = multiple  # read every value (checkbox groups)
+
+    def validate(self, value):
+        """Run the field's steps; returns (value, error message or None)"""
+        if value is None or value == '' or (self.multiple and not value):
+            if self.required:
+                return None, self.required.message
+            return self.empty, None
+
+        for step in self.steps:
+            value = step(value)
+            if value.__class__ is Invalid:
+                return None, value.message
+        return value, None
+
+
+CONTACT_FIELDS = (
+    Field('name', 'Name', required="Name is required", steps=[
+        is_text("Name can only contain letters, spaces, hyphens, and apostrophes"),
+        strip(),
+        length(2, 50, "Name must be at least 2 characters long",
+               "Name must be less than 50 characters"),
+        matches(NAME_PATTERN, "Name can only contain letters, spaces, hyphens, and apostrophes"),
+    ]),
+    Field('email', 'Email', required="Email is required", steps=[
+        is_text("Please enter a valid email address"),
+        matches(EMAIL_PATTERN, "Please enter a valid email address"),
+        lower(),
+        strip(),
+    ]),
+    Field('phone', 'Phone', steps=[
+        is_text("Please enter a valid phone number"),
+        substitute(r'\D', ''),
+        length(10, 15, "Phone number must have at least 10 digits",
+               "Phone number must have less than 15 digits"),
+    ]),
+    Field('age', 'Age', required="Age is required", steps=[
+        to_int("Age must be a valid number"),
+        between(13, 120, "You must be at least 13 years old", "Please enter a valid age"),
+    ]),
+    Field('date', 'Date', steps=[
+        to_date("Please enter a valid date"),
+        not_in_future("Date cannot be in the future"),
+    ]),
+    Field('message', 'Message', required="Message is required", steps=[
+        is_text("Message must be text"),
+        strip(),
+        length(10, 1000, "Message must be at least 10 characters long",
+               "Message must be less than 1000 characters"),
+    ]),
+    Field('priority', 'Priority', required="Please select a valid priority level", steps=[
+        one_of(VALID_PRIORITIES, "Please select a valid priority level"),
+    ]),
+    Field('topics', 'Topics', multiple=True, empty=[], steps=[
+        all_of(VALID_TOPICS, "Invalid topics selected"),
+    ]),
+    Field('satisfaction', 'Satisfaction', required="Please select a value between 1 and 10", steps=[
+        to_int("Invalid satisfaction rating"),
+        between(1, 10, "Please select a value between 1 and 10",
+                "Please select a value between 1 and 10"),
+    ]),
+)
+
+FIELDS_BY_NAME = {field.name: field for field in CONTACT_FIELDS}
+FIELD_LABELS = dict({field.name: field.label for field in CONTACT_FIELDS}, attachment='File')
+
+
+class FormResult:
+    """Outcome of validate_form(): cleaned data plus per-field errors"""
+
+    __slots__ = ('data', 'errors')
+
+    def __init__(self, data, errors):
+        self.data = data
+        self.errors = errors  # field name -> error message, in form order
+
+    @property
+    def valid(self):
+        return not self.errors
+
+    def messages(self):
+        """Error strings ready to flash, e.g. 'Email: Please enter a valid email address'"""
+        return [f"{FIELD_LABELS[name]}: {message}" for name, message in self.errors.items()]
+
+
+def _read_list(form, name):
+    """Read a multi-value field from a plain dict (e.g. a JSON record)"""
+    value = form.get(name)
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def check_upload(file, content_length=None, max_size=MAX_UPLOAD_SIZE):
+    """Validate an uploaded file; returns (file or None, error)"""
+    if not file or file.filename == '':
+        return None, None  # File is optional
+
+    # Check file size (already handled by Flask config, but good to double-check)
+    if content_length and content_length > max_size:
+        return None, "File size too large. Maximum size is 16MB"
+
+    filename = file.filename.lower()
+    if '.' not in filename or filename.rsplit('.', 1)[1] not in ALLOWED_EXTENSIONS:
+        return None, f"File type not allowed. Allowed types: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
+
+    return file, None
+
+
+def validate_form(form, files=None, content_length=None, max_upload_size=MAX_UPLOAD_SIZE,
+                  fields=CONTACT_FIELDS):
+    """Validate a whole submission in one pass; returns a FormResult"""
+    data = {}
+    errors = {}
+    get = form.get
+    getlist = getattr(form, 'getlist', None)
+
+    for field in fields:
+        if not field.multiple:
+            raw = get(field.name)
+        elif getlist is not None:
+            raw = getlist(field.name)
+        else:
+            raw = _read_list(form, field.name)
+
+        value, error = field.validate(raw)
+        if error is None:
+            data[field.name] = value
+        else:
+            errors[field.name] = error
+
+    if files is not None:
+        attachment, error = check_upload(files.get('attachment'), content_length, max_upload_size)
+        if error:
+            errors['attachment'] = error
+        elif attachment:
+            data['attachment'] = attachment
+
+    return FormResult(data, errors)
+
+
+def validate_field(name, value):
+    """Validate a single contact form field; returns (value, error)"""
+    return FIELDS_BY_NAME[name].validate(value)
+
+
+def validate_records(records, start=0):
+    """Validate an iterable of plain-dict records (e.g. parsed JSON)
+
+    Yields one compact result per record: {'index': i, 'valid': True} or
+    {'index': i, 'valid': False, 'errors': {field: message}}. A record that
+    cannot be validated at all gets an error under 'record'.
+    """
+    for index, record in enumerate(records, start):
+        if not isinstance(record, dict):
+            yield {'index': index, 'valid': False,
+                   'errors': {'record': 'Each record must be a JSON object'}}
+            continue
+
+        try:
+            errors = validate_form(record).errors
+        except Exception as e:
+            # One malformed record must not fail the whole batch
+            errors = {'record': f'Could not validate record: {e}'}
+        if errors:
+            yield {'index': index, 'valid': False, 'errors': errors}
+        else:
+            yield {'index': index, 'valid': True}
@@ -0,0 +1,240 @@
+"""
+Group-commit write-behind queue for contact submissions.
+
+Instead of every request doing its own INSERT + COMMIT (and therefore its own
+fsync), requests hand their row to a bounded in-process queue and wait on a
+Future. A single background writer drains the queue and writes everything
+that arrived within max_delay (up to max_batch_size rows) with one
+executemany() in one transaction, then resolves each Future with the row's ID.
+
+IDs are reserved inside the batch transaction: the writer takes the write
+lock with BEGIN IMMEDIATE, reads the current high-water mark of the table
+and assigns consecutive IDs explicitly, so concurrent synchronous writers
+can never collide with a batch.
+
+With unique_column set (a nullable column under a partial unique index,
+such as an idempotency key), rows whose value already exists are skipped
+and their Future resolves to the ID of the existing row.
+
+close() stops new rows first and waits for submits already under way, so
+nothing is queued behind the stop marker. Rows still queued when close()
+runs out of time have their Futures failed rather than left pending.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+# Sentinel telling the writer thread to finish the queue and exit
+_STOP = object()
+
+
+class QueueFull(Exception):
+    """Raised when the write-behind queue is full and the caller should back off"""
+    pass
+
+
+class StillSaving(TimeoutError):
+    """Raised when a queued row is not written within the caller's timeout
+
+    The row usually is committed a moment later; `future` resolves then.
+    """
+
+    def __init__(self, future):
+        super().__init__('Submission is queued but not written yet')
+        self.future = future
+
+
+class WriteBehindWriter:
+    """Batches inserts from many requests into one transaction per flush"""
+
+    def __init__(self, pool, table, columns, max_batch_size=100, max_delay=0.01,
+                 max_queue_size=1000, enqueue_timeout=0.1, unique_column=None):
+        self.pool = pool
+        self.table = table
+        self.columns = tuple(columns)
+        self.unique_column = unique_column
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.enqueue_timeout = enqueue_timeout
+
+        placeholders = ', '.join('?' for _ in range(len(self.columns) + 1))
+        self.insert_sql = (
+            f"INSERT INTO {table} (id, {', '.join(self.columns)}) VALUES ({placeholders})"
+        )
+        if unique_column:
+            self.insert_sql += (
+                f" ON CONFLICT ({unique_column}) WHERE {unique_column} IS NOT NULL DO NOTHING"
+            )
+        self.next_id_sql = (
+            f"SELECT MAX(COALESCE((SELECT MAX(id) FROM {table}), 0), "
+            f"COALESCE((SELECT seq FROM sqlite_sequence WHERE name = '{table}'), 0))"
+        )
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        # Guards _closed and counts submits between the closed check and their put
+        self._state = threading.Condition()
+        self._submitting = 0
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._stats = {
+            'submitted': 0,
+            'rejected': 0,
+            'batches': 0,
+            'rows_written': 0,
+            'failed_rows': 0,
+            'largest_batch': 0,
+        }
+
+    def _ensure_started(self):
+        """Start the writer thread in this process if it is not running"""
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            # A forked worker inherits the queue object but not the thread
+            if self._pid is not None and self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+
+    def submit(self, params):
+        """Queue one row; returns a Future that resolves to its ID"""
+        with self._state:
+            if self._closed:
+                raise RuntimeError('Write-behind queue has been shut down')
+            self._submitting += 1
+        try:
+            self._ensure_started()
+            future = Future()
+            self._queue.put((params, future), timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise QueueFull('Too many submissions are waiting to be saved')
+        finally:
+            with self._state:
+                self._submitting -= 1
+                self._state.notify_all()
+
+        with self._lock:
+            self._stats['submitted'] += 1
+        return future
+
+    def _run(self):
+        """Writer loop: collect a batch, flush it, repeat until stopped"""
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+
+    def _flush(self, batch):
+        """Write one batch in a single transaction and resolve its futures"""
+        def write(conn):
+            conn.execute('BEGIN IMMEDIATE')
+            first_id = conn.execute(self.next_id_sql).fetchone()[0] + 1
+            rows = [(first_id + i,) + tuple(params) for i, (params, _) in enumerate(batch)]
+            conn.executemany(self.insert_sql, rows)
+            ids = [first_id + i for i in range(len(batch))]
+            if self.unique_column:
+                ids = self._resolve_existing(conn, batch, ids)
+            return ids
+
+        try:
+            ids = self.pool.run(write)
+        except Exception as e:
+            with self._lock:
+                self._stats['failed_rows'] += len(batch)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['rows_written'] += len(batch)
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+        for (_, future), row_id in zip(batch, ids):
+            future.set_result(row_id)
+
+    def _resolve_existing(self, conn, batch, ids):
+        """Point rows skipped by the unique column at the row that holds their value"""
+        index = self.columns.index(self.unique_column)
+        values = list({params[index] for params, _ in batch if params[index] is not None})
+        if not values:
+            return ids
+        placeholders = ', '.join('?' for _ in values)
+        existing = dict(conn.execute(
+            f"SELECT {self.unique_column}, id FROM {self.table} "
+            f"WHERE {self.unique_column} IN ({placeholders})", values
+        ))
+        return [existing.get(params[index], row_id) for (params, _), row_id in zip(batch, ids)]
+
+    def close(self, timeout=10.0):
+        """Stop accepting rows, flush everything still queued and stop the writer
+
+        Rows the writer has not taken within `timeout` seconds are not
+        written; their Futures raise instead.
+        """
+        deadline = time.monotonic() + timeout
+        with self._state:
+            self._closed = True
+            # Submits past the closed check finish within enqueue_timeout
+            self._state.wait_for(lambda: self._submitting == 0, timeout)
+
+        if self._thread is not None and self._pid == os.getpid():
+            try:
+                self._queue.put(_STOP, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                pass
+            else:
+                self._thread.join(max(0.0, deadline - time.monotonic()))
+        self._fail_queued(RuntimeError('Write-behind queue was shut down before the row was written'))
+
+    def _fail_queued(self, error):
+        """Fail the Futures of rows left in the queue"""
+        failed = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                item[1].set_exception(error)
+                failed += 1
+        if failed:
+            with self._lock:
+                self._stats['failed_rows'] += failed
+
+    def stats(self):
+        """Return a snapshot of the queue metrics"""
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot['queue_depth'] = self._queue.qsize()
+        snapshot['max_queue_size'] = self._queue.maxsize
+        if snapshot['batches']:
+            snapshot['avg_batch_size'] = round(snapshot['rows_written'] / snapshot['batches'], 1)
+        else:
+            snapshot['avg_batch_size'] = 0
+        return snapshot